@@ -1,4 +1,7 @@
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.http import FileResponse, Http404
+from django.template.response import TemplateResponse
 from django.utils.html import format_html
 
 from app_models.models import (
@@ -7,38 +10,93 @@ from app_models.models import (
     ServiceProposal,
     ServiceProposalSkill,
     ServiceCategory,
+    SlowQuery,
     User,
     UserSocials,
     UserVerification,
 )
+from utils.counter_utils import get_counters
+from utils.profiling_utils import get_profile_path, list_slowest_profiles
+from utils.search_utils import search_queryset
+from utils.slow_query_utils import explain_slow_query
+
+
+class FullTextSearchAdminMixin:
+    """Search the `search_vector` GIN index instead of LIKE scans."""
+
+    search_fields = ("title", "description")
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+
+        return search_queryset(queryset, search_term), False
 
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
-    list_display = ("uuid", "get_full_name", "email", "phone", "is_verified")
+    list_display = (
+        "uuid",
+        "get_full_name",
+        "email",
+        "phone",
+        "is_verified",
+        "requests_count",
+        "proposals_count",
+    )
     list_filter = ("district", "city", "is_verified")
+    list_select_related = ("counters",)
     search_fields = ("first_name", "last_name", "email", "phone")
 
+    @admin.display(description="Requests", ordering="counters__requests_count")
+    def requests_count(self, obj) -> int:
+        counters = get_counters(obj)
+        return counters.requests_count if counters else 0
+
+    @admin.display(description="Proposals", ordering="counters__proposals_count")
+    def proposals_count(self, obj) -> int:
+        counters = get_counters(obj)
+        return counters.proposals_count if counters else 0
+
 
 @admin.register(ServiceRequest)
-class ServiceRequestAdmin(admin.ModelAdmin):
+class ServiceRequestAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ("title", "user", "status", "duration", "fixed_amount")
     list_filter = ("status", "city", "district", "user")
 
 
 @admin.register(ServiceProposal)
-class ServiceProposalAdmin(admin.ModelAdmin):
+class ServiceProposalAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ("uuid", "title", "hourly_rate", "user")
     list_filter = ("user", "category")
-    search_fields = ("description",)
 
 
 @admin.register(UserVerification)
 class UserVerificationAdmin(admin.ModelAdmin):
-    list_display = ("user", "verification_photo", "created_at", "updated_at", "approved")
+    list_display = ("preview", "user", "verification_photo", "created_at", "updated_at", "approved")
+    list_select_related = ("user",)
+    readonly_fields = ("review", "review_photo", "thumbnail")
     
     actions = ["approve_verification", "reject_verification"]
     
+    @admin.display(description="Photo")
+    def preview(self, obj):
+        "Returns the thumbnail, built in the background after the upload"
+        if not obj.thumbnail:
+            return "Processing..."
+        return format_html('<img src="{}" style="max-height: 80px;" loading="lazy">', obj.thumbnail.url)
+    
+    @admin.display(description="Review")
+    def review(self, obj):
+        "Returns the review rendition, linking to the original photo"
+        if not obj.review_photo:
+            return "Processing..."
+        return format_html(
+            '<a href="{}"><img src="{}" style="max-width: 100%;"></a>',
+            obj.verification_photo.url,
+            obj.review_photo.url,
+        )
+    
     def approved(self, obj) -> bool:
         "Returns a check mark if the user is verified, otherwise a cross mark"
         if obj.user.is_verified:
@@ -59,10 +117,87 @@ class UserVerificationAdmin(admin.ModelAdmin):
             verification.user.save()
 
 
+@admin.register(ServiceCategory)
+class ServiceCategoryAdmin(admin.ModelAdmin):
+    list_display = ("fr_name", "en_name", "active_requests_count", "proposals_count")
+    list_select_related = ("counters",)
+
+    @admin.display(description="Active requests", ordering="counters__active_requests_count")
+    def active_requests_count(self, obj) -> int:
+        counters = get_counters(obj)
+        return counters.active_requests_count if counters else 0
+
+    @admin.display(description="Proposals", ordering="counters__proposals_count")
+    def proposals_count(self, obj) -> int:
+        counters = get_counters(obj)
+        return counters.proposals_count if counters else 0
+
+
+@admin.register(ServiceProposalSkill)
+class ServiceProposalSkillAdmin(admin.ModelAdmin):
+    list_display = ("name", "proposals_count")
+    list_select_related = ("counters",)
+    search_fields = ("name",)
+
+    @admin.display(description="Proposals", ordering="counters__proposals_count")
+    def proposals_count(self, obj) -> int:
+        counters = get_counters(obj)
+        return counters.proposals_count if counters else 0
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = (
+        "__str__",
+        "route",
+        "count",
+        "total_duration",
+        "max_duration",
+        "seq_scan_tables",
+        "last_seen_at",
+    )
+    list_filter = ("route",)
+    ordering = ("-total_duration",)
+    search_fields = ("normalized_sql", "route", "view_frame", "serializer_frame")
+    readonly_fields = [field.name for field in SlowQuery._meta.fields]
+
+    actions = ["explain_analyze"]
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    @admin.action(description="EXPLAIN ANALYZE selected queries")
+    def explain_analyze(self, request, queryset):
+        for slow_query in queryset:
+            try:
+                explain_slow_query(slow_query)
+            except Exception as error:
+                self.message_user(request, f"{slow_query}: {error}", messages.ERROR)
+
+
 admin.site.site_header = "X-Project Administration Site"
 admin.site.site_title = "X-Project Admin"
 
-admin.site.register(ServiceProposalSkill)
-admin.site.register(ServiceCategory)
 admin.site.register(UserSocials)
 admin.site.register(ServiceRequestSocials)
+
+
+def captured_profiles_view(request):
+    """List the slowest profiles captured by ProfilingMiddleware, by route."""
+    context = {
+        **admin.site.each_context(request),
+        "title": "Slowest captured profiles",
+        "profiles_by_route": list_slowest_profiles(settings.PROFILING_PROFILES_PER_ROUTE),
+    }
+    return TemplateResponse(request, "admin/captured_profiles.html", context)
+
+
+def download_profile_view(request, profile_id: str):
+    """Download the folded stacks of a profile, for flamegraph.pl or speedscope."""
+    path = get_profile_path(profile_id)
+    if not path:
+        raise Http404("Profile not found")
+
+    return FileResponse(
+        open(path, "rb"), as_attachment=True, filename=f"{profile_id}.folded", content_type="text/plain"
+    )
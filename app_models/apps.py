@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class AppModelsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'app_models'
+
+    def ready(self):
+        from app_models import signals  # noqa: F401
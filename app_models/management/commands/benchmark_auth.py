@@ -0,0 +1,81 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_jwt.settings import api_settings
+
+from app_models.models import User
+from endpoints.auth.api.user_api import ConnectedUserAPIView
+from utils.token_utils import decode_token, token_cache
+from utils.user_utils import get_connected_user, user_cache
+
+BENCH_USER_EMAIL = "benchmark-auth@example.com"
+
+
+class Command(BaseCommand):
+    help = "Measure the authentication overhead of a protected request"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000, help="Number of timed calls per case")
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        user, _ = User.objects.get_or_create(
+            email=BENCH_USER_EMAIL,
+            defaults={"first_name": "Benchmark", "last_name": "Auth", "is_active": True},
+        )
+        token = api_settings.JWT_ENCODE_HANDLER(api_settings.JWT_PAYLOAD_HANDLER(user))
+        factory = APIRequestFactory()
+        auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+        def first_read():
+            user_cache.clear()
+            get_connected_user(factory.get("/", **auth))
+
+        def cached_read():
+            get_connected_user(factory.get("/", **auth))
+
+        memoized_request = factory.get("/", **auth)
+        get_connected_user(memoized_request)
+
+        def memoized_read():
+            get_connected_user(memoized_request)
+
+        def decode_only():
+            api_settings.JWT_DECODE_HANDLER(token)
+
+        def cached_decode():
+            decode_token(token)
+
+        view = ConnectedUserAPIView.as_view()
+
+        def protected_request():
+            view(factory.get("/", **auth)).render()
+
+        cases = [
+            ("token decode", decode_only),
+            ("cached token decode", cached_decode),
+            ("uncached user read", first_read),
+            ("cached user read", cached_read),
+            ("memoized user read", memoized_read),
+            ("current-user request", protected_request),
+        ]
+
+        self.stdout.write(f"{'case':<24}{'µs/call':>10}{'queries/call':>14}")
+        for label, func in cases:
+            with CaptureQueriesContext(connection) as queries:
+                func()
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            elapsed = time.perf_counter() - start
+
+            self.stdout.write(
+                f"{label:<24}{elapsed / iterations * 1_000_000:>10.1f}{len(queries):>14}"
+            )
+
+        self.stdout.write(f"Token cache: {token_cache.stats()}")
+        self.stdout.write(f"User cache: {user_cache.stats()}")
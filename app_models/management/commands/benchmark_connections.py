@@ -0,0 +1,146 @@
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.core import signals
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.test import APIRequestFactory
+
+from endpoints.monitoring.api.monitoring_api import DatabaseHealthAPIView
+from endpoints.services.api.service_api import PaginatedServiceRequestsAPIView
+from utils.db_utils import get_database_stats
+
+MODES = ("per-request", "persistent", "pool")
+
+ENDPOINTS = {
+    # One "SELECT 1", the connection cost stands out
+    "health": (DatabaseHealthAPIView, {}),
+    # First page of the public feed
+    "requests": (PaginatedServiceRequestsAPIView, {"cursor": "", "size": 10}),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the requests of the workers without connection reuse, with "
+        "persistent connections and with a psycopg 3 pool, against the configured "
+        "database (use POSTGRES_DB_SSLMODE to include or not the TLS handshake)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+        parser.add_argument("--endpoint", choices=list(ENDPOINTS), default="health")
+        parser.add_argument("--threads", type=int, default=4, help="Concurrent request threads")
+        parser.add_argument("--iterations", type=int, default=200, help="Requests per thread")
+
+    def handle(self, *args, **options):
+        view_class, query_params = ENDPOINTS[options["endpoint"]]
+        self.view = view_class.as_view()
+        self.query_params = query_params
+        self.factory = APIRequestFactory()
+
+        # Shared by the connections of all the threads
+        self.settings_dict = connections.settings[DEFAULT_DB_ALIAS]
+        initial_settings = {
+            "CONN_MAX_AGE": self.settings_dict["CONN_MAX_AGE"],
+            "OPTIONS": dict(self.settings_dict["OPTIONS"]),
+        }
+
+        self.stdout.write(
+            f"{'mode':<13}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'connections':>13}"
+        )
+        try:
+            for mode in options["modes"]:
+                self.configure(mode)
+                result = self.measure(options["threads"], options["iterations"])
+                self.stdout.write(
+                    f"{mode:<13}{result['throughput']:>9.0f}{result['p50']:>9.2f}"
+                    f"{result['p95']:>9.2f}{result['p99']:>9.2f}{result['connections']:>13}"
+                )
+        finally:
+            self.reset_connections()
+            self.settings_dict.update(initial_settings)
+
+    def reset_connections(self):
+        """Close the connection of this thread and the pool of the previous mode."""
+        connection = connections[DEFAULT_DB_ALIAS]
+        connection.close()
+        connection.close_pool()
+
+    def configure(self, mode: str):
+        """Set the connection settings of a mode, for the connections to come."""
+        self.reset_connections()
+        options = {
+            name: value for name, value in self.settings_dict["OPTIONS"].items() if name != "pool"
+        }
+        if mode == "pool":
+            options["pool"] = settings.DATABASE_POOL_OPTIONS
+            self.settings_dict["CONN_MAX_AGE"] = 0
+        elif mode == "persistent":
+            self.settings_dict["CONN_MAX_AGE"] = settings.DATABASE_CONN_MAX_AGE or 600
+        else:
+            self.settings_dict["CONN_MAX_AGE"] = 0
+
+        self.settings_dict["OPTIONS"] = options
+
+    def request(self) -> float:
+        """Run a request through the request signals, as the handlers do."""
+        start = time.perf_counter()
+        # Closes the connections which can not be reused, as the handlers do
+        signals.request_started.send(sender=self.__class__)
+        try:
+            response = self.view(self.factory.get("/", self.query_params))
+            response.render()
+        finally:
+            signals.request_finished.send(sender=self.__class__)
+
+        if response.status_code != 200:
+            raise CommandError(f"Request failed with status {response.status_code}")
+
+        return time.perf_counter() - start
+
+    def measure(self, threads: int, iterations: int) -> dict:
+        """Run the requests of all the threads, return the throughput and percentiles."""
+        durations = []
+        errors = []
+        lock = threading.Lock()
+
+        def run():
+            try:
+                # Warm up the connection of the thread
+                self.request()
+                thread_durations = [self.request() for _ in range(iterations)]
+                with lock:
+                    durations.extend(thread_durations)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                # Threads do not send the last request_finished of a worker
+                connections[DEFAULT_DB_ALIAS].close()
+
+        created = get_database_stats()["created"]
+        workers = [threading.Thread(target=run) for _ in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        if errors:
+            raise CommandError(f"Benchmark failed: {errors[0]}")
+
+        # With a pool, the connections created are counted by the pool
+        connections_num = get_database_stats()["created"] - (
+            0 if connections[DEFAULT_DB_ALIAS].pool else created
+        )
+        quantiles = statistics.quantiles(durations, n=100)
+        return {
+            "throughput": len(durations) / elapsed,
+            "p50": quantiles[49] * 1000,
+            "p95": quantiles[94] * 1000,
+            "p99": quantiles[98] * 1000,
+            "connections": connections_num,
+        }
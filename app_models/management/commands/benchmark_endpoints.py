@@ -0,0 +1,262 @@
+import json
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test import Client, override_settings
+
+from app_models.models import ServiceProposal, ServiceRequest, User
+from utils.benchmark_utils import (
+    build_cases,
+    build_requests,
+    diff_results,
+    get_case_route,
+    get_endpoint_routes,
+    get_fixtures,
+    run_http_requests,
+    summarize,
+)
+
+MODES = ("in-process", "http")
+
+
+class QueryCounter:
+    """Execute wrapper counting the SQL queries, whatever the database alias."""
+
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every route of the endpoints apps, through an in-process client "
+        "(latency and SQL queries of each request) or a multi-process HTTP load driver "
+        "against a running server, and compare the results with a stored baseline. "
+        "Run generate_data first for a realistic dataset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mode", choices=MODES, default="in-process")
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server of the http mode")
+        parser.add_argument("--workers", type=int, default=4, help="Processes of the http mode")
+        parser.add_argument("--requests", type=int, default=50, help="Timed requests by case")
+        parser.add_argument("--warmup", type=int, default=3, help="Untimed requests by case first")
+        parser.add_argument("--timeout", type=float, default=30, help="In seconds, by HTTP request")
+        parser.add_argument(
+            "--writes",
+            action="store_true",
+            help="Run the cases changing the data too (rolled back in-process, kept over HTTP)",
+        )
+        parser.add_argument("--cases", nargs="+", help="Only run the cases whose name contains one of these")
+        parser.add_argument("--output", help="Write the results in this JSON file, e.g. to use them as a baseline")
+        parser.add_argument("--baseline", help="Compare the results with this JSON file")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.2, help="Relative growth of the p95 tolerated"
+        )
+        parser.add_argument(
+            "--min-delta", type=float, default=2.0, help="In ms, p95 growth always tolerated"
+        )
+        parser.add_argument(
+            "--fail-on-regression", action="store_true", help="Exit with an error on a regression"
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        fixtures = get_fixtures()
+        cases = build_cases(fixtures)
+
+        # Every route must be benchmarked, a new endpoint needs its case
+        covered_routes = {get_case_route(case) for case in cases}
+        for route in get_endpoint_routes():
+            if route not in covered_routes:
+                self.stdout.write(self.style.WARNING(f"No benchmark case for the route {route}"))
+
+        selected = []
+        for case in cases:
+            if options["cases"] and not any(name in case["name"] for name in options["cases"]):
+                continue
+            if case.get("skip"):
+                self.stdout.write(self.style.WARNING(f"Skipping {case['name']}: {case['skip']}"))
+            elif case.get("write") and not options["writes"]:
+                continue
+            else:
+                selected.append(case)
+
+        if not selected:
+            raise CommandError("No case to run.")
+
+        start = time.perf_counter()
+        if options["mode"] == "in-process":
+            samples = self.run_in_process(selected, fixtures, options)
+        else:
+            samples = self.run_http(selected, fixtures, options)
+        elapsed = time.perf_counter() - start
+
+        results = {
+            "meta": {
+                "mode": options["mode"],
+                "workers": options["workers"] if options["mode"] == "http" else 1,
+                "requests_by_case": options["requests"],
+                "created_at": datetime.now(dt_timezone.utc).isoformat(),
+                # The timings only compare on the same dataset
+                "dataset": {
+                    "users": User.objects.count(),
+                    "requests": ServiceRequest.objects.count(),
+                    "proposals": ServiceProposal.objects.count(),
+                },
+                "requests_per_second": round(sum(len(durations) for durations, _, _ in samples.values()) / elapsed, 1),
+            },
+            "cases": {},
+        }
+        for case in selected:
+            durations, queries, errors = samples[case["name"]]
+            results["cases"][case["name"]] = {
+                "method": case["method"],
+                "route": get_case_route(case),
+                **summarize(durations, queries, errors),
+            }
+
+        self.report(results)
+        if options["output"]:
+            with open(options["output"], "w") as output_file:
+                json.dump(results, output_file, indent=2)
+            self.stdout.write(f"Results written in {options['output']}")
+
+        if baseline:
+            self.compare(results, baseline, options)
+
+    def run_in_process(self, cases: list, fixtures: dict, options: dict) -> dict:
+        """
+        Send the requests of each case through the whole middleware stack,
+        counting their SQL queries. The writes are rolled back, and their files
+        stored in a temporary MEDIA_ROOT: the rollback never runs the
+        `on_commit` deletions of the replaced files.
+
+        :return: (durations, queries, errors) by case name.
+        """
+        # The errors are counted, not raised
+        client = Client(raise_request_exception=False)
+        samples = {}
+        with tempfile.TemporaryDirectory(prefix="benchmark-media-") as media_root:
+            for case in cases:
+                expected_status = case.get("status", 200)
+                durations, queries, errors = [], [], 0
+                requests = build_requests(case, fixtures, options["warmup"] + options["requests"])
+                for index, (_, method, path, body, content_type, headers) in enumerate(requests):
+                    counter = QueryCounter()
+                    with ExitStack() as stack:
+                        if case.get("write"):
+                            stack.enter_context(override_settings(MEDIA_ROOT=media_root))
+                            stack.enter_context(transaction.atomic(using=DEFAULT_DB_ALIAS))
+                        for alias in connections:
+                            stack.enter_context(connections[alias].execute_wrapper(counter))
+
+                        start = time.perf_counter()
+                        response = client.generic(
+                            method, path, body, content_type or "application/octet-stream", headers=headers
+                        )
+                        duration = (time.perf_counter() - start) * 1000
+                        if case.get("write"):
+                            transaction.set_rollback(True, using=DEFAULT_DB_ALIAS)
+
+                    if index < options["warmup"]:
+                        continue
+                    durations.append(duration)
+                    queries.append(counter.queries)
+                    errors += response.status_code != expected_status
+
+                samples[case["name"]] = (durations, queries, errors)
+
+        return samples
+
+    def run_http(self, cases: list, fixtures: dict, options: dict) -> dict:
+        """
+        Send the requests of all the cases, shuffled, from `workers` processes
+        to a running server.
+
+        :return: (durations, queries, errors) by case name.
+        """
+        expected_statuses = {case["name"]: case.get("status", 200) for case in cases}
+        warmup, timed = [], []
+        for case in cases:
+            requests = build_requests(case, fixtures, options["warmup"] + options["requests"])
+            warmup.extend(requests[: options["warmup"]])
+            timed.extend(requests[options["warmup"] :])
+        random.Random(0).shuffle(timed)
+
+        workers = options["workers"]
+        run_http_requests(options["url"], warmup, options["timeout"])
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(run_http_requests, options["url"], timed[index::workers], options["timeout"])
+                for index in range(workers)
+            ]
+            results = [result for future in futures for result in future.result()]
+
+        samples = {case["name"]: ([], [], 0) for case in cases}
+        for name, status_code, duration, queries in results:
+            durations, case_queries, errors = samples[name]
+            durations.append(duration)
+            case_queries.append(queries)
+            samples[name] = (durations, case_queries, errors + (status_code != expected_statuses[name]))
+
+        return samples
+
+    def report(self, results: dict):
+        self.stdout.write(
+            f"{'case':<24}{'method':<7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'queries':>9}{'errors':>8}"
+        )
+        for name, stats in results["cases"].items():
+            queries = "-" if stats["queries"] is None else f"{stats['queries']:g}"
+            line = (
+                f"{name:<24}{stats['method']:<7}{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}"
+                f"{stats['p99_ms']:>9.2f}{queries:>9}{stats['errors']:>8}"
+            )
+            self.stdout.write(self.style.ERROR(line) if stats["errors"] else line)
+
+        meta = results["meta"]
+        self.stdout.write(
+            f"{meta['requests_per_second']} requests/s, {meta['mode']} mode, dataset: "
+            + ", ".join(f"{count} {name}" for name, count in meta["dataset"].items())
+        )
+
+    def compare(self, results: dict, baseline: dict, options: dict):
+        """Print the changes since the baseline, and fail on a regression if asked."""
+        if baseline["meta"]["dataset"] != results["meta"]["dataset"]:
+            self.stdout.write(self.style.WARNING("The baseline was measured on another dataset."))
+        if baseline["meta"]["mode"] != results["meta"]["mode"]:
+            self.stdout.write(self.style.WARNING("The baseline was measured in another mode."))
+
+        rows = diff_results(results, baseline, options["tolerance"], options["min_delta"])
+        self.stdout.write(f"\n{'case':<24}{'p95 ms':>20}{'change':>9}{'queries':>14}{'errors':>10}")
+        for row in rows:
+            line = (
+                f"{row['name']:<24}{'{:.2f} -> {:.2f}'.format(*row['p95_ms']):>20}"
+                f"{row['p95_change']:>+9.0%}{'{} -> {}'.format(*row['queries']):>14}"
+                f"{'{} -> {}'.format(*row['errors']):>10}"
+            )
+            self.stdout.write(self.style.ERROR(line) if row["regression"] else line)
+
+        for name in sorted(set(results["cases"]) ^ set(baseline["cases"])):
+            where = "the baseline" if name in baseline["cases"] else "this run"
+            self.stdout.write(f"{name}: only in {where}")
+
+        regressions = [row["name"] for row in rows if row["regression"]]
+        if regressions and options["fail_on_regression"]:
+            raise CommandError(f"Regressions since the baseline: {', '.join(regressions)}")
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS("No regression since the baseline."))
@@ -0,0 +1,96 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory
+
+from app_models.models import User
+from endpoints.auth.api.auth_api import LoginAPIView
+
+BENCH_USER_EMAIL = "benchmark-logins@example.com"
+BENCH_PASSWORD = "benchmark-logins-password"
+
+
+class RollbackBenchmark(Exception):
+    """Raised to roll back the user created for the benchmark."""
+
+
+class Command(BaseCommand):
+    help = "Measure the logins per second of a worker for each password hasher profile"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profiles",
+            nargs="+",
+            default=list(settings.PASSWORD_HASHER_PROFILES),
+            help="Profiles to measure, see PASSWORD_HASHER_PROFILES",
+        )
+        parser.add_argument("--iterations", type=int, default=20, help="Number of timed logins per profile")
+
+    def handle(self, *args, **options):
+        unknown_profiles = set(options["profiles"]) - set(settings.PASSWORD_HASHER_PROFILES)
+        if unknown_profiles:
+            raise CommandError(f"Unknown profiles: {', '.join(sorted(unknown_profiles))}")
+
+        self.stdout.write(f"{'profile':<10}{'ms/hash':>10}{'ms/login':>10}{'logins/s':>10}")
+        for profile in options["profiles"]:
+            hashers = [settings.PASSWORD_HASHER_PROFILES[profile]] + [
+                hasher
+                for name, hasher in settings.PASSWORD_HASHER_PROFILES.items()
+                if name != profile
+            ]
+            # Measure the login only, without rehash nor last login writes
+            with override_settings(
+                PASSWORD_HASHERS=hashers, PASSWORD_REHASH_WORKERS=0
+            ):
+                try:
+                    result = self.measure(options["iterations"])
+                except ValueError as e:
+                    # The library of the hasher is not installed
+                    self.stdout.write(f"{profile:<10}skipped: {e}")
+                    continue
+
+            hash_time, login_time = result
+            self.stdout.write(
+                f"{profile:<10}{hash_time * 1000:>10.1f}{login_time * 1000:>10.1f}{1 / login_time:>10.1f}"
+            )
+
+    def measure(self, iterations: int):
+        """Return the average durations of a hash and of a login, in seconds."""
+        start = time.perf_counter()
+        for _ in range(iterations):
+            make_password(BENCH_PASSWORD)
+        hash_time = (time.perf_counter() - start) / iterations
+
+        factory = APIRequestFactory()
+        view = LoginAPIView.as_view()
+        try:
+            with transaction.atomic():
+                User.objects.create(
+                    first_name="Benchmark",
+                    last_name="Logins",
+                    email=BENCH_USER_EMAIL,
+                    is_active=True,
+                    password=make_password(BENCH_PASSWORD),
+                )
+
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    request = factory.post(
+                        "/",
+                        {"username": BENCH_USER_EMAIL, "password": BENCH_PASSWORD},
+                        format="json",
+                    )
+                    response = view(request)
+                    if response.status_code != 200:
+                        raise CommandError(f"Login failed with status {response.status_code}")
+                login_time = (time.perf_counter() - start) / iterations
+
+                raise RollbackBenchmark()
+        except RollbackBenchmark:
+            pass
+
+        return hash_time, login_time
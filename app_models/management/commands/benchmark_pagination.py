@@ -0,0 +1,107 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from app_models.models import ServiceRequest, ServiceRequestSocials, User
+from app_models.models.constants import ServiceRequestStatus
+from endpoints.services.api.service_api import PaginatedServiceRequestsAPIView
+from utils.pagination_utils import encode_cursor
+
+BENCH_USER_EMAIL = "benchmark-pagination@example.com"
+
+
+class Command(BaseCommand):
+    help = "Compare offset and cursor pagination of the service requests listing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page", type=int, default=5000, help="Deep page to compare with page 1")
+        parser.add_argument("--size", type=int, default=10, help="Number of items per page")
+        parser.add_argument("--repeat", type=int, default=20, help="Number of timed calls per case")
+        parser.add_argument("--cleanup", action="store_true", help="Delete the benchmark rows and exit")
+
+    def handle(self, *args, **options):
+        if options["cleanup"]:
+            User.objects.filter(email=BENCH_USER_EMAIL).delete()
+            self.stdout.write("Benchmark rows deleted.")
+            return
+
+        page, size = options["page"], options["size"]
+        self.seed(page * size + size)
+
+        view = PaginatedServiceRequestsAPIView.as_view()
+        factory = APIRequestFactory()
+        url = "/api/v1/services/requests/list/"
+
+        # Position the cursor on the last row of the page preceding the deep page
+        deep_cursor = ""
+        if page > 1:
+            previous_row = (
+                ServiceRequest.objects.filter(status=ServiceRequestStatus.ACTIVE)
+                .order_by("-updated_at", "-uuid")
+                .values("updated_at", "uuid")[(page - 1) * size - 1]
+            )
+            deep_cursor = encode_cursor(previous_row["updated_at"], previous_row["uuid"])
+
+        cases = [
+            ("offset", 1, {"page": 1, "size": size}),
+            ("offset", page, {"page": page, "size": size}),
+            ("cursor", 1, {"cursor": "", "size": size}),
+            ("cursor", page, {"cursor": deep_cursor, "size": size}),
+        ]
+
+        self.stdout.write(f"{'mode':<8}{'page':>8}{'median ms':>12}{'p95 ms':>10}{'queries':>9}")
+        for mode, page_number, params in cases:
+            timings = []
+            for _ in range(options["repeat"]):
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    response = view(factory.get(url, params))
+                    timings.append((time.perf_counter() - start) * 1000)
+
+                assert response.status_code == 200, response.data
+
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(
+                f"{mode:<8}{page_number:>8}{statistics.median(timings):>12.2f}"
+                f"{p95:>10.2f}{len(queries):>9}"
+            )
+
+    def seed(self, minimum_rows: int):
+        """Bulk create active service requests until there are enough rows."""
+        existing = ServiceRequest.objects.filter(status=ServiceRequestStatus.ACTIVE).count()
+        missing = minimum_rows - existing
+        if missing <= 0:
+            return
+
+        self.stdout.write(f"Seeding {missing} service requests...")
+        user, _ = User.objects.get_or_create(
+            email=BENCH_USER_EMAIL,
+            defaults={"first_name": "Benchmark", "last_name": "Pagination"},
+        )
+        batch_size = 5000
+        for offset in range(0, missing, batch_size):
+            service_requests = ServiceRequest.objects.bulk_create(
+                [
+                    ServiceRequest(
+                        user=user,
+                        title=f"Benchmark request {offset + i}",
+                        description="Benchmark request",
+                        city="Douala",
+                        district="Akwa",
+                        duration=1,
+                        fixed_amount=1000 + i,
+                    )
+                    for i in range(min(batch_size, missing - offset))
+                ]
+            )
+            ServiceRequestSocials.objects.bulk_create(
+                [
+                    ServiceRequestSocials(service_request=service_request, email=BENCH_USER_EMAIL)
+                    for service_request in service_requests
+                ]
+            )
@@ -0,0 +1,184 @@
+import random
+import re
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from app_models.models import (
+    ServiceCategory,
+    ServiceProposal,
+    ServiceRequest,
+    ServiceRequestSocials,
+    User,
+)
+from app_models.models.constants import ServiceRequestStatus
+from endpoints.services.api.service_api import (
+    PaginatedServiceProposalsAPIView,
+    PaginatedServiceRequestsAPIView,
+)
+from utils.common import build_list_types
+from utils.pagination_utils import encode_cursor, keyset_queryset
+
+SEED_USER_EMAIL = "explain-seed@example.com"
+CITIES = ["Douala", "Yaoundé", "Bafoussam", "Garoua", "Bamenda", "Kribi", "Limbé", "Ngaoundéré"]
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN (ANALYZE on PostgreSQL) on the services listing queries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Number of requests and proposals to seed first"
+        )
+        parser.add_argument("--size", type=int, default=10, help="Number of items per page")
+        parser.add_argument("--page", type=int, default=100, help="Deep page used for the OFFSET plans")
+        parser.add_argument("--verbose-plans", action="store_true", help="Print the full plans")
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            self.seed(options["seed"])
+
+        size, page = options["size"], options["page"]
+        category = ServiceCategory.objects.order_by("fr_name").first()
+        category_uuid = category.uuid if category else ""
+        last_request = (
+            ServiceRequest.objects.filter(status=ServiceRequestStatus.ACTIVE)
+            .order_by("-updated_at", "-uuid")
+            .values("updated_at", "uuid")[size * page : size * page + 1]
+            .first()
+        )
+        cursor = (
+            encode_cursor(last_request["updated_at"], last_request["uuid"])
+            if last_request
+            else None
+        )
+
+        request_filters = {
+            "no filter": {},
+            "town": {"town": "Douala"},
+            "category": {"category_uuid": category_uuid},
+            "amount range": {"min_amount": "10000", "max_amount": "50000"},
+            "search": {"q": "plombier douala"},
+            "all filters": {
+                "town": "Douala",
+                "category_uuid": category_uuid,
+                "min_amount": "10000",
+                "max_amount": "50000",
+            },
+        }
+
+        cases = []
+        for label, params in request_filters.items():
+            queryset = PaginatedServiceRequestsAPIView.filter_queryset(params)
+            ordering = ["-updated_at", "-uuid"]
+            if "search_rank" in queryset.query.annotations:
+                ordering.insert(0, "-search_rank")
+
+            ordered = queryset.order_by(*ordering)
+            cases.append((f"requests / {label} / count", queryset.values("uuid"), "count"))
+            cases.append((f"requests / {label} / page 1", ordered[:size], None))
+            cases.append(
+                (f"requests / {label} / page {page}", ordered[size * (page - 1) : size * page], None)
+            )
+            cases.append(
+                (
+                    f"requests / {label} / cursor",
+                    keyset_queryset(queryset, cursor, "desc")[0][: size + 1],
+                    None,
+                )
+            )
+
+        proposal_filters = {
+            "no filter": {},
+            "category": {"category_uuid": category_uuid},
+            "search": {"q": "développeur python"},
+        }
+        for label, params in proposal_filters.items():
+            queryset = PaginatedServiceProposalsAPIView.filter_queryset(params)
+            ordering = ["-updated_at", "-uuid"]
+            if "search_rank" in queryset.query.annotations:
+                ordering.insert(0, "-search_rank")
+
+            cases.append((f"proposals / {label} / page 1", queryset.order_by(*ordering)[:size], None))
+
+        analyze = connection.vendor == "postgresql"
+        for label, queryset, mode in cases:
+            if mode == "count":
+                # EXPLAIN the COUNT(*) the offset mode runs on every call
+                sql, params = queryset.query.sql_with_params()
+                with connection.cursor() as db_cursor:
+                    db_cursor.execute(
+                        f"EXPLAIN {'ANALYZE ' if analyze else ''}SELECT COUNT(*) FROM ({sql}) subquery",
+                        params,
+                    )
+                    plan = "\n".join(" ".join(map(str, row)) for row in db_cursor.fetchall())
+            else:
+                plan = queryset.explain(analyze=True) if analyze else queryset.explain()
+
+            self.report(label, plan, options["verbose_plans"])
+
+    def report(self, label: str, plan: str, verbose: bool):
+        """Print a one line summary of the plan, or the full plan."""
+        indexes = sorted(
+            set(re.findall(r'(?:using|USING (?:COVERING )?INDEX|Index Scan on) "?(\w+)', plan))
+        )
+        seq_scans = len(re.findall(r"Seq Scan|\bSCAN \w+\s*$", plan, re.MULTILINE))
+        timing = re.search(r"Execution Time: ([\d.]+ ms)", plan)
+
+        summary = f"{label:<42} indexes: {', '.join(indexes) or '-'} seq scans: {seq_scans}"
+        if timing:
+            summary += f"  time: {timing.group(1)}"
+
+        style = self.style.WARNING if seq_scans and not indexes else self.style.SUCCESS
+        self.stdout.write(style(summary))
+        if verbose:
+            self.stdout.write(plan + "\n")
+
+    def seed(self, count: int):
+        """Bulk create a varied dataset of requests and proposals."""
+        self.stdout.write(f"Seeding {count} service requests and proposals...")
+        user, _ = User.objects.get_or_create(
+            email=SEED_USER_EMAIL, defaults={"first_name": "Explain", "last_name": "Seed"}
+        )
+        categories = list(ServiceCategory.objects.all()) or [None]
+        statuses = build_list_types(ServiceRequestStatus)
+        batch_size = 5000
+        for offset in range(0, count, batch_size):
+            batch = range(min(batch_size, count - offset))
+            service_requests = ServiceRequest.objects.bulk_create(
+                [
+                    ServiceRequest(
+                        user=user,
+                        title=f"Request {offset + i}",
+                        description="Seeded request",
+                        city=random.choice(CITIES),
+                        district="Centre",
+                        duration=random.randint(1, 30),
+                        fixed_amount=random.randint(1, 200) * 500,
+                        status=random.choices(statuses, weights=[6, 3, 1])[0],
+                        category=random.choice(categories),
+                    )
+                    for i in batch
+                ]
+            )
+            ServiceRequestSocials.objects.bulk_create(
+                [
+                    ServiceRequestSocials(service_request=service_request, email=SEED_USER_EMAIL)
+                    for service_request in service_requests
+                ]
+            )
+            ServiceProposal.objects.bulk_create(
+                [
+                    ServiceProposal(
+                        user=user,
+                        title=f"Proposal {offset + i}",
+                        description="Seeded proposal",
+                        hourly_rate=random.randint(1, 100) * 500,
+                        category=random.choice(categories),
+                    )
+                    for i in batch
+                ]
+            )
+
+        with connection.cursor() as db_cursor:
+            db_cursor.execute("ANALYZE")
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from utils.slow_query_utils import explain_slow_query, get_top_slow_queries
+
+ORDERINGS = {"total": "-total_duration", "max": "-max_duration", "count": "-count"}
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN (ANALYZE, BUFFERS) on the top slow queries recorded by SlowQueryMiddleware"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=10, help="Number of slow queries to explain")
+        parser.add_argument(
+            "--order-by", choices=ORDERINGS, default="total", help="Ranking of the slow queries"
+        )
+        parser.add_argument(
+            "--no-analyze", action="store_true", help="Only plan the queries, without running them"
+        )
+        parser.add_argument("--verbose-plans", action="store_true", help="Print the full plans")
+
+    def handle(self, *args, **options):
+        slow_queries = get_top_slow_queries(options["top"], ORDERINGS[options["order_by"]])
+        if not slow_queries:
+            self.stdout.write("No slow query recorded")
+            return
+
+        for slow_query in slow_queries:
+            try:
+                plan = explain_slow_query(slow_query, analyze=not options["no_analyze"])
+            except Exception as error:
+                self.stdout.write(self.style.ERROR(f"{slow_query.fingerprint[:10]} {error}"))
+                continue
+
+            summary = (
+                f"{slow_query.fingerprint[:10]} {slow_query.route or '-':<36} "
+                f"count: {slow_query.count} total: {slow_query.total_duration:.1f} ms "
+                f"max: {slow_query.max_duration:.1f} ms "
+                f"seq scans: {slow_query.seq_scan_tables or '-'}"
+            )
+            style = self.style.WARNING if slow_query.seq_scan_tables else self.style.SUCCESS
+            self.stdout.write(style(summary))
+            self.stdout.write(f"    {slow_query.view_frame or '-'} / {slow_query.serializer_frame or '-'}")
+            if options["verbose_plans"]:
+                self.stdout.write(f"{slow_query.normalized_sql}\n{plan}\n")
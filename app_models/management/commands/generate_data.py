@@ -0,0 +1,309 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from app_models.models import (
+    ServiceCategory,
+    ServiceProposal,
+    ServiceProposalSkill,
+    ServiceRequest,
+    ServiceRequestSocials,
+    User,
+    UserSocials,
+)
+from app_models.models.constants import ServiceRequestStatus
+
+# The generated users share this email domain and this password
+GENERATED_EMAIL_DOMAIN = "generated.x-project.test"
+GENERATED_PASSWORD = "Generated-Password-1"
+
+DISTRICTS = {
+    "Douala": ["Akwa", "Bonapriso", "Bonamoussadi", "Deido", "Makepe", "Logbaba", "Bépanda"],
+    "Yaoundé": ["Bastos", "Mvan", "Essos", "Biyem-Assi", "Nlongkak", "Emana", "Mendong"],
+    "Bafoussam": ["Tamdja", "Djeleng", "Kouogouo", "Famla"],
+    "Garoua": ["Roumdé Adjia", "Poumpoumré", "Yelwa"],
+    "Bamenda": ["Nkwen", "Mankon", "Bambili", "Up Station"],
+    "Kribi": ["Afan Mabé", "Mokolo", "Dombé"],
+    "Limbé": ["Down Beach", "Mile 4", "Bota"],
+    "Ngaoundéré": ["Joli Soir", "Bali", "Baladji"],
+}
+# Relative weights of the cities, the largest ones getting most of the traffic
+CITY_WEIGHTS = [30, 28, 8, 6, 8, 4, 4, 4]
+
+FIRST_NAMES = [
+    "Aïcha", "Boris", "Carine", "Didier", "Esther", "Franck", "Grâce", "Hervé", "Ibrahim",
+    "Joëlle", "Kevin", "Linda", "Marius", "Nadège", "Olivier", "Patricia", "Rodrigue",
+    "Sandrine", "Thierry", "Ursule", "Vanessa", "William", "Yannick", "Zita",
+]
+LAST_NAMES = [
+    "Abena", "Biya", "Chinda", "Djoumessi", "Ekambi", "Fotso", "Guemo", "Hamadou", "Kamga",
+    "Mbappe", "Ndongo", "Nkeng", "Onana", "Tchakounte", "Tagne", "Wandji", "Yimga", "Zambo",
+]
+
+SKILLS = [
+    "Python", "Django", "React", "Flutter", "Comptabilité", "Plomberie", "Électricité",
+    "Maçonnerie", "Menuiserie", "Peinture", "Traduction", "Rédaction", "Photographie",
+    "Montage vidéo", "Design graphique", "SEO", "Community management", "Marketing digital",
+    "Cours particuliers", "Mathématiques", "Anglais", "Couture", "Coiffure", "Cuisine",
+    "Livraison", "Jardinage", "Réparation téléphone", "Maintenance informatique", "Excel",
+    "Gestion de projet", "Conseil juridique", "Architecture", "Topographie", "Soudure",
+]
+
+REQUEST_TITLES = [
+    "Besoin d'un plombier pour une fuite d'eau",
+    "Recherche électricien pour installation",
+    "Développement d'un site web vitrine",
+    "Création d'une application mobile",
+    "Cours de mathématiques pour un élève de terminale",
+    "Traduction d'un document anglais-français",
+    "Peinture d'un appartement de 3 pièces",
+    "Réparation d'un écran de téléphone",
+    "Photographe pour un mariage",
+    "Comptable pour la clôture annuelle",
+    "Maçon pour une clôture",
+    "Livraison de colis en ville",
+    "Gestion des réseaux sociaux d'une boutique",
+    "Design d'un logo et d'une charte graphique",
+    "Menuisier pour des placards sur mesure",
+]
+PROPOSAL_TITLES = [
+    "Développeur {skill} expérimenté",
+    "Services de {skill} à domicile",
+    "{skill} rapide et soigné",
+    "Expert en {skill}, devis gratuit",
+    "Formation et accompagnement en {skill}",
+]
+DESCRIPTION_SENTENCES = [
+    "Travail soigné et dans les délais.",
+    "Disponible en semaine et le week-end.",
+    "Matériel fourni si nécessaire.",
+    "Merci de préciser votre budget et vos disponibilités.",
+    "Plusieurs années d'expérience auprès de particuliers et d'entreprises.",
+    "Paiement à la livraison possible.",
+    "Déplacement dans toute la ville.",
+    "Références disponibles sur demande.",
+]
+
+# Share of the service requests by status
+STATUS_WEIGHTS = {
+    ServiceRequestStatus.ACTIVE.value: 6,
+    ServiceRequestStatus.CLOSED.value: 3,
+    ServiceRequestStatus.ARCHIVED.value: 1,
+}
+
+# Rows spread over the past year, updated since their creation
+HISTORY_DAYS = 365
+
+SET_TIMESTAMPS_SQL = """
+    UPDATE {table} SET created_at = data.created_at, updated_at = data.updated_at
+    FROM unnest(%s::varchar[], %s::timestamptz[], %s::timestamptz[])
+        AS data (key, created_at, updated_at)
+    WHERE {table}.{key} = data.key
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk generate realistic users, service requests (with socials), proposals and "
+        "skill links for the benchmarks. The data only depends on --seed, and new runs "
+        "add users after the generated ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10000, help="Number of users to generate")
+        parser.add_argument(
+            "--requests-per-user", type=float, default=3, help="Average service requests by user"
+        )
+        parser.add_argument(
+            "--proposals-per-user", type=float, default=1, help="Average service proposals by user"
+        )
+        parser.add_argument(
+            "--max-skills", type=int, default=4, help="Maximum skills linked to a proposal"
+        )
+        parser.add_argument("--batch-size", type=int, default=5000, help="Users inserted by batch")
+        parser.add_argument("--seed", type=int, default=42, help="Seed of the random generator")
+        parser.add_argument(
+            "--cleanup", action="store_true", help="Delete the generated users and their rows, and exit"
+        )
+
+    def handle(self, *args, **options):
+        if options["cleanup"]:
+            deleted, _ = User.objects.filter(email__endswith=f"@{GENERATED_EMAIL_DOMAIN}").delete()
+            self.stdout.write(f"{deleted} generated rows deleted.")
+            return
+
+        self.categories = list(ServiceCategory.objects.values_list("uuid", flat=True))
+        if not self.categories:
+            raise CommandError("No service category, run the seeder first.")
+
+        ServiceProposalSkill.objects.bulk_create(
+            [ServiceProposalSkill(name=name) for name in SKILLS], ignore_conflicts=True
+        )
+        self.skills = list(
+            ServiceProposalSkill.objects.filter(name__in=SKILLS).values_list("id", "name")
+        )
+        # Hashed once, the hasher is slow on purpose
+        self.password = make_password(GENERATED_PASSWORD)
+        self.now = timezone.now()
+
+        first_index = User.objects.filter(email__endswith=f"@{GENERATED_EMAIL_DOMAIN}").count()
+        total, batch_size = options["users"], options["batch_size"]
+        start = time.perf_counter()
+        totals = {"users": 0, "requests": 0, "proposals": 0, "skill links": 0}
+        for offset in range(first_index, first_index + total, batch_size):
+            count = min(batch_size, first_index + total - offset)
+            # One generator by batch, so that the data only depends on the seed
+            rng = random.Random(f"{options['seed']}-{offset}")
+            with transaction.atomic():
+                batch_totals = self.generate_batch(rng, offset, count, options)
+
+            for name, value in batch_totals.items():
+                totals[name] += value
+            self.stdout.write(
+                f"{offset + count - first_index}/{total} users "
+                f"({time.perf_counter() - start:.1f} s)"
+            )
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                ", ".join(f"{value} {name}" for name, value in totals.items())
+                + f" generated in {time.perf_counter() - start:.1f} s"
+                + f" (password of the users: {GENERATED_PASSWORD})"
+            )
+        )
+
+    def generate_batch(self, rng: random.Random, offset: int, count: int, options: dict) -> dict:
+        """
+        Insert a batch of users with their socials, requests and proposals.
+
+        :param rng: The random generator of the batch.
+        :param offset: The index of the first user of the batch.
+        :param count: The number of users of the batch.
+        :param options: The options of the command.
+        :return: The number of rows inserted by kind.
+        """
+        cities = list(DISTRICTS)
+        users = []
+        for index in range(offset, offset + count):
+            city = rng.choices(cities, weights=CITY_WEIGHTS)[0]
+            email = f"user{index}@{GENERATED_EMAIL_DOMAIN}"
+            users.append(
+                User(
+                    uuid=random_uuid(rng),
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=rng.choice(LAST_NAMES),
+                    email=email,
+                    username=email,
+                    phone=f"+2376{index:08d}",
+                    city=city,
+                    district=rng.choice(DISTRICTS[city]),
+                    password=self.password,
+                    is_active=True,
+                    is_verified=rng.random() < 0.3,
+                )
+            )
+        User.objects.bulk_create(users)
+        UserSocials.objects.bulk_create(
+            [
+                UserSocials(user=user, whatsapp=user.phone, telegram=f"@{user.uuid[:12]}")
+                for user in users
+                if rng.random() < 0.5
+            ]
+        )
+
+        service_requests, service_request_socials = [], []
+        for user in users:
+            for _ in range(poisson(rng, options["requests_per_user"])):
+                city = rng.choices(cities, weights=CITY_WEIGHTS)[0]
+                service_request = ServiceRequest(
+                    uuid=random_uuid(rng),
+                    user=user,
+                    title=rng.choice(REQUEST_TITLES),
+                    description=random_description(rng),
+                    status=rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()))[0],
+                    city=city,
+                    district=rng.choice(DISTRICTS[city]),
+                    duration=rng.randint(1, 60),
+                    fixed_amount=int(rng.lognormvariate(10.5, 0.9)) // 500 * 500 + 500,
+                    category_id=rng.choice(self.categories),
+                )
+                service_requests.append(service_request)
+                service_request_socials.append(
+                    ServiceRequestSocials(
+                        service_request=service_request,
+                        email=user.email,
+                        phone=user.phone if rng.random() < 0.7 else None,
+                        whatsapp=user.phone if rng.random() < 0.5 else None,
+                    )
+                )
+        ServiceRequest.objects.bulk_create(service_requests)
+        ServiceRequestSocials.objects.bulk_create(service_request_socials)
+
+        proposals, skill_links = [], []
+        SkillLink = ServiceProposal.skills.through
+        for user in users:
+            for _ in range(poisson(rng, options["proposals_per_user"])):
+                skills = rng.sample(self.skills, rng.randint(1, options["max_skills"]))
+                proposal = ServiceProposal(
+                    uuid=random_uuid(rng),
+                    user=user,
+                    title=rng.choice(PROPOSAL_TITLES).format(skill=skills[0][1]),
+                    description=random_description(rng),
+                    hourly_rate=rng.randint(2, 60) * 500,
+                    category_id=rng.choice(self.categories),
+                )
+                proposals.append(proposal)
+                skill_links.extend(
+                    SkillLink(serviceproposal_id=proposal.uuid, serviceproposalskill_id=skill_id)
+                    for skill_id, _ in skills
+                )
+        ServiceProposal.objects.bulk_create(proposals)
+        SkillLink.objects.bulk_create(skill_links)
+
+        # auto_now_add and auto_now set the insertion time, spread it over the history
+        with connection.cursor() as cursor:
+            for table, key, rows in (
+                (User._meta.db_table, "uuid", users),
+                (ServiceRequest._meta.db_table, "uuid", service_requests),
+                (ServiceProposal._meta.db_table, "uuid", proposals),
+            ):
+                keys, created, updated = [], [], []
+                for row in rows:
+                    created_at = self.now - timedelta(seconds=rng.randint(0, HISTORY_DAYS * 86400))
+                    keys.append(getattr(row, key))
+                    created.append(created_at)
+                    updated.append(created_at + (self.now - created_at) * rng.random() ** 3)
+                cursor.execute(SET_TIMESTAMPS_SQL.format(table=table, key=key), [keys, created, updated])
+
+        return {
+            "users": len(users),
+            "requests": len(service_requests),
+            "proposals": len(proposals),
+            "skill links": len(skill_links),
+        }
+
+
+def random_uuid(rng: random.Random) -> str:
+    """Same format as `generate_uuid`, reproducible."""
+    return f"{rng.getrandbits(128):032x}"
+
+
+def random_description(rng: random.Random) -> str:
+    return " ".join(rng.sample(DESCRIPTION_SENTENCES, rng.randint(1, 4)))
+
+
+def poisson(rng: random.Random, mean: float) -> int:
+    """Number of events of a Poisson process of the given mean, a few users posting a lot."""
+    count, elapsed = 0, rng.expovariate(1)
+    while elapsed < mean:
+        count += 1
+        elapsed += rng.expovariate(1)
+    return count
@@ -0,0 +1,47 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.swagger_utils import generate_schema, get_schema_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema files served on /swagger.json and /swagger.yaml. "
+        "With --check, only fail if they differ from the views and serializers (CI)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check", action="store_true", help="Exit with an error if the schema files are outdated"
+        )
+
+    def handle(self, *args, **options):
+        schema = generate_schema()
+
+        if options["check"]:
+            outdated = []
+            for extension, content in schema.items():
+                path = get_schema_path(extension)
+                try:
+                    with open(path, "rb") as schema_file:
+                        if schema_file.read() == content:
+                            continue
+                except FileNotFoundError:
+                    pass
+                outdated.append(os.path.relpath(path, settings.BASE_DIR))
+
+            if outdated:
+                raise CommandError(
+                    f"Outdated OpenAPI schema: {', '.join(outdated)}. "
+                    "Run `python manage.py generate_openapi_schema` and commit the files."
+                )
+            self.stdout.write(self.style.SUCCESS("The OpenAPI schema is up to date."))
+            return
+
+        os.makedirs(settings.OPENAPI_SCHEMA_DIR, exist_ok=True)
+        for extension, content in schema.items():
+            with open(get_schema_path(extension), "wb") as schema_file:
+                schema_file.write(content)
+            self.stdout.write(f"{os.path.relpath(get_schema_path(extension), settings.BASE_DIR)} written")
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from app_models.models import UserVerification
+from utils.image_utils import process_verification_photo
+
+
+class Command(BaseCommand):
+    help = "Build the review renditions and thumbnails of the verification photos lacking them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true", help="Rebuild the renditions of all the photos"
+        )
+
+    def handle(self, *args, **options):
+        verifications = UserVerification.objects.exclude(verification_photo="")
+        if not options["all"]:
+            verifications = verifications.filter(thumbnail="")
+
+        processed = failed = 0
+        for verification_pk in verifications.values_list("pk", flat=True).iterator():
+            try:
+                if process_verification_photo(verification_pk):
+                    processed += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Verification {verification_pk}: {e}")
+
+        self.stdout.write(f"{processed} photos processed, {failed} failed.")
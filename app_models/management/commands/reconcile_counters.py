@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from utils.counter_utils import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the users, categories and skills counters and fix their drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only report the drifted counters"
+        )
+
+    def handle(self, *args, **options):
+        drifts = reconcile_counters(dry_run=options["dry_run"])
+
+        action = "drifted" if options["dry_run"] else "fixed"
+        for table, count in drifts.items():
+            self.stdout.write(f"{table}: {count} {action}")
+
+        if not any(drifts.values()):
+            self.stdout.write(self.style.SUCCESS("All the counters are up to date."))
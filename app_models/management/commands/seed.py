@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from app_models.seeders.initialize_db import get_seed_version, seed_database
+
+
+class Command(BaseCommand):
+    help = "Seed the super admin and the service categories, once by version of the seed data"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true", help="Seed even if this version was already seeded"
+        )
+
+    def handle(self, *args, **options):
+        version = get_seed_version()[:12]
+        if seed_database(force=options["force"]):
+            self.stdout.write(self.style.SUCCESS(f"Database seeded (version {version})."))
+        else:
+            self.stdout.write(f"Seed version {version} already applied, nothing to do.")
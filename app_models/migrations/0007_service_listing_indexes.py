@@ -0,0 +1,37 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_models', '0006_servicerequest_category'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='serviceproposal',
+            index=models.Index(fields=['-updated_at', '-uuid'], name='srv_prop_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serviceproposal',
+            index=models.Index(fields=['category', '-updated_at', '-uuid'], name='srv_prop_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['-updated_at', '-uuid'], name='srv_req_active_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['category', '-updated_at', '-uuid'], name='srv_req_active_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['city', '-updated_at', '-uuid'], name='srv_req_active_city_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['fixed_amount'], name='srv_req_active_amount_idx'),
+        ),
+    ]
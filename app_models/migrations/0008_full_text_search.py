@@ -0,0 +1,79 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:21
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('pg_catalog.french', coalesce({row}title, '')), 'A') ||
+    setweight(to_tsvector('pg_catalog.english', coalesce({row}title, '')), 'A') ||
+    setweight(to_tsvector('pg_catalog.french', coalesce({row}description, '')), 'B') ||
+    setweight(to_tsvector('pg_catalog.english', coalesce({row}description, '')), 'B')
+"""
+
+# The vector of a row is only recomputed when its title or description change
+CREATE_TRIGGER_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION app_models_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        IF NEW.title IS NOT DISTINCT FROM OLD.title
+            AND NEW.description IS NOT DISTINCT FROM OLD.description THEN
+            NEW.search_vector := OLD.search_vector;
+            RETURN NEW;
+        END IF;
+    END IF;
+    NEW.search_vector := {SEARCH_VECTOR_SQL.format(row="NEW.")};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+DROP_TRIGGER_FUNCTION_SQL = "DROP FUNCTION IF EXISTS app_models_search_vector_update();"
+
+CREATE_TRIGGER_SQL = """
+CREATE TRIGGER {table}_search_vector_trigger
+BEFORE INSERT OR UPDATE ON {table}
+FOR EACH ROW EXECUTE FUNCTION app_models_search_vector_update();
+"""
+
+DROP_TRIGGER_SQL = "DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table};"
+
+BACKFILL_SQL = f"UPDATE {{table}} SET search_vector = {SEARCH_VECTOR_SQL.format(row='')};"
+
+SEARCHABLE_TABLES = ("app_models_servicerequest", "app_models_serviceproposal")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_models', '0007_service_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviceproposal',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='servicerequest',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='serviceproposal',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='srv_prop_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='srv_req_search_idx'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER_FUNCTION_SQL, DROP_TRIGGER_FUNCTION_SQL),
+        *[
+            migrations.RunSQL(
+                BACKFILL_SQL.format(table=table) + CREATE_TRIGGER_SQL.format(table=table),
+                DROP_TRIGGER_SQL.format(table=table),
+            )
+            for table in SEARCHABLE_TABLES
+        ],
+    ]
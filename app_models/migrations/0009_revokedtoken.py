@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_models', '0008_full_text_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('digest', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'revoked token',
+                'verbose_name_plural': 'Revoked Tokens',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_models', '0009_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='serviceproposal',
+            index=models.Index(fields=['user', '-updated_at', '-uuid'], name='srv_prop_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['user', '-updated_at', '-uuid'], name='srv_req_user_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,246 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Add a delta to the counters of a row, creating them on the first increment.
+# Decrements never create counters, e.g. while a user and its services are
+# being deleted.
+CREATE_ADD_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION app_models_add_{name}_counters(target {key_type}, {args}) RETURNS void AS $$
+BEGIN
+    IF target IS NULL THEN
+        RETURN;
+    END IF;
+    UPDATE {table} SET {updates} WHERE {key} = target;
+    IF NOT FOUND AND {positive} THEN
+        INSERT INTO {table} ({key}, {columns}) VALUES (target, {deltas})
+        ON CONFLICT ({key}) DO UPDATE SET {conflict_updates};
+    END IF;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+COUNTERS = {
+    "user": ("app_models_usercounters", "user_id", "varchar", ["requests_count", "proposals_count"]),
+    "category": (
+        "app_models_servicecategorycounters",
+        "category_id",
+        "varchar",
+        ["active_requests_count", "proposals_count"],
+    ),
+    "skill": ("app_models_serviceproposalskillcounters", "skill_id", "bigint", ["proposals_count"]),
+}
+
+
+def build_add_function_sql(name, table, key, key_type, columns):
+    return CREATE_ADD_FUNCTION_SQL.format(
+        name=name,
+        table=table,
+        key=key,
+        key_type=key_type,
+        args=", ".join(f"{column}_delta integer" for column in columns),
+        updates=", ".join(f"{column} = {column} + {column}_delta" for column in columns),
+        positive=" AND ".join(f"{column}_delta >= 0" for column in columns),
+        columns=", ".join(columns),
+        deltas=", ".join(f"{column}_delta" for column in columns),
+        conflict_updates=", ".join(
+            f"{column} = {table}.{column} + EXCLUDED.{column}" for column in columns
+        ),
+    )
+
+
+# Each trigger compares the counted keys of the old and the new row, so that
+# the updates not changing them (most of them) do not write any counter
+CREATE_TRIGGER_FUNCTIONS_SQL = """
+CREATE OR REPLACE FUNCTION app_models_servicerequest_counters() RETURNS trigger AS $$
+DECLARE
+    old_user varchar;
+    new_user varchar;
+    old_category varchar;
+    new_category varchar;
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        old_user := OLD.user_id;
+        IF OLD.status = 'active' THEN
+            old_category := OLD.category_id;
+        END IF;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        new_user := NEW.user_id;
+        IF NEW.status = 'active' THEN
+            new_category := NEW.category_id;
+        END IF;
+    END IF;
+    IF old_user IS DISTINCT FROM new_user THEN
+        PERFORM app_models_add_user_counters(old_user, -1, 0);
+        PERFORM app_models_add_user_counters(new_user, 1, 0);
+    END IF;
+    IF old_category IS DISTINCT FROM new_category THEN
+        PERFORM app_models_add_category_counters(old_category, -1, 0);
+        PERFORM app_models_add_category_counters(new_category, 1, 0);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION app_models_serviceproposal_counters() RETURNS trigger AS $$
+DECLARE
+    old_user varchar;
+    new_user varchar;
+    old_category varchar;
+    new_category varchar;
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        old_user := OLD.user_id;
+        old_category := OLD.category_id;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        new_user := NEW.user_id;
+        new_category := NEW.category_id;
+    END IF;
+    IF old_user IS DISTINCT FROM new_user THEN
+        PERFORM app_models_add_user_counters(old_user, 0, -1);
+        PERFORM app_models_add_user_counters(new_user, 0, 1);
+    END IF;
+    IF old_category IS DISTINCT FROM new_category THEN
+        PERFORM app_models_add_category_counters(old_category, 0, -1);
+        PERFORM app_models_add_category_counters(new_category, 0, 1);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION app_models_serviceproposal_skills_counters() RETURNS trigger AS $$
+DECLARE
+    old_skill bigint;
+    new_skill bigint;
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        old_skill := OLD.serviceproposalskill_id;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        new_skill := NEW.serviceproposalskill_id;
+    END IF;
+    IF old_skill IS DISTINCT FROM new_skill THEN
+        PERFORM app_models_add_skill_counters(old_skill, -1);
+        PERFORM app_models_add_skill_counters(new_skill, 1);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+DROP_FUNCTIONS_SQL = """
+DROP FUNCTION IF EXISTS app_models_servicerequest_counters();
+DROP FUNCTION IF EXISTS app_models_serviceproposal_counters();
+DROP FUNCTION IF EXISTS app_models_serviceproposal_skills_counters();
+DROP FUNCTION IF EXISTS app_models_add_user_counters(varchar, integer, integer);
+DROP FUNCTION IF EXISTS app_models_add_category_counters(varchar, integer, integer);
+DROP FUNCTION IF EXISTS app_models_add_skill_counters(bigint, integer);
+"""
+
+COUNTED_TABLES = (
+    "app_models_servicerequest",
+    "app_models_serviceproposal",
+    "app_models_serviceproposal_skills",
+)
+
+CREATE_TRIGGER_SQL = """
+CREATE TRIGGER {table}_counters_trigger
+AFTER INSERT OR UPDATE OR DELETE ON {table}
+FOR EACH ROW EXECUTE FUNCTION {table}_counters();
+"""
+
+DROP_TRIGGER_SQL = "DROP TRIGGER IF EXISTS {table}_counters_trigger ON {table};"
+
+# Initial counts, see also utils/counter_utils.py reconciling them later
+BACKFILL_SQL = """
+INSERT INTO app_models_usercounters (user_id, requests_count, proposals_count)
+SELECT u.uuid, coalesce(r.total, 0), coalesce(p.total, 0)
+FROM app_models_user u
+LEFT JOIN (
+    SELECT user_id, count(*) AS total FROM app_models_servicerequest GROUP BY user_id
+) r ON r.user_id = u.uuid
+LEFT JOIN (
+    SELECT user_id, count(*) AS total FROM app_models_serviceproposal GROUP BY user_id
+) p ON p.user_id = u.uuid;
+
+INSERT INTO app_models_servicecategorycounters (category_id, active_requests_count, proposals_count)
+SELECT c.uuid, coalesce(r.total, 0), coalesce(p.total, 0)
+FROM app_models_servicecategory c
+LEFT JOIN (
+    SELECT category_id, count(*) AS total FROM app_models_servicerequest
+    WHERE status = 'active' GROUP BY category_id
+) r ON r.category_id = c.uuid
+LEFT JOIN (
+    SELECT category_id, count(*) AS total FROM app_models_serviceproposal GROUP BY category_id
+) p ON p.category_id = c.uuid;
+
+INSERT INTO app_models_serviceproposalskillcounters (skill_id, proposals_count)
+SELECT s.id, coalesce(ps.total, 0)
+FROM app_models_serviceproposalskill s
+LEFT JOIN (
+    SELECT serviceproposalskill_id, count(*) AS total FROM app_models_serviceproposal_skills
+    GROUP BY serviceproposalskill_id
+) ps ON ps.serviceproposalskill_id = s.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_models', '0010_user_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceCategoryCounters',
+            fields=[
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to='app_models.servicecategory')),
+                ('active_requests_count', models.IntegerField(default=0)),
+                ('proposals_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'service category counters',
+                'verbose_name_plural': 'Services Categories Counters',
+            },
+        ),
+        migrations.CreateModel(
+            name='ServiceProposalSkillCounters',
+            fields=[
+                ('skill', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to='app_models.serviceproposalskill')),
+                ('proposals_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'service proposal skill counters',
+                'verbose_name_plural': 'Services Proposals Skills Counters',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserCounters',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('requests_count', models.IntegerField(default=0)),
+                ('proposals_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'user counters',
+                'verbose_name_plural': 'Users Counters',
+            },
+        ),
+        *[
+            migrations.RunSQL(build_add_function_sql(name, *counters), migrations.RunSQL.noop)
+            for name, counters in COUNTERS.items()
+        ],
+        migrations.RunSQL(CREATE_TRIGGER_FUNCTIONS_SQL, DROP_FUNCTIONS_SQL),
+        # Count and create the triggers in the same transaction, with the
+        # tables locked so that no service is missed in between
+        migrations.RunSQL(
+            "".join(f"LOCK TABLE {table} IN SHARE MODE;" for table in COUNTED_TABLES)
+            + BACKFILL_SQL
+            + "".join(CREATE_TRIGGER_SQL.format(table=table) for table in COUNTED_TABLES),
+            "".join(DROP_TRIGGER_SQL.format(table=table) for table in COUNTED_TABLES),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_models', '0011_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userverification',
+            name='review_photo',
+            field=models.ImageField(blank=True, upload_to='verification_photos/review/'),
+        ),
+        migrations.AddField(
+            model_name='userverification',
+            name='thumbnail',
+            field=models.ImageField(blank=True, upload_to='verification_photos/thumbnails/'),
+        ),
+    ]
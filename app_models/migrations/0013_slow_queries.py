@@ -0,0 +1,36 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_models', '0012_verification_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('fingerprint', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('normalized_sql', models.TextField()),
+                ('sample_sql', models.TextField()),
+                ('route', models.CharField(blank=True, max_length=255)),
+                ('view_frame', models.CharField(blank=True, max_length=255)),
+                ('serializer_frame', models.CharField(blank=True, max_length=255)),
+                ('count', models.IntegerField(default=0)),
+                ('total_duration', models.FloatField(default=0)),
+                ('max_duration', models.FloatField(default=0)),
+                ('first_seen_at', models.DateTimeField()),
+                ('last_seen_at', models.DateTimeField(db_index=True)),
+                ('explain_plan', models.TextField(blank=True)),
+                ('explained_at', models.DateTimeField(blank=True, null=True)),
+                ('seq_scan_tables', models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                'verbose_name': 'slow query',
+                'verbose_name_plural': 'Slow Queries',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-18 21:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_models', '0013_slow_queries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeedVersion',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.CharField(max_length=64)),
+                ('seeded_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'seed version',
+                'verbose_name_plural': 'Seed Versions',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-18 21:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_models', '0014_seed_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.CharField(max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'cache version',
+                'verbose_name_plural': 'Cache Versions',
+            },
+        ),
+    ]
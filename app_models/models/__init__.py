@@ -4,5 +4,9 @@ from .service import (
     ServiceCategory,
     ServiceProposalSkill,
 )
+from .counters import ServiceCategoryCounters, ServiceProposalSkillCounters, UserCounters
 from .socials import UserSocials, ServiceRequestSocials
-from .user import User, UserVerification
+from .user import RevokedToken, User, UserVerification
+from .monitoring import SlowQuery
+from .seed import SeedVersion
+from .cache import CacheVersion
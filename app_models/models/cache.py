@@ -0,0 +1,16 @@
+from django.db import models
+
+
+class CacheVersion(models.Model):
+    """Version of data cached by every process, changed to invalidate their copies."""
+
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "cache version"
+        verbose_name_plural = "Cache Versions"
+
+    def __str__(self):
+        return f"{self.name} {self.version[:12]}"
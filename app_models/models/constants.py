@@ -13,3 +13,12 @@ class ServiceRequestStatus(str, Enum):
 
 
 SERVICE_REQUEST_STATUS = build_tuple_types(ServiceRequestStatus)
+
+
+# Category used when a service is created without category
+DEFAULT_SERVICE_CATEGORY = {
+    "fr_name": "Autres",
+    "fr_description": "Autres services non classés ailleurs",
+    "en_name": "Others",
+    "en_description": "Other unclassified services",
+}
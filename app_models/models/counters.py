@@ -0,0 +1,53 @@
+from django.db import models
+
+from app_models.models.service import ServiceCategory, ServiceProposalSkill
+from app_models.models.user import User
+
+# The counters are maintained by database triggers on the services tables,
+# in the transaction changing the services, see
+# app_models/migrations/0011_counters.py. Fix a drift with
+# `python manage.py reconcile_counters`.
+
+
+class UserCounters(models.Model):
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="counters"
+    )
+    requests_count = models.IntegerField(default=0)  # Whatever their status
+    proposals_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "user counters"
+        verbose_name_plural = "Users Counters"
+
+    def __str__(self):
+        return f"Counters of {self.user_id}"
+
+
+class ServiceCategoryCounters(models.Model):
+    category = models.OneToOneField(
+        ServiceCategory, on_delete=models.CASCADE, primary_key=True, related_name="counters"
+    )
+    active_requests_count = models.IntegerField(default=0)
+    proposals_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "service category counters"
+        verbose_name_plural = "Services Categories Counters"
+
+    def __str__(self):
+        return f"Counters of {self.category_id}"
+
+
+class ServiceProposalSkillCounters(models.Model):
+    skill = models.OneToOneField(
+        ServiceProposalSkill, on_delete=models.CASCADE, primary_key=True, related_name="counters"
+    )
+    proposals_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "service proposal skill counters"
+        verbose_name_plural = "Services Proposals Skills Counters"
+
+    def __str__(self):
+        return f"Counters of {self.skill_id}"
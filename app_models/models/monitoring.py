@@ -0,0 +1,30 @@
+from django.db import models
+
+
+class SlowQuery(models.Model):
+    """
+    SQL queries slower than SLOW_QUERY_THRESHOLD, aggregated by fingerprint,
+    see SlowQueryMiddleware.
+    """
+
+    fingerprint = models.CharField(max_length=40, primary_key=True)  # SHA-1 of the normalized SQL
+    normalized_sql = models.TextField()
+    sample_sql = models.TextField()  # The slowest occurrence, with its parameters
+    route = models.CharField(max_length=255, blank=True)  # URL pattern of the slowest occurrence
+    view_frame = models.CharField(max_length=255, blank=True)
+    serializer_frame = models.CharField(max_length=255, blank=True)
+    count = models.IntegerField(default=0)
+    total_duration = models.FloatField(default=0)  # In ms
+    max_duration = models.FloatField(default=0)  # In ms
+    first_seen_at = models.DateTimeField()
+    last_seen_at = models.DateTimeField(db_index=True)
+    explain_plan = models.TextField(blank=True)
+    explained_at = models.DateTimeField(null=True, blank=True)
+    seq_scan_tables = models.CharField(max_length=255, blank=True)  # Read by sequential scans in the plan
+
+    class Meta:
+        verbose_name = "slow query"
+        verbose_name_plural = "Slow Queries"
+
+    def __str__(self):
+        return self.normalized_sql[:80]
@@ -0,0 +1,16 @@
+from django.db import models
+
+
+class SeedVersion(models.Model):
+    """Version of the data seeded by `python manage.py seed`."""
+
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.CharField(max_length=64)  # SHA-256 of the seed data
+    seeded_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "seed version"
+        verbose_name_plural = "Seed Versions"
+
+    def __str__(self):
+        return f"{self.name} {self.version[:12]}"
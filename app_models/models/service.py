@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from app_models.models.user import User
@@ -47,6 +49,8 @@ class ServiceRequest(models.Model):
         related_name="requests",
         null=True,
     )
+    # Maintained by a database trigger on title and description changes
+    search_vector = SearchVectorField(null=True, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -54,6 +58,35 @@ class ServiceRequest(models.Model):
     class Meta:
         verbose_name = "service request"
         verbose_name_plural = "Services Requests"
+        indexes = [
+            # Partial indexes serving the active requests listing, its filters
+            # and its (updated_at, uuid) ordering used by offset and cursor modes
+            models.Index(
+                fields=["-updated_at", "-uuid"],
+                name="srv_req_active_updated_idx",
+                condition=models.Q(status=ServiceRequestStatus.ACTIVE.value),
+            ),
+            models.Index(
+                fields=["category", "-updated_at", "-uuid"],
+                name="srv_req_active_category_idx",
+                condition=models.Q(status=ServiceRequestStatus.ACTIVE.value),
+            ),
+            models.Index(
+                fields=["city", "-updated_at", "-uuid"],
+                name="srv_req_active_city_idx",
+                condition=models.Q(status=ServiceRequestStatus.ACTIVE.value),
+            ),
+            models.Index(
+                fields=["fixed_amount"],
+                name="srv_req_active_amount_idx",
+                condition=models.Q(status=ServiceRequestStatus.ACTIVE.value),
+            ),
+            GinIndex(fields=["search_vector"], name="srv_req_search_idx"),
+            # Requests of a user, latest first, for the profiles
+            models.Index(
+                fields=["user", "-updated_at", "-uuid"], name="srv_req_user_updated_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -86,12 +119,25 @@ class ServiceProposal(models.Model):
         related_name="proposals",
         null=True,
     )
+    # Maintained by a database trigger on title and description changes
+    search_vector = SearchVectorField(null=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "service proposal"
         verbose_name_plural = "Services Proposals"
+        indexes = [
+            models.Index(fields=["-updated_at", "-uuid"], name="srv_prop_updated_idx"),
+            models.Index(
+                fields=["category", "-updated_at", "-uuid"], name="srv_prop_category_idx"
+            ),
+            GinIndex(fields=["search_vector"], name="srv_prop_search_idx"),
+            models.Index(
+                fields=["user", "-updated_at", "-uuid"], name="srv_prop_user_updated_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.title
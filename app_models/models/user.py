@@ -42,6 +42,10 @@ class User(AbstractUser):
 class UserVerification(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     verification_photo = models.ImageField(upload_to="verification_photos/")
+    # Downscaled JPEG renditions without metadata, built in the background from
+    # the photo, see utils/image_utils.py
+    review_photo = models.ImageField(upload_to="verification_photos/review/", blank=True)
+    thumbnail = models.ImageField(upload_to="verification_photos/thumbnails/", blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -51,3 +55,18 @@ class UserVerification(models.Model):
 
     def __str__(self):
         return f"Verification photo for {self.user.get_full_name()}"
+
+
+class RevokedToken(models.Model):
+    """Token revoked before its expiration, e.g. on logout."""
+
+    digest = models.CharField(max_length=64, primary_key=True)  # SHA-256 of the token
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "revoked token"
+        verbose_name_plural = "Revoked Tokens"
+
+    def __str__(self):
+        return self.digest
@@ -1,6 +1,10 @@
+import hashlib
+import json
 import logging
 
-from app_models.models import ServiceCategory, User
+from django.db import connection, transaction
+
+from app_models.models import SeedVersion, ServiceCategory, User
 from backend.settings import (
     SUPER_USER_EMAIL,
     SUPER_FIRST_NAME,
@@ -8,27 +12,14 @@ from backend.settings import (
     SUPER_USER_PASSWORD,
     SUPER_USER_PHONE,
 )
+from utils.cache_utils import bump_reference_data_version
 
-# Create super admin user
-logging.info("Creating super admin user...")
-try:
-    super_admin = User.objects.create_superuser(
-        username=SUPER_USER_EMAIL,
-        email=SUPER_USER_EMAIL,
-        phone=SUPER_USER_PHONE,
-        password=SUPER_USER_PASSWORD,
-        first_name=SUPER_FIRST_NAME,
-        last_name=SUPER_LAST_NAME,
-        is_active=True,
-        is_verified=True,
-    )
+SEED_NAME = "initialize_db"
 
-except Exception as e:
-    logging.warning(f"Super admin user already exists: {e}")
+# Key of the PostgreSQL advisory lock serializing the concurrent seeds
+SEED_LOCK_KEY = 237001
 
-# Create categories
-logging.info("Creating service proposal categories...")
-categories = [
+CATEGORIES = [
     {
         "fr_name": "Technologie & Informatique",
         "fr_description": "Développement de logiciels, Cybersécurité, Science des données & Analyse, Support informatique & Administration système, Informatique en nuage, Conception UX/UI, Intelligence artificielle & Apprentissage automatique, Développement de blockchain, Développement de jeux",
@@ -127,10 +118,68 @@ categories = [
     }
 ]
 
-for category in categories:
-    ServiceCategory.objects.get_or_create(
-        fr_name=category["fr_name"],
-        fr_description=category["fr_description"],
-        en_name=category["en_name"],
-        en_description=category["en_description"],
+
+def get_seed_version() -> str:
+    """
+    Get the version of the seed data, changing with the categories or the
+    super admin email.
+
+    :return:
+    """
+    data = json.dumps({"categories": CATEGORIES, "super_user": SUPER_USER_EMAIL}, sort_keys=True)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def seed_super_admin():
+    """Create the super admin user if missing, its password is never reset."""
+    if User.objects.filter(email=SUPER_USER_EMAIL).exists():
+        return
+
+    logging.info("Creating super admin user...")
+    User.objects.create_superuser(
+        username=SUPER_USER_EMAIL,
+        email=SUPER_USER_EMAIL,
+        phone=SUPER_USER_PHONE,
+        password=SUPER_USER_PASSWORD,
+        first_name=SUPER_FIRST_NAME,
+        last_name=SUPER_LAST_NAME,
+        is_active=True,
+        is_verified=True,
+    )
+
+
+def seed_categories():
+    """Insert the missing categories and update the others, in one statement."""
+    logging.info("Creating service proposal categories...")
+    ServiceCategory.objects.bulk_create(
+        [ServiceCategory(**category) for category in CATEGORIES],
+        update_conflicts=True,
+        unique_fields=["fr_name"],
+        update_fields=["fr_description", "en_name", "en_description"],
     )
+    # bulk_create sends no post_save signal
+    transaction.on_commit(bump_reference_data_version)
+
+
+def seed_database(force: bool = False) -> bool:
+    """
+    Seed the super admin and the categories, unless this version of the seed
+    data was already seeded. The containers starting together seed one after
+    the other.
+
+    :param force: Seed even if the version is unchanged.
+    :return: True if the database was seeded.
+    """
+    version = get_seed_version()
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [SEED_LOCK_KEY])
+
+        if not force and SeedVersion.objects.filter(name=SEED_NAME, version=version).exists():
+            return False
+
+        seed_super_admin()
+        seed_categories()
+        SeedVersion.objects.update_or_create(name=SEED_NAME, defaults={"version": version})
+
+    return True
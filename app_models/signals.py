@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app_models.models import ServiceCategory, ServiceProposalSkill, User, UserVerification
+from utils.cache_utils import bump_reference_data_version
+from utils.db_utils import count_opened_connection
+from utils.image_utils import schedule_verification_photo_processing
+from utils.user_utils import invalidate_cached_user
+
+
+@receiver(post_save, sender=ServiceCategory)
+@receiver(post_delete, sender=ServiceCategory)
+@receiver(post_save, sender=ServiceProposalSkill)
+@receiver(post_delete, sender=ServiceProposalSkill)
+def invalidate_reference_data(sender, **kwargs):
+    """Invalidate the cached categories and skills of all the processes."""
+    # Wait for the commit, otherwise another process could cache the old rows
+    # under the new version
+    transaction.on_commit(bump_reference_data_version)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Drop the cached snapshot of a user, e.g. after an is_verified flip."""
+    invalidate_cached_user(instance)
+
+
+@receiver(post_save, sender=UserVerification)
+def process_verification_photo(sender, instance, **kwargs):
+    """Build the renditions of a new or replaced verification photo."""
+    # Wait for the commit, otherwise the workers could read the previous photo
+    transaction.on_commit(lambda: schedule_verification_photo_processing(instance.pk))
+
+
+@receiver(connection_created)
+def count_database_connection(sender, connection, **kwargs):
+    """Count the connections opened by the process, for the database stats."""
+    count_opened_connection(connection)
@@ -32,7 +32,7 @@ if os.path.exists(env_file):
 SECRET_KEY = 'django-insecure-7d3-+or0l!an*5js2(gj!w(gyq6w(fl_6mfp*a!dzt1^0q)9&k'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = env("DEBUG", True, cast=bool)
 
 ALLOWED_HOSTS = ["*"]
 
@@ -51,6 +51,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'app_models',
     'endpoints',
     'drf_yasg',
@@ -60,12 +61,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'middlewares.timing_middleware.RequestTimingMiddleware',
+    'middlewares.slow_query_middleware.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'middlewares.replica_middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'middlewares.profiling_middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -92,6 +97,22 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+# https://docs.djangoproject.com/en/5.1/ref/databases/#connection-pool
+# The sync workers (gunicorn) keep their connection between requests, checked
+# before being reused. The ASGI deployments run the views in many threads and
+# share a psycopg 3 pool instead, the connections then return to the pool at
+# the end of each request.
+# The pool max size, times the number of processes, must stay below the
+# max_connections of PostgreSQL.
+
+DATABASE_POOL = env("DATABASE_POOL", False, cast=bool)
+DATABASE_CONN_MAX_AGE = env("DATABASE_CONN_MAX_AGE", 600, cast=int)     # In seconds
+DATABASE_POOL_OPTIONS = {
+    'min_size': env("DATABASE_POOL_MIN_SIZE", 2, cast=int),
+    'max_size': env("DATABASE_POOL_MAX_SIZE", 10, cast=int),
+    'timeout': env("DATABASE_POOL_TIMEOUT", 10, cast=float),        # Wait for a free connection, in seconds
+    'max_idle': env("DATABASE_POOL_MAX_IDLE", 300, cast=float),     # Close the unused connections, in seconds
+}
 
 DATABASES = {
     'default': {
@@ -101,9 +122,51 @@ DATABASES = {
         'PASSWORD': f'{env("POSTGRES_DB_PASSWORD", "password")}',
         'HOST': f'{env("POSTGRES_DB_HOST", "127.0.0.1")}',
         'PORT': f'{env("POSTGRES_DB_PORT", 5432, cast=int)}',
+        # Persistent connections can not be used with the pool
+        'CONN_MAX_AGE': 0 if DATABASE_POOL else DATABASE_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'sslmode': env("POSTGRES_DB_SSLMODE", "require"),
+            **({'pool': DATABASE_POOL_OPTIONS} if DATABASE_POOL else {}),
+        },
+    }
+}
+
+# Read replicas
+# Streaming replicas of the default database, "host" or "host:port" comma
+# separated. The safe methods of the API read from them, see
+# ReplicaRoutingMiddleware, the rest uses the primary.
+
+DATABASE_REPLICAS = []
+for index, replica_host in enumerate(env("POSTGRES_DB_REPLICA_HOSTS", "", cast=list), start=1):
+    host, _, port = replica_host.partition(":")
+    DATABASE_REPLICAS.append(f'replica_{index}')
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
         'OPTIONS': {
-            'sslmode': 'require',
+            **DATABASES['default']['OPTIONS'],
+            # Fall back to the primary quickly when a replica is down
+            'connect_timeout': env("POSTGRES_DB_REPLICA_CONNECT_TIMEOUT", 2, cast=int),
         },
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['utils.db_router.ReplicaRouter']
+DATABASE_REPLICA_PATH_PREFIX = "/api/"
+DATABASE_REPLICA_STICKY_SECONDS = env("DATABASE_REPLICA_STICKY_SECONDS", 5, cast=int)  # Reads of a user on the primary after a write
+DATABASE_REPLICA_MAX_LAG = env("DATABASE_REPLICA_MAX_LAG", 10, cast=float)  # In seconds, beyond it the primary is used
+DATABASE_REPLICA_LAG_CHECK_INTERVAL = env("DATABASE_REPLICA_LAG_CHECK_INTERVAL", 5, cast=float)  # In seconds
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Shared by the workers of a container, it holds the replica pinning of the clients
+
+CACHES = {
+    'default': {
+        'BACKEND': env("CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        'LOCATION': env("CACHE_LOCATION", "/tmp/x-project-cache"),
     }
 }
 
@@ -125,6 +188,28 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# PASSWORD HASHING SETTINGS
+# The hasher of the selected profile hashes the passwords, the other ones only
+# verify the existing hashes, which are upgraded when their user logs in.
+# Compare the profiles with `python manage.py benchmark_logins`.
+PASSWORD_HASHER_PROFILES = {
+    "pbkdf2": "utils.password_utils.TunedPBKDF2PasswordHasher",
+    "argon2": "utils.password_utils.TunedArgon2PasswordHasher",
+    "scrypt": "utils.password_utils.TunedScryptPasswordHasher",
+}
+PASSWORD_HASHER_PROFILE = env("PASSWORD_HASHER_PROFILE", "pbkdf2")
+PASSWORD_HASHERS = [PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]] + [
+    hasher
+    for profile, hasher in PASSWORD_HASHER_PROFILES.items()
+    if profile != PASSWORD_HASHER_PROFILE
+]
+PASSWORD_PBKDF2_ITERATIONS = env("PASSWORD_PBKDF2_ITERATIONS", 0, cast=int)  # 0 keeps Django default
+PASSWORD_ARGON2_TIME_COST = env("PASSWORD_ARGON2_TIME_COST", 2, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = env("PASSWORD_ARGON2_MEMORY_COST", 102400, cast=int)  # In KiB
+PASSWORD_ARGON2_PARALLELISM = env("PASSWORD_ARGON2_PARALLELISM", 8, cast=int)
+PASSWORD_SCRYPT_WORK_FACTOR = env("PASSWORD_SCRYPT_WORK_FACTOR", 2 ** 14, cast=int)
+PASSWORD_REHASH_WORKERS = env("PASSWORD_REHASH_WORKERS", 2, cast=int)  # 0 rehashes during the login
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -145,6 +230,27 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Static files get a hash of their content in their name when collected, they
+# are then cached for a year by the browsers
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"},
+}
+
+# MEDIA AND STATIC FILES SERVING SETTINGS
+# "django": sent by the workers (sendfile() with gunicorn).
+# "x-accel": sent by nginx, from an internal location FILES_ACCEL_REDIRECT_PREFIX
+# followed by "media/" or "static/".
+# "x-sendfile": sent by Apache (mod_xsendfile) or lighttpd.
+FILES_SERVING_MODE = env("FILES_SERVING_MODE", "django")
+FILES_ACCEL_REDIRECT_PREFIX = env("FILES_ACCEL_REDIRECT_PREFIX", "/protected-files/")
+
+# VERIFICATION PHOTOS SETTINGS
+VERIFICATION_PHOTO_MAX_SIZE = env("VERIFICATION_PHOTO_MAX_SIZE", 10 * 1024 * 1024, cast=int)  # In bytes
+VERIFICATION_REVIEW_SIZE = env("VERIFICATION_REVIEW_SIZE", 1600, cast=int)  # Longest side, in pixels
+VERIFICATION_THUMBNAIL_SIZE = env("VERIFICATION_THUMBNAIL_SIZE", 200, cast=int)  # Longest side, in pixels
+IMAGE_PROCESSING_WORKERS = env("IMAGE_PROCESSING_WORKERS", 2, cast=int)  # 0 processes during the request
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -163,6 +269,7 @@ SUPER_USER_PASSWORD = env("SUPER_USER_PASSWORD", "password")
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "rest_framework.schemas.coreapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
+        "middlewares.auth_middleware.ConnectedUserAuthentication",
         "rest_framework.authentication.TokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
@@ -175,13 +282,82 @@ JWT_AUTH = {
     "JWT_EXPIRATION_DELTA": datetime.timedelta(minutes=TOKEN_VALIDITY),
     "JWT_ALLOW_REFRESH": True,
 }
+TOKEN_CACHE_MAX_ENTRIES = env("TOKEN_CACHE_MAX_ENTRIES", 10000, cast=int)  # 0 disables the cache
+TOKEN_REVOCATION_REFRESH = env("TOKEN_REVOCATION_REFRESH", 5, cast=int)  # In seconds
+
+# REFERENCE DATA SETTINGS
+# Categories and skills, kept in memory by each process under a version stored in the database
+REFERENCE_DATA_VERSION_TTL = env("REFERENCE_DATA_VERSION_TTL", 5, cast=int)  # In seconds, 0 reads the version at each request
+
+# PAGINATION SETTINGS
+PAGINATION_MAX_SIZE = env("PAGINATION_MAX_SIZE", 100, cast=int)  # Items per page of the listings
+
+# FULL TEXT SEARCH SETTINGS
+SEARCH_MAX_RESULTS = env("SEARCH_MAX_RESULTS", 1000, cast=int)  # Most recently updated matches listed and ranked
+
+# CONNECTED USER CACHE SETTINGS
+USER_CACHE_TTL = env("USER_CACHE_TTL", 30, cast=int)  # In seconds, 0 disables the cache
+USER_CACHE_MAX_ENTRIES = env("USER_CACHE_MAX_ENTRIES", 10000, cast=int)
+LAST_LOGIN_FLUSH_INTERVAL = env("LAST_LOGIN_FLUSH_INTERVAL", 10, cast=int)  # In seconds, 0 writes at login
+
+# COUNTERS SETTINGS
+CATEGORY_COUNTERS_TTL = env("CATEGORY_COUNTERS_TTL", 30, cast=int)  # In seconds, 0 disables the cache
+
+# USER PROFILE SETTINGS
+PROFILE_LATEST_ITEMS = env("PROFILE_LATEST_ITEMS", 5, cast=int)  # Listings embedded in the profiles
+
+# REQUEST TIMING SETTINGS
+# Query count, SQL time, view, serialization and render times of each request,
+# see RequestTimingMiddleware
+REQUEST_TIMING = env("REQUEST_TIMING", True, cast=bool)
+REQUEST_TIMING_HEADER = env("REQUEST_TIMING_HEADER", False, cast=bool)  # Send them to every client in a Server-Timing header
+REQUEST_QUERY_BUDGET = env("REQUEST_QUERY_BUDGET", 15, cast=int)  # SQL queries, beyond it a warning is logged
+
+# SLOW QUERY SETTINGS
+# SQL queries aggregated by fingerprint in the SlowQuery table, see SlowQueryMiddleware
+SLOW_QUERY_THRESHOLD = env("SLOW_QUERY_THRESHOLD", 100, cast=float)  # In ms, 0 disables it
+SLOW_QUERY_EXPLAIN_TIMEOUT = env("SLOW_QUERY_EXPLAIN_TIMEOUT", 10, cast=int)  # In s, of EXPLAIN ANALYZE
+
+# PROFILING SETTINGS
+# Stack sampling of live requests, see ProfilingMiddleware
+PROFILING_DIR = env("PROFILING_DIR", "/tmp/x-project-profiles")
+PROFILING_SAMPLE_RATE = env("PROFILING_SAMPLE_RATE", 0.0, cast=float)  # Fraction of the requests, 0 disables it
+PROFILING_MIN_DURATION = env("PROFILING_MIN_DURATION", 500, cast=int)  # In ms, faster sampled requests are dropped
+PROFILING_INTERVAL = env("PROFILING_INTERVAL", 5, cast=float)  # In ms, between two samples of the stack
+PROFILING_MAX_PROFILES = env("PROFILING_MAX_PROFILES", 500, cast=int)  # The oldest ones are deleted
+PROFILING_PROFILES_PER_ROUTE = env("PROFILING_PROFILES_PER_ROUTE", 10, cast=int)  # Listed in the admin
+
+# METRICS SETTINGS
+# Prometheus metrics on /metrics, aggregated over the gunicorn workers through
+# PROMETHEUS_MULTIPROC_DIR (environment variable, see gunicorn.conf.py)
+METRICS_TOKEN = env("METRICS_TOKEN", "")  # Bearer token of the scraper, empty limits /metrics to the staff unless DEBUG
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "message": {"format": "%(message)s"},
+    },
+    "handlers": {
+        "request_timing": {"class": "logging.StreamHandler", "formatter": "message"},
+    },
+    "loggers": {
+        # One JSON line per request
+        "request_timing": {
+            "handlers": ["request_timing"],
+            "level": env("REQUEST_TIMING_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
 
 # SWAGGER SETTINGS
 SWAGGER_SETTINGS = {
     "SECURITY_DEFINITIONS": {
         "Bearer": {"type": "apiKey", "name": "Authorization", "in": "header"}
     },
-    "DEFAULT_GENERATOR_CLASS": "utils.swagger_utils.CustomSchemaGenerator",
+    # Precomputed schema read by the UI, see endpoints/docs
+    "SPEC_URL": "/swagger.json",
 }
-
-SCHEME = env("SCHEME", "http")
+OPENAPI_SCHEMA_DIR = BASE_DIR / "openapi"  # Written by `python manage.py generate_openapi_schema`
+OPENAPI_SCHEMA_MAX_AGE = env("OPENAPI_SCHEMA_MAX_AGE", 86400, cast=int)  # In seconds, then revalidated with its ETag
@@ -15,35 +15,24 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
 
-from backend import settings
+from app_models.admin import captured_profiles_view, download_profile_view
+from endpoints.monitoring.api.monitoring_api import serve_metrics
+from utils.swagger_utils import API_VERSION
+
 
-API_VERSION = "v1"
-schema_view = get_schema_view(
-    openapi.Info(
-        title="X-Project API",
-        default_version=f"{API_VERSION}",
-        description="API of the X-Project backend project",
-        contact=openapi.Contact(
-            email="edghimakoll@gmail.com",
-            name="Edmond Makolle",
-        ),
-    ),
-)
 START_URL = f"api/{API_VERSION}"
 
 urlpatterns = [
+    path("admin/profiles/", admin.site.admin_view(captured_profiles_view)),
+    path("admin/profiles/<str:profile_id>.folded", admin.site.admin_view(download_profile_view)),
     path("admin/", admin.site.urls),
     path(f"{START_URL}/", include("endpoints.auth.urls")),
     path(f"{START_URL}/services/", include("endpoints.services.urls")),
-    path("swagger<format>/", schema_view.without_ui(cache_timeout=0), name="schema-json"),
-    path("", schema_view.with_ui("swagger", cache_timeout=0)),
+    path(f"{START_URL}/monitoring/", include("endpoints.monitoring.urls")),
+    path("metrics", serve_metrics),
+    path("", include("endpoints.media.urls")),
+    path("", include("endpoints.docs.urls")),
 ]
-
-urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
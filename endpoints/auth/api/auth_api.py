@@ -1,15 +1,21 @@
 import logging
 
 import jwt
-from django.utils import timezone
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework_jwt.settings import api_settings
 from rest_framework_jwt.views import ObtainJSONWebToken, RefreshJSONWebToken
 
-from app_models.models.user import User
-from serializers.auth_serializer import LoginSerializer, RefreshSerializer
+from middlewares.auth_middleware import check_is_connected
+from serializers.auth_serializer import (
+    LoginSerializer,
+    LogoutSerializer,
+    RefreshSerializer,
+)
+from utils.token_utils import parse_authorization_header, revoke_token
+from utils.user_utils import last_login_recorder
 
 
 class LoginAPIView(ObtainJSONWebToken):
@@ -33,8 +39,9 @@ class LoginAPIView(ObtainJSONWebToken):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Access all data in the POST request
-        token_data = super(LoginAPIView, self).post(request, *args, **kwargs).data
+        # The serializer authenticated the user and built the token, the parent
+        # view would do it all over again
+        token_data = serializer.validated_data
         try:
             user_data = jwt.decode(token_data["token"], verify=False)
         except Exception as e:
@@ -52,17 +59,9 @@ class LoginAPIView(ObtainJSONWebToken):
             }
         )
         
-        # Update the user last login
+        # Update the user last login, written in batches in the background
         try:
-            user = User.objects.get(email=user_data["email"])
-            user.last_login = timezone.now()
-            user.save()
-        
-        except User.DoesNotExist:
-            user = User.objects.get(phone=user_data["phone"])
-            user.last_login = timezone.now()
-            user.save()
-        
+            last_login_recorder.record(token_data["user"])
         except:
             logging.exception("Error updating user last login")
 
@@ -116,3 +115,40 @@ class RefreshAPIView(RefreshJSONWebToken):
             {"token": token_data["token"], "refresh": refresh_token},
             status=status.HTTP_200_OK,
         )
+
+
+class LogoutAPIView(APIView):
+    serializer_class = LogoutSerializer
+
+    @swagger_auto_schema(
+        operation_id="logout",
+        operation_description="Endpoint revoking the token of the request and the given refresh token",
+        operation_summary="Logout an user",
+        request_body=LogoutSerializer,
+        responses={200: "Message"},
+        tags=["Auth"],
+        security=[{"Bearer": []}],
+    )
+    @check_is_connected
+    def post(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            logging.exception(serializer.errors)
+            return Response(
+                {"error": "Error while trying to logout"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        revoke_token(parse_authorization_header(request.META["HTTP_AUTHORIZATION"]))
+
+        refresh_token = serializer.validated_data.get("refresh", None)
+        if refresh_token:
+            try:
+                revoke_token(refresh_token)
+            except jwt.InvalidTokenError:
+                # An expired or invalid refresh token can not be used anyway
+                logging.warning("Invalid refresh token given on logout")
+
+        return Response(
+            {"message": "Logged out successfully !"}, status=status.HTTP_200_OK
+        )
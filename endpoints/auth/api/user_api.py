@@ -1,16 +1,18 @@
 import logging
 import os
 
+from django.conf import settings
 from django.contrib.auth.hashers import make_password
-from django.core.files.base import ContentFile
+from django.db import transaction
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from app_models.models import User, UserVerification
+from app_models.models import ServiceProposal, ServiceRequest, User, UserVerification
 from middlewares.auth_middleware import check_is_connected
+from serializers.service_serializer import ServiceProposalSerializer, ServiceRequestSerializer
 from serializers.user_serializer import (
     RegisterUserSerializer,
     RichUserSerializer,
@@ -19,6 +21,14 @@ from serializers.user_serializer import (
     UserSerializer,
     UserVerificationSerializer,
 )
+from utils.metrics_utils import UPLOAD_REJECTED
+from utils.pagination_utils import InvalidPagination, paginate
+from utils.upload_utils import (
+    UploadRejected,
+    abort_upload,
+    get_image_upload_handlers,
+    replace_file,
+)
 from utils.user_utils import get_connected_user
 
 
@@ -52,9 +62,9 @@ class RegisterUserAPIView(APIView):
             city=validated_data.get("city", None),
             district=validated_data.get("district", None),
             is_active=True,
+            # Hashed before the creation, so that the user is written once
+            password=make_password(validated_data["password"]),
         )
-        user.password = make_password(validated_data["password"])
-        user.save()
 
         return Response(UserSerializer(user).data, status=status.HTTP_201_CREATED)
 
@@ -63,17 +73,34 @@ class UserVerificationAPIView(APIView):
     serializer_class = UserVerificationSerializer
     parser_classes = (MultiPartParser, FormParser)
 
+    def initialize_request(self, request, *args, **kwargs):
+        # Check the photo while it is received and stream it to a temporary
+        # file, the upload is never held in memory
+        request.upload_handlers = get_image_upload_handlers(
+            request, ["photo"], settings.VERIFICATION_PHOTO_MAX_SIZE
+        )
+        return super().initialize_request(request, *args, **kwargs)
+
     @swagger_auto_schema(
         operation_id="verify_user",
-        operation_description="Endpoint for user verification",
+        operation_description=(
+            "Endpoint for user verification. The photo must be a JPEG, PNG or WebP "
+            "image of VERIFICATION_PHOTO_MAX_SIZE bytes at most (10 MB by default)."
+        ),
         operation_summary="Verify an user",
         request_body=UserVerificationSerializer,
-        responses={200: "Message"},
+        responses={200: "Message", 413: "File too large", 415: "Unsupported file type"},
         tags=["Users"],
         security=[],
     )
     def post(self, request, *args, **kwargs):
-        serializer = self.serializer_class(data=request.data)
+        try:
+            serializer = self.serializer_class(data=request.data)
+        except UploadRejected as e:
+            abort_upload(request._request)
+            UPLOAD_REJECTED.labels(status=e.status_code).inc()
+            return Response({"error": e.message}, status=e.status_code)
+
         if not serializer.is_valid():
             logging.exception(serializer.errors)
             return Response(
@@ -93,19 +120,14 @@ class UserVerificationAPIView(APIView):
         photo = validated_data["photo"]
         file_extension = os.path.splitext(photo.name)[1]
         new_file_name = f"{user.first_name}-{user.last_name}-vd{file_extension}"
-        photo_content = ContentFile(photo.read())
 
-        # Check if the user has already uploaded a verification photo
-        try:
-            user_verif = UserVerification.objects.get(user=user)
-            user_verif.verification_photo.delete()
-            user_verif.verification_photo.save(new_file_name, photo_content)
-
-        except UserVerification.DoesNotExist:
-            user_verif = UserVerification.objects.create(
-                user=user, verification_photo=new_file_name
+        # Replace the previous photo, if any, once the new one is stored
+        with transaction.atomic():
+            user_verif = (
+                UserVerification.objects.select_for_update().filter(user=user).first()
+                or UserVerification(user=user)
             )
-            user_verif.verification_photo.save(new_file_name, photo_content)
+            replace_file(user_verif.verification_photo, new_file_name, photo)
 
         return Response(
             {"message": "Picture registered successfully ! Please wait for validation."},
@@ -147,7 +169,7 @@ class GetUserProfileAPIView(APIView):
     )
     def get(self, request, user_uuid, *args, **kwargs):
         try:
-            user = User.objects.get(uuid=user_uuid)
+            user = User.objects.select_related("counters").get(uuid=user_uuid)
         except User.DoesNotExist:
             return Response(
                 {"error": "User not found."}, status=status.HTTP_404_NOT_FOUND
@@ -156,6 +178,79 @@ class GetUserProfileAPIView(APIView):
         return Response(UserProfileSerializer(user).data, status=status.HTTP_200_OK)
 
 
+class PaginatedUserProposalsAPIView(APIView):
+    @swagger_auto_schema(
+        operation_id="paginated_user_proposals",
+        operation_description="""
+        # Endpoint for getting the paginated services proposals of a user, latest first.
+
+        ## Same query parameters and outputs as /services/proposals/list/:
+        - **page** and **size**, or **cursor** for the cursor mode.
+        - **sort**: "asc" for the oldest first.
+        **Exemple**: /users/32fcc008b5ef4d84b0390bdcca229b9a/proposals?page=2&size=5
+        """,
+        operation_summary="Get the paginated proposals of a user",
+        responses={200: ServiceProposalSerializer(many=True)},
+        tags=["Users"],
+        security=[],
+    )
+    def get(self, request, user_uuid, *args, **kwargs):
+        if not User.objects.filter(uuid=user_uuid).exists():
+            return Response(
+                {"error": "User not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        service_proposals = ServiceProposalSerializer.setup_eager_loading(
+            ServiceProposal.objects.filter(user_id=user_uuid)
+        )
+        try:
+            output = paginate(
+                service_proposals, request.GET, ServiceProposalSerializer, "proposals"
+            )
+        except InvalidPagination as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(output, status=status.HTTP_200_OK)
+
+
+class ConnectedUserRequestsAPIView(APIView):
+    @swagger_auto_schema(
+        operation_id="connected_user_requests",
+        operation_description="""
+        # Endpoint for getting the paginated services requests of the connected user, latest first, whatever their status.
+
+        ## Same query parameters and outputs as /services/requests/list/:
+        - **page** and **size**, or **cursor** for the cursor mode.
+        - **sort**: "asc" for the oldest first.
+        **Exemple**: /users/current/requests?cursor=&size=20
+        """,
+        operation_summary="Get the paginated requests of the connected user",
+        responses={200: ServiceRequestSerializer(many=True)},
+        tags=["Users"],
+        security=[{"Bearer": []}],
+    )
+    @check_is_connected
+    def get(self, request, *args, **kwargs):
+        connected_user = get_connected_user(request)
+        if not connected_user:
+            return Response(
+                {"error": "Connected user not found !"},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        services_requests = ServiceRequestSerializer.setup_eager_loading(
+            ServiceRequest.objects.filter(user=connected_user)
+        )
+        try:
+            output = paginate(
+                services_requests, request.GET, ServiceRequestSerializer, "requests"
+            )
+        except InvalidPagination as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(output, status=status.HTTP_200_OK)
+
+
 class UpdateUserProfileAPIView(APIView):
     serializer_class = UpdateUserSerializer
 
@@ -1,9 +1,11 @@
 from django.urls import path
 
-from endpoints.auth.api.auth_api import LoginAPIView, RefreshAPIView
+from endpoints.auth.api.auth_api import LoginAPIView, LogoutAPIView, RefreshAPIView
 from endpoints.auth.api.user_api import (
     ConnectedUserAPIView,
+    ConnectedUserRequestsAPIView,
     GetUserProfileAPIView,
+    PaginatedUserProposalsAPIView,
     RegisterUserAPIView,
     UpdateUserProfileAPIView,
     UserVerificationAPIView,
@@ -12,9 +14,12 @@ from endpoints.auth.api.user_api import (
 urlpatterns = [
     path("auth/login", LoginAPIView.as_view()),
     path("auth/refresh", RefreshAPIView.as_view()),
+    path("auth/logout", LogoutAPIView.as_view()),
     path("users/register", RegisterUserAPIView.as_view()),
     path("users/verify", UserVerificationAPIView.as_view()),
     path("auth/current-user/", ConnectedUserAPIView.as_view()),
     path("users/<str:user_uuid>/profile/", GetUserProfileAPIView.as_view()),
+    path("users/<str:user_uuid>/proposals", PaginatedUserProposalsAPIView.as_view()),
+    path("users/current/requests", ConnectedUserRequestsAPIView.as_view()),
     path("users/current/update-profile", UpdateUserProfileAPIView.as_view()),
 ]
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+
+from utils.cache_utils import etag_matches
+from utils.swagger_utils import get_schema_file
+
+
+def serve_openapi_schema(request, format: str):
+    """
+    Send the precomputed OpenAPI schema, gzipped for the clients accepting it.
+
+    It is cached OPENAPI_SCHEMA_MAX_AGE seconds, then revalidated with its
+    ETag, so that the crawlers and the code generators get a 304.
+    """
+    schema_file = get_schema_file(format)
+    use_gzip = "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+    etag = schema_file["gzip_etag"] if use_gzip else schema_file["etag"]
+
+    if etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(
+            schema_file["gzip_content"] if use_gzip else schema_file["content"],
+            content_type=schema_file["content_type"],
+        )
+        if use_gzip:
+            response["Content-Encoding"] = "gzip"
+
+    response["ETag"] = etag
+    response["Cache-Control"] = f"public, max-age={settings.OPENAPI_SCHEMA_MAX_AGE}"
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
@@ -0,0 +1,14 @@
+from django.urls import path, re_path
+from drf_yasg.renderers import SwaggerUIRenderer
+from drf_yasg.views import get_schema_view
+
+from endpoints.docs.api.docs_api import serve_openapi_schema
+from utils.swagger_utils import API_INFO
+
+schema_view = get_schema_view(API_INFO)
+
+urlpatterns = [
+    re_path(r"^swagger(?P<format>\.json|\.yaml)/?$", serve_openapi_schema, name="schema-json"),
+    # Only the UI, reading the precomputed schema (SPEC_URL), never generating it
+    path("", schema_view.as_view(renderer_classes=[SwaggerUIRenderer])),
+]
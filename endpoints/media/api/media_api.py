@@ -0,0 +1,71 @@
+import posixpath
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404
+
+from app_models.models import UserVerification
+from utils.media_utils import get_static_cache_control, send_file
+from utils.user_utils import get_connected_user
+
+# Media only readable by the staff and by their owner
+PROTECTED_MEDIA_PREFIXES = ("verification_photos/",)
+
+
+def normalize_media_path(path: str) -> str:
+    """
+    Normalize the path of a media file the way it is served, e.g.
+    "review/../verification_photos/a.jpg" to "verification_photos/a.jpg".
+
+    :param path: The path of the URL.
+    :return:
+    :raises Http404: If the path leaves MEDIA_ROOT.
+    """
+    path = posixpath.normpath(path)
+    if path.startswith(("..", "/")):
+        raise Http404("File not found")
+
+    return path
+
+
+def can_read_media(request, path: str) -> bool:
+    """
+    Check if the request can read a media file.
+
+    :param request:
+    :param path: The normalized path of the file in MEDIA_ROOT.
+    :return:
+    """
+    if not path.startswith(PROTECTED_MEDIA_PREFIXES):
+        return True
+
+    # Admin session
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+
+    connected_user = get_connected_user(request)
+    if not connected_user:
+        return False
+
+    return UserVerification.objects.filter(
+        Q(verification_photo=path) | Q(review_photo=path) | Q(thumbnail=path),
+        user=connected_user,
+    ).exists()
+
+
+def serve_media(request, path: str):
+    """Send a media file, once the access is checked."""
+    # Checked and served on the same path, whatever its "./" and "../"
+    path = normalize_media_path(path)
+    if not can_read_media(request, path):
+        # Do not tell whether the file exists
+        raise Http404("File not found")
+
+    return send_file(request, settings.MEDIA_ROOT, path, "media", "private, no-cache")
+
+
+def serve_static(request, path: str):
+    """Send a collected static file, cached for a year when hashed."""
+    return send_file(
+        request, settings.STATIC_ROOT, path, "static", get_static_cache_control(path)
+    )
@@ -0,0 +1,41 @@
+import os
+import tempfile
+
+from django.test import TestCase, override_settings
+
+
+class ServeMediaTests(TestCase):
+    """The access checks of the media must hold whatever the form of the path."""
+
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        for name in ("verification_photos/photo.jpg", "public/photo.jpg"):
+            os.makedirs(os.path.join(self.media_root.name, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(self.media_root.name, name), "wb") as media_file:
+                media_file.write(b"photo")
+
+        settings_override = override_settings(MEDIA_ROOT=self.media_root.name, FILES_SERVING_MODE="django")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_anonymous_cannot_read_protected_media(self):
+        for path in (
+            "/media/verification_photos/photo.jpg",
+            "/media/./verification_photos/photo.jpg",
+            "/media/review/../verification_photos/photo.jpg",
+            "/media/public/../verification_photos/./photo.jpg",
+        ):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path).status_code, 404)
+
+    def test_path_outside_media_root(self):
+        self.assertEqual(self.client.get("/media/../manage.py").status_code, 404)
+        self.assertEqual(self.client.get("/media/public/../../manage.py").status_code, 404)
+
+    def test_public_media_served_on_its_normalized_path(self):
+        for path in ("/media/public/photo.jpg", "/media/./public/photo.jpg", "/media/review/../public/photo.jpg"):
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(b"".join(response.streaming_content), b"photo")
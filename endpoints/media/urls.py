@@ -0,0 +1,11 @@
+import re
+
+from django.conf import settings
+from django.urls import re_path
+
+from endpoints.media.api.media_api import serve_media, serve_static
+
+urlpatterns = [
+    re_path(rf"^{re.escape(settings.MEDIA_URL.lstrip('/'))}(?P<path>.+)$", serve_media),
+    re_path(rf"^{re.escape(settings.STATIC_URL.lstrip('/'))}(?P<path>.+)$", serve_static),
+]
@@ -0,0 +1,86 @@
+import logging
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from utils.db_utils import check_database, get_database_stats
+from utils.metrics_utils import render_metrics
+from utils.timing_utils import endpoint_stats
+
+
+class DatabaseHealthAPIView(APIView):
+    @swagger_auto_schema(
+        operation_id="database_health",
+        operation_description="Check the database of the process answering, the connection "
+        "statistics of the process (pool or persistent connections) are only given to the staff",
+        operation_summary="Check the database",
+        tags=["Monitoring"],
+    )
+    def get(self, request, *args, **kwargs):
+        try:
+            check_database()
+        except DatabaseError:
+            logging.exception("Database health check failed")
+            return Response(
+                {"error": "Database unavailable !"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        data = {"status": "ok"}
+        if request.user.is_authenticated and request.user.is_staff:
+            data["connections"] = get_database_stats()
+
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class EndpointStatsAPIView(APIView):
+    @swagger_auto_schema(
+        operation_id="endpoint_stats",
+        operation_description="Aggregates by endpoint of the requests answered by the process since "
+        "its start: count, SQL queries (of the serializers too), total, view, serialization, render "
+        "and SQL times in milliseconds, requests over the query budget. The slowest endpoints come first. Staff only.",
+        operation_summary="Get the endpoint statistics",
+        tags=["Monitoring"],
+    )
+    def get(self, request, *args, **kwargs):
+        if not (request.user.is_authenticated and request.user.is_staff):
+            return Response(
+                {"error": "You are not allowed to see the statistics !"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        return Response(endpoint_stats.snapshot(), status=status.HTTP_200_OK)
+
+
+def can_read_metrics(request) -> bool:
+    """
+    Check if the request can read the metrics: the scraper sending METRICS_TOKEN
+    as a Bearer token, or an admin session. Without a token, they are only open
+    in DEBUG.
+
+    :param request:
+    :return:
+    """
+    if settings.METRICS_TOKEN:
+        authorization = request.META.get("HTTP_AUTHORIZATION", "")
+        if constant_time_compare(authorization, f"Bearer {settings.METRICS_TOKEN}"):
+            return True
+    elif settings.DEBUG:
+        return True
+
+    return request.user.is_authenticated and request.user.is_staff
+
+
+def serve_metrics(request):
+    """Expose the metrics of all the workers in the Prometheus text format."""
+    if not can_read_metrics(request):
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+
+    content, content_type = render_metrics()
+    return HttpResponse(content, content_type=content_type)
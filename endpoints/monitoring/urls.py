@@ -0,0 +1,8 @@
+from django.urls import path
+
+from endpoints.monitoring.api.monitoring_api import DatabaseHealthAPIView, EndpointStatsAPIView
+
+urlpatterns = [
+    path("health/database", DatabaseHealthAPIView.as_view()),
+    path("endpoints", EndpointStatsAPIView.as_view()),
+]
@@ -1,5 +1,6 @@
 import logging
 
+from django.db import IntegrityError
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.response import Response
@@ -7,7 +8,6 @@ from rest_framework.views import APIView
 
 from app_models.models import (
     ServiceCategory,
-    ServiceProposalSkill,
     ServiceRequest,
     ServiceRequestSocials,
 )
@@ -24,6 +24,17 @@ from serializers.service_serializer import (
     UpdateServiceProposalSerializer,
     UpdateServiceRequestSerializer,
 )
+from utils.cache_utils import etag_matches
+from utils.counter_utils import get_category_counters, get_counters_etag
+from utils.pagination_utils import InvalidPagination, paginate
+from utils.search_utils import search_queryset
+from utils.service_utils import (
+    get_categories_data,
+    get_category,
+    get_default_category,
+    get_skills_data,
+    resolve_skills,
+)
 from utils.user_utils import get_connected_user
 
 
@@ -61,9 +72,7 @@ class CreateServiceRequestAPIView(APIView):
         # Check if the category exists
         if validated_data.get("category_uuid", None):
             try:
-                existing_category = ServiceCategory.objects.get(
-                    uuid=validated_data["category_uuid"],
-                )
+                existing_category = get_category(validated_data["category_uuid"])
             except ServiceCategory.DoesNotExist:
                 return Response(
                     {"error": "Category not found !"},
@@ -71,26 +80,26 @@ class CreateServiceRequestAPIView(APIView):
                 )
 
         else:
-            existing_category, _ = ServiceCategory.objects.get_or_create(
-                **{
-                    "fr_name": "Autres",
-                    "fr_description": "Autres services non classés ailleurs",
-                    "en_name": "Others",
-                    "en_description": "Other unclassified services",
-                }
-            )
+            existing_category = get_default_category()
 
         # Create the service request
-        service_request = ServiceRequest.objects.create(
-            user=connected_user,
-            title=validated_data["title"],
-            description=validated_data["description"],
-            city=validated_data["city"],
-            district=validated_data["district"],
-            duration=validated_data["duration"],
-            fixed_amount=validated_data["fixed_amount"],
-            category=existing_category,
-        )
+        try:
+            service_request = ServiceRequest.objects.create(
+                user=connected_user,
+                title=validated_data["title"],
+                description=validated_data["description"],
+                city=validated_data["city"],
+                district=validated_data["district"],
+                duration=validated_data["duration"],
+                fixed_amount=validated_data["fixed_amount"],
+                category=existing_category,
+            )
+        except IntegrityError:
+            # The cached category was deleted meanwhile, see get_category
+            return Response(
+                {"error": "Category not found !"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         # Create the service request socials
         ServiceRequestSocials.objects.create(
@@ -108,6 +117,32 @@ class CreateServiceRequestAPIView(APIView):
 
 
 class PaginatedServiceRequestsAPIView(APIView):
+    @staticmethod
+    def filter_queryset(query_params):
+        """Build the active services requests queryset matching the query filters."""
+        filters = {}
+        if "town" in query_params and query_params["town"].strip() != "":
+            filters["city"] = query_params["town"]
+        
+        if "category_uuid" in query_params and query_params["category_uuid"].strip() != "":
+            filters["category__uuid"] = query_params["category_uuid"]
+        
+        if "min_amount" in query_params and query_params["min_amount"].strip() != "":
+            filters["fixed_amount__gte"] = query_params["min_amount"]
+        
+        if "max_amount" in query_params and query_params["max_amount"].strip() != "":
+            filters["fixed_amount__lte"] = query_params["max_amount"]
+
+        services_requests = ServiceRequestSerializer.setup_eager_loading(
+            ServiceRequest.objects.filter(
+                **filters, status=ServiceRequestStatus.ACTIVE,
+            )
+        )
+        if "q" in query_params and query_params["q"].strip() != "":
+            services_requests = search_queryset(services_requests, query_params["q"])
+
+        return services_requests
+
     @swagger_auto_schema(
         operation_id="paginated_services_requests",
         operation_description="""
@@ -115,7 +150,7 @@ class PaginatedServiceRequestsAPIView(APIView):
         
         ## To retrieve paginated services requests, you can use the following query parameters:
         - **page**: The page number to retrieve (default is 1).
-        - **size**: The number of items per page (default is 10).
+        - **size**: The number of items per page (default is 10, at most 100).
         **Exemple**: /services/requests/list/?page=2&size=5
         
         ## To apply filters, you can use the following query parameters:
@@ -125,9 +160,21 @@ class PaginatedServiceRequestsAPIView(APIView):
         - **max_amount**: The maximum fixed amount of the service request.
         **Exemple**: /services/requests/list/?town=Douala&category_uuid=32fcc008b5ef4d84b0390bdcca229b9a&min_amount=1000&max_amount=5000
         
+        ## To search in the title and the description (french or english), use the following query parameter:
+        - **q**: The searched text. Supports "quoted phrases", OR and -excluded words.
+        In page mode, the most relevant requests come first. Only the 1000 most recently updated matches are listed:
+        `total_capped` is true when the `total` reached this limit.
+        **Exemple**: /services/requests/list/?q=plombier douala
+        
         ## If you want to sort the results, you can use the following query parameter:
         - **sort**: The sorting order (default is "desc"). Use "asc" for ascending order.
         **Exemple**: /services/requests/list/?sort=asc
+        
+        ## For deep or infinite scrolling, prefer the cursor mode:
+        - **cursor**: Leave it empty for the first page, then pass the `next_cursor` of the previous response.
+        The response contains `size`, `more`, `next_cursor` and `requests` (no `page` nor `total`).
+        The feed stays stable even when new requests are published meanwhile.
+        **Exemple**: /services/requests/list/?cursor=&size=20
         """,
         operation_summary="Get paginated services requests",
         responses={200: ServiceRequestSerializer(many=True)},
@@ -135,49 +182,13 @@ class PaginatedServiceRequestsAPIView(APIView):
         security=[],
     )
     def get(self, request):
-        page = 1
-        size = 10
-        if "page" in request.GET and request.GET["page"].strip() != "":
-            page = int(request.GET["page"])
-
-        if "size" in request.GET and request.GET["size"].strip() != "":
-            size = int(request.GET["size"])
-        
-        filters = {}
-        if "town" in request.GET and request.GET["town"].strip() != "":
-            filters["town"] = request.GET["town"]
-        
-        if "category_uuid" in request.GET and request.GET["category_uuid"].strip() != "":
-            filters["category__uuid"] = request.GET["category_uuid"]
-        
-        if "min_amount" in request.GET and request.GET["min_amount"].strip() != "":
-            filters["fixed_amount__gte"] = request.GET["min_amount"]
-        
-        if "max_amount" in request.GET and request.GET["max_amount"].strip() != "":
-            filters["fixed_amount__lte"] = request.GET["max_amount"]
-
-        sort = "desc"
-        if "sort" in request.GET and request.GET["sort"].strip() != "":
-            sort = request.GET["sort"]
-
-        start = (page - 1) * size
-        end = page * size
-
-        # Retrieve services requests
-        services_requests = ServiceRequest.objects.filter(
-            **filters, status=ServiceRequestStatus.ACTIVE,
-        ).order_by("-updated_at" if sort == "desc" else "updated_at")
-        total = services_requests.count()
-
-        output = {
-            "page": page,
-            "size": size,
-            "total": total,
-            "more": end < total,
-            "requests": ServiceRequestSerializer(
-                services_requests[start:end], many=True
-            ).data,
-        }
+        services_requests = self.filter_queryset(request.GET)
+        try:
+            output = paginate(
+                services_requests, request.GET, ServiceRequestSerializer, "requests"
+            )
+        except InvalidPagination as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(output, status=status.HTTP_200_OK)
 
@@ -193,7 +204,9 @@ class GetServiceRequestAPIView(APIView):
     )
     def get(self, request, service_request_uuid: str):
         try:
-            service_request = ServiceRequest.objects.get(uuid=service_request_uuid)
+            service_request = ServiceRequestSerializer.setup_eager_loading(
+                ServiceRequest.objects.all()
+            ).get(uuid=service_request_uuid)
         except ServiceRequest.DoesNotExist:
             return Response(
                 {"error": "Service request not found !"},
@@ -208,35 +221,55 @@ class GetServiceRequestAPIView(APIView):
 class RetrieveSkillsAPIView(APIView):
     @swagger_auto_schema(
         operation_id="retrieve_skills",
-        operation_description="Endpoint for retrieving all service proposal skills",
+        operation_description="""
+        # Endpoint for retrieving all service proposal skills.
+        
+        The response carries an `ETag` header. Send it back in the `If-None-Match`
+        header to get an empty `304 Not Modified` response while the skills are unchanged.
+        """,
         operation_summary="Retrieve all service proposal skills",
-        responses={200: ServiceProposalSkillSerializer(many=True)},
+        responses={200: ServiceProposalSkillSerializer(many=True), 304: "Not modified"},
         tags=["Services"],
         security=[],
     )
     def get(self, request):
-        skills = ServiceProposalSkill.objects.all()
-        return Response(
-            ServiceProposalSkillSerializer(skills, many=True).data,
-            status=status.HTTP_200_OK,
-        )
+        skills, etag = get_skills_data()
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        return Response(skills, status=status.HTTP_200_OK, headers={"ETag": etag})
 
 
 class RetrieveCategoriesAPIView(APIView):
     @swagger_auto_schema(
         operation_id="retrieve_categories",
-        operation_description="Endpoint for retrieving all service proposal categories",
+        operation_description="""
+        # Endpoint for retrieving all service proposal categories.
+        
+        Each category carries its `active_requests_count` and `proposals_count`,
+        refreshed every few seconds.
+
+        The response carries an `ETag` header. Send it back in the `If-None-Match`
+        header to get an empty `304 Not Modified` response while the categories are unchanged.
+        """,
         operation_summary="Retrieve all service proposal categories",
-        responses={200: ServiceCategorySerializer(many=True)},
+        responses={200: ServiceCategorySerializer(many=True), 304: "Not modified"},
         tags=["Services"],
         security=[],
     )
     def get(self, request):
-        categories = ServiceCategory.objects.all()
-        return Response(
-            ServiceCategorySerializer(categories, many=True).data,
-            status=status.HTTP_200_OK,
-        )
+        categories, etag = get_categories_data()
+        counters = get_category_counters()
+        etag = get_counters_etag(etag, counters)
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        no_counters = {"active_requests_count": 0, "proposals_count": 0}
+        categories = [
+            {**category, **counters.get(category["uuid"], no_counters)}
+            for category in categories
+        ]
+        return Response(categories, status=status.HTTP_200_OK, headers={"ETag": etag})
 
 
 class CreateServiceProposalAPIView(APIView):
@@ -271,20 +304,12 @@ class CreateServiceProposalAPIView(APIView):
             )
 
         # Create or get skills
-        skills = []
-        for skill_name in validated_data.get("skills", []):
-            formatted_skill_name = skill_name.strip().lower()
-            skill, _ = ServiceProposalSkill.objects.get_or_create(
-                name=formatted_skill_name
-            )
-            skills.append(skill)
+        skills = resolve_skills(validated_data.get("skills", []))
 
         # Check if the category exists
         if validated_data.get("category_uuid", None):
             try:
-                existing_category = ServiceCategory.objects.get(
-                    uuid=validated_data["category_uuid"],
-                )
+                existing_category = get_category(validated_data["category_uuid"])
             except ServiceCategory.DoesNotExist:
                 return Response(
                     {"error": "Category not found !"},
@@ -292,26 +317,26 @@ class CreateServiceProposalAPIView(APIView):
                 )
 
         else:
-            existing_category, _ = ServiceCategory.objects.get_or_create(
-                **{
-                    "fr_name": "Autres",
-                    "fr_description": "Autres services non classés ailleurs",
-                    "en_name": "Others",
-                    "en_description": "Other unclassified services",
-                }
-            )
+            existing_category = get_default_category()
 
         # Create the service proposal
-        service_proposal = ServiceProposal.objects.create(
-            user=connected_user,
-            title=validated_data["title"],
-            description=validated_data["description"],
-            hourly_rate=validated_data["hourly_rate"],
-            category=existing_category,
-        )
+        try:
+            service_proposal = ServiceProposal.objects.create(
+                user=connected_user,
+                title=validated_data["title"],
+                description=validated_data["description"],
+                hourly_rate=validated_data["hourly_rate"],
+                category=existing_category,
+            )
+        except IntegrityError:
+            # The cached category was deleted meanwhile, see get_category
+            return Response(
+                {"error": "Category not found !"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         # Add skills to the service proposal
-        service_proposal.skills.set(skills)
+        service_proposal.skills.add(*skills)
 
         return Response(
             ServiceProposalSerializer(service_proposal).data,
@@ -320,6 +345,25 @@ class CreateServiceProposalAPIView(APIView):
 
 
 class PaginatedServiceProposalsAPIView(APIView):
+    @staticmethod
+    def filter_queryset(query_params):
+        """Build the services proposals queryset matching the query filters."""
+        category_uuid = None
+        if "category_uuid" in query_params and query_params["category_uuid"].strip() != "":
+            category_uuid = query_params["category_uuid"]
+
+        filters = {}
+        if category_uuid:
+            filters["category__uuid"] = category_uuid
+
+        service_proposals = ServiceProposalSerializer.setup_eager_loading(
+            ServiceProposal.objects.filter(**filters)
+        )
+        if "q" in query_params and query_params["q"].strip() != "":
+            service_proposals = search_queryset(service_proposals, query_params["q"])
+
+        return service_proposals
+
     @swagger_auto_schema(
         operation_id="paginated_service_proposals",
         operation_description="""
@@ -327,8 +371,24 @@ class PaginatedServiceProposalsAPIView(APIView):
         
         ## To retrieve paginated services proposals, you can use the following query parameters:
         - **page**: The page number to retrieve (default is 1).
-        - **size**: The number of items per page (default is 10).
+        - **size**: The number of items per page (default is 10, at most 100).
+        - **sort**: "asc" for the oldest first.
         **Exemple**: /services/proposals/list/?page=2&size=5
+        
+        ## To apply filters, you can use the following query parameters:
+        - **category_uuid**: The uuid of the service category.
+        **Exemple**: /services/proposals/list/?category_uuid=32fcc008b5ef4d84b0390bdcca229b9a
+        
+        ## To search in the title and the description (french or english), use the following query parameter:
+        - **q**: The searched text. Supports "quoted phrases", OR and -excluded words.
+        **Exemple**: /services/proposals/list/?q=développeur python
+        
+        The most relevant proposals come first when searching, otherwise the most recently updated ones.
+        Only the 1000 most recently updated matches are listed: `total_capped` is true when the `total` reached this limit.
+
+        ## For deep or infinite scrolling, use the cursor mode of /services/requests/list/:
+        - **cursor**: Leave it empty for the first page, then pass the `next_cursor` of the previous response.
+        **Exemple**: /services/proposals/list/?cursor=&size=20
         """,
         operation_summary="Get paginated service proposals",
         responses={200: ServiceProposalSerializer(many=True)},
@@ -336,38 +396,13 @@ class PaginatedServiceProposalsAPIView(APIView):
         security=[],
     )
     def get(self, request):
-        page = 1
-        size = 10
-        if "page" in request.GET and request.GET["page"].strip() != "":
-            page = int(request.GET["page"])
-
-        if "size" in request.GET and request.GET["size"].strip() != "":
-            size = int(request.GET["size"])
-
-        category_uuid = None
-        if "category_uuid" in request.GET and request.GET["category_uuid"].strip() != "":
-            category_uuid = request.GET["category_uuid"]
-
-        filters = {}
-        if category_uuid:
-            filters["category__uuid"] = category_uuid
-
-        # Retrieve service proposals with optional filters
-        service_proposals = ServiceProposal.objects.filter(**filters)
-
-        total = service_proposals.count()
-        start = (page - 1) * size
-        end = page * size
-
-        output = {
-            "page": page,
-            "size": size,
-            "total": total,
-            "more": end < total,
-            "proposals": ServiceProposalSerializer(
-                service_proposals[start:end], many=True
-            ).data,
-        }
+        service_proposals = self.filter_queryset(request.GET)
+        try:
+            output = paginate(
+                service_proposals, request.GET, ServiceProposalSerializer, "proposals"
+            )
+        except InvalidPagination as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(output, status=status.HTTP_200_OK)
 
@@ -394,9 +429,9 @@ class UpdateServiceRequestAPIView(APIView):
             )
 
         try:
-            service_request = ServiceRequest.objects.get(
-                uuid=request_uuid, user=connected_user
-            )
+            service_request = ServiceRequestSerializer.setup_eager_loading(
+                ServiceRequest.objects.all()
+            ).get(uuid=request_uuid, user=connected_user)
         except ServiceRequest.DoesNotExist:
             return Response(
                 {
@@ -443,9 +478,9 @@ class UpdateServiceProposalAPIView(APIView):
             )
 
         try:
-            service_proposal = ServiceProposal.objects.get(
-                uuid=proposal_uuid, user=connected_user
-            )
+            service_proposal = ServiceProposalSerializer.setup_eager_loading(
+                ServiceProposal.objects.all()
+            ).get(uuid=proposal_uuid, user=connected_user)
         except ServiceProposal.DoesNotExist:
             return Response(
                 {
@@ -467,9 +502,7 @@ class UpdateServiceProposalAPIView(APIView):
         validated_data = serializer.validated_data
         if "category_uuid" in validated_data:
             try:
-                existing_category = ServiceCategory.objects.get(
-                    uuid=validated_data["category_uuid"],
-                )
+                existing_category = get_category(validated_data["category_uuid"])
             except ServiceCategory.DoesNotExist:
                 return Response(
                     {"error": "Category not found !"},
@@ -478,19 +511,20 @@ class UpdateServiceProposalAPIView(APIView):
 
             service_proposal.category = existing_category
 
-        # Create or get skills
-        if "skills" in validated_data:
-            skills = []
-            for skill_name in validated_data["skills"]:
-                formatted_skill_name = skill_name.strip().lower()
-                skill, created = ServiceProposalSkill.objects.get_or_create(
-                    name=formatted_skill_name
-                )
-                skills.append(skill)
+        skill_names = validated_data.pop("skills", None)
+        try:
+            serializer.save()
+        except IntegrityError:
+            # The cached category was deleted meanwhile, see get_category
+            return Response(
+                {"error": "Category not found !"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-            service_proposal.skills.set(skills)
+        # Create or get skills
+        if skill_names is not None:
+            service_proposal.skills.set(resolve_skills(skill_names))
 
-        serializer.save()
         return Response(
             ServiceProposalSerializer(service_proposal).data, status=status.HTTP_200_OK
         )
@@ -0,0 +1,263 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework_jwt.settings import api_settings
+
+from app_models.models import (
+    ServiceCategory,
+    ServiceProposal,
+    ServiceProposalSkill,
+    ServiceRequest,
+    ServiceRequestSocials,
+    User,
+    UserSocials,
+)
+from endpoints.auth.api.auth_api import LoginAPIView
+from endpoints.auth.api.user_api import (
+    ConnectedUserAPIView,
+    ConnectedUserRequestsAPIView,
+    GetUserProfileAPIView,
+    PaginatedUserProposalsAPIView,
+)
+from endpoints.services.api.service_api import (
+    CreateServiceProposalAPIView,
+    CreateServiceRequestAPIView,
+    GetServiceRequestAPIView,
+    PaginatedServiceProposalsAPIView,
+    PaginatedServiceRequestsAPIView,
+    RetrieveCategoriesAPIView,
+    RetrieveSkillsAPIView,
+    UpdateServiceProposalAPIView,
+    UpdateServiceRequestAPIView,
+)
+from utils.cache_utils import bump_reference_data_version
+from utils.counter_utils import get_category_counters
+from utils.service_utils import (
+    get_categories_data,
+    get_category,
+    get_default_category,
+    get_skills_data,
+)
+from utils.token_utils import refresh_revoked_tokens
+from utils.user_utils import get_user_by_username
+
+# Number of SQL queries of each endpoint, whatever the number of rows returned.
+# Lower them when an endpoint gets cheaper, never raise them without a good
+# reason: a new query per row is an N+1 regression.
+QUERY_BUDGETS = {
+    "login": 1,
+    "categories": 0,
+    "skills": 0,
+    "requests_list": 2,
+    "requests_list_cursor": 1,
+    "request_detail": 1,
+    "proposals_list": 3,
+    "user_profile": 4,
+    "user_proposals": 4,
+    "current_user": 5,
+    "current_user_requests": 2,
+    "create_request": 2,
+    "create_proposal": 6,
+    "update_request": 2,
+    "update_proposal": 10,
+}
+
+# Requests and proposals of the seeded user, more than one page would hold if
+# the queries grew with the rows
+SEED_ITEMS = 20
+SEED_PASSWORD = "query-budget-password"
+
+
+# The revoked tokens are loaded once, their periodic refresh is not part of the budgets
+@override_settings(TOKEN_REVOCATION_REFRESH=3600)
+class QueryBudgetTests(TestCase):
+    """Pin each endpoint to its SQL query budget, the process caches being warm."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User(
+            first_name="Budget",
+            last_name="Checker",
+            email="query-budget@example.com",
+            is_active=True,
+        )
+        cls.user.set_password(SEED_PASSWORD)
+        cls.user.save()
+        UserSocials.objects.create(user=cls.user, whatsapp="699999999")
+        cls.category = ServiceCategory.objects.create(
+            fr_name="Budget", fr_description="Budget", en_name="Budget", en_description="Budget"
+        )
+        skills = ServiceProposalSkill.objects.bulk_create(
+            [ServiceProposalSkill(name=f"budget-skill-{i}") for i in range(3)]
+        )
+
+        service_requests = ServiceRequest.objects.bulk_create(
+            [
+                ServiceRequest(
+                    user=cls.user,
+                    title=f"Request {i}",
+                    description="Request",
+                    city="Douala",
+                    district="Akwa",
+                    duration=1,
+                    fixed_amount=1000,
+                    category=cls.category,
+                )
+                for i in range(SEED_ITEMS)
+            ]
+        )
+        ServiceRequestSocials.objects.bulk_create(
+            [
+                ServiceRequestSocials(service_request=service_request, email=cls.user.email)
+                for service_request in service_requests
+            ]
+        )
+        cls.service_request = service_requests[0]
+
+        service_proposals = ServiceProposal.objects.bulk_create(
+            [
+                ServiceProposal(
+                    user=cls.user,
+                    title=f"Proposal {i}",
+                    description="Proposal",
+                    hourly_rate=1000,
+                    category=cls.category,
+                )
+                for i in range(SEED_ITEMS)
+            ]
+        )
+        ServiceProposal.skills.through.objects.bulk_create(
+            [
+                ServiceProposal.skills.through(
+                    serviceproposal_id=service_proposal.uuid, serviceproposalskill_id=skill.id
+                )
+                for service_proposal in service_proposals
+                for skill in skills
+            ]
+        )
+        cls.service_proposal = service_proposals[0]
+
+    def setUp(self):
+        token = api_settings.JWT_ENCODE_HANDLER(api_settings.JWT_PAYLOAD_HANDLER(self.user))
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        self.factory = APIRequestFactory()
+
+        # The budgets are pinned for warm processes. The on_commit invalidation
+        # of the seeded categories and skills never runs in a test, reload them
+        refresh_revoked_tokens(force=True)
+        bump_reference_data_version()
+        get_categories_data()
+        get_category(self.category.uuid)
+        get_default_category()
+        get_skills_data()
+        get_category_counters()
+        get_user_by_username(self.user.username)
+
+    def assertWithinBudget(self, name: str, view_class, request, **kwargs):
+        view = view_class.as_view()
+        with self.assertNumQueries(QUERY_BUDGETS[name]):
+            response = view(request, **kwargs)
+            response.render()
+
+        self.assertLess(response.status_code, 400, response.content)
+
+    def test_login(self):
+        request = self.factory.post(
+            "/", {"username": self.user.email, "password": SEED_PASSWORD}, format="json"
+        )
+        self.assertWithinBudget("login", LoginAPIView, request)
+
+    def test_categories(self):
+        self.assertWithinBudget("categories", RetrieveCategoriesAPIView, self.factory.get("/"))
+
+    def test_skills(self):
+        self.assertWithinBudget("skills", RetrieveSkillsAPIView, self.factory.get("/"))
+
+    def test_requests_list(self):
+        request = self.factory.get("/", {"size": SEED_ITEMS})
+        self.assertWithinBudget("requests_list", PaginatedServiceRequestsAPIView, request)
+
+    def test_requests_list_cursor(self):
+        request = self.factory.get("/", {"size": SEED_ITEMS, "cursor": ""})
+        self.assertWithinBudget("requests_list_cursor", PaginatedServiceRequestsAPIView, request)
+
+    def test_request_detail(self):
+        self.assertWithinBudget(
+            "request_detail",
+            GetServiceRequestAPIView,
+            self.factory.get("/"),
+            service_request_uuid=self.service_request.uuid,
+        )
+
+    def test_proposals_list(self):
+        request = self.factory.get("/", {"size": SEED_ITEMS})
+        self.assertWithinBudget("proposals_list", PaginatedServiceProposalsAPIView, request)
+
+    def test_user_profile(self):
+        self.assertWithinBudget(
+            "user_profile", GetUserProfileAPIView, self.factory.get("/"), user_uuid=self.user.uuid
+        )
+
+    def test_user_proposals(self):
+        self.assertWithinBudget(
+            "user_proposals",
+            PaginatedUserProposalsAPIView,
+            self.factory.get("/", {"size": SEED_ITEMS}),
+            user_uuid=self.user.uuid,
+        )
+
+    def test_current_user(self):
+        self.assertWithinBudget("current_user", ConnectedUserAPIView, self.factory.get("/", **self.auth))
+
+    def test_current_user_requests(self):
+        request = self.factory.get("/", {"size": SEED_ITEMS}, **self.auth)
+        self.assertWithinBudget("current_user_requests", ConnectedUserRequestsAPIView, request)
+
+    def test_create_request(self):
+        request = self.factory.post(
+            "/",
+            {
+                "title": "Budget request",
+                "description": "Budget request",
+                "city": "Douala",
+                "district": "Akwa",
+                "duration": 2,
+                "fixed_amount": 5000,
+                "email": self.user.email,
+                "category_uuid": self.category.uuid,
+            },
+            format="json",
+            **self.auth,
+        )
+        self.assertWithinBudget("create_request", CreateServiceRequestAPIView, request)
+
+    def test_create_proposal(self):
+        request = self.factory.post(
+            "/",
+            {
+                "title": "Budget proposal",
+                "description": "Budget proposal",
+                "hourly_rate": 2000,
+                "skills": ["python", "django", "sql"],
+                "category_uuid": self.category.uuid,
+            },
+            format="json",
+            **self.auth,
+        )
+        self.assertWithinBudget("create_proposal", CreateServiceProposalAPIView, request)
+
+    def test_update_request(self):
+        request = self.factory.put("/", {"title": "Updated request"}, format="json", **self.auth)
+        self.assertWithinBudget(
+            "update_request", UpdateServiceRequestAPIView, request, request_uuid=self.service_request.uuid
+        )
+
+    def test_update_proposal(self):
+        request = self.factory.put(
+            "/",
+            {"title": "Updated proposal", "skills": ["budget-skill-0", "Rust "]},
+            format="json",
+            **self.auth,
+        )
+        self.assertWithinBudget(
+            "update_proposal", UpdateServiceProposalAPIView, request, proposal_uuid=self.service_proposal.uuid
+        )
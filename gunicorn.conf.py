@@ -0,0 +1,25 @@
+"""
+Gunicorn settings, read by `gunicorn backend.wsgi` from the working directory.
+
+The workers write their Prometheus metrics in PROMETHEUS_MULTIPROC_DIR, the
+/metrics endpoint sums the files of all of them.
+"""
+
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+
+def on_starting(server):
+    # Drop the metrics of the previous run
+    metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # Drop the gauges of the dead worker, its counters and histograms are kept
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
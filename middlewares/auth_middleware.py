@@ -1,11 +1,33 @@
 import functools
 
 from rest_framework import status
+from rest_framework.authentication import BaseAuthentication
 from rest_framework.response import Response
 
 from utils.user_utils import get_connected_user
 
 
+class ConnectedUserAuthentication(BaseAuthentication):
+    """
+    DRF authentication from the JWT of the Authorization header.
+
+    It shares the user memoized by `get_connected_user`, so the token is
+    decoded and the user fetched once per request whatever the number of
+    reads. Invalid tokens leave the request anonymous instead of failing, the
+    protected endpoints being guarded by `check_is_connected`.
+    """
+
+    def authenticate(self, request):
+        connected_user = get_connected_user(request)
+        if not connected_user:
+            return None
+
+        return connected_user, None
+
+    def authenticate_header(self, request):
+        return "Bearer"
+
+
 def check_is_connected(api_func):
     """Decorator to check if the user is connected."""
 
@@ -21,4 +43,4 @@ def check_is_connected(api_func):
 
         return api_func(*args, **kwargs)
 
-    return wrapper
\ No newline at end of file
+    return wrapper
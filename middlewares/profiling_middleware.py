@@ -0,0 +1,84 @@
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+
+from utils.profiling_utils import StackSampler, save_profile
+from utils.user_utils import get_connected_user
+
+# Header asking to profile a request, honoured for the staff only
+PROFILE_HEADER = "HTTP_X_PROFILE"
+
+
+class ProfilingMiddleware:
+    """
+    Profile live requests with a stack sampler, without redeploying:
+
+    - a PROFILING_SAMPLE_RATE fraction of the requests, kept when slower than
+      PROFILING_MIN_DURATION;
+    - any request of a staff user sending an `X-Profile: 1` header, whose
+      response gets the id of the profile in an `X-Profile-Id` header.
+
+    The profiles are written in PROFILING_DIR, listed by route on
+    /admin/profiles/. The stack of the thread running the request is sampled,
+    so it is meant for the sync workers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = bool(request.META.get(PROFILE_HEADER)) and is_staff_request(request)
+        sampled = not requested and random.random() < settings.PROFILING_SAMPLE_RATE
+        if not requested and not sampled:
+            return self.get_response(request)
+
+        sampler = StackSampler(threading.get_ident(), settings.PROFILING_INTERVAL / 1000)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            samples = sampler.stop()
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        if sampled and duration_ms < settings.PROFILING_MIN_DURATION:
+            return response
+
+        try:
+            profile_id = save_profile(
+                samples,
+                {
+                    "route": request.resolver_match.route if request.resolver_match else "<unresolved>",
+                    "method": request.method,
+                    "path": request.get_full_path(),
+                    "status": response.status_code,
+                    "duration_ms": round(duration_ms, 2),
+                    "trigger": "header" if requested else "sample",
+                },
+            )
+        except OSError:
+            logging.exception("Error writing a profile")
+            return response
+
+        if requested:
+            response["X-Profile-Id"] = profile_id
+
+        return response
+
+
+def is_staff_request(request) -> bool:
+    """
+    Check if a request comes from a staff user, through the admin session or
+    a token.
+
+    :param request:
+    :return:
+    """
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+
+    connected_user = get_connected_user(request)
+    return bool(connected_user and connected_user.is_staff)
@@ -0,0 +1,80 @@
+import hashlib
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_jwt.settings import api_settings
+
+from utils.db_router import start_replica_reads, stop_replica_reads
+from utils.token_utils import decode_token, parse_authorization_header
+
+# Cache key marking a client which wrote recently
+REPLICA_PIN_KEY = "replica-pin:{}"
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let the safe methods of the API (GET, HEAD, OPTIONS) read from the replicas.
+
+    After a request of a user wrote to the primary, their requests of the next
+    DATABASE_REPLICA_STICKY_SECONDS read from the primary too, so that they see
+    their own writes whatever the lag of the replicas. The pins are stored in
+    the shared cache, a cache shared by all the containers is needed to pin
+    a user on all of them.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS or not request.path.startswith(
+            settings.DATABASE_REPLICA_PATH_PREFIX
+        ):
+            return self.get_response(request)
+
+        client_key = get_client_key(request)
+        pinned = client_key and cache.get(REPLICA_PIN_KEY.format(client_key))
+        if request.method in SAFE_METHODS and not pinned:
+            token = start_replica_reads()
+            try:
+                response = self.get_response(request)
+            finally:
+                wrote = stop_replica_reads(token)
+        else:
+            response = self.get_response(request)
+            wrote = request.method not in SAFE_METHODS
+
+        if wrote and client_key:
+            cache.set(
+                REPLICA_PIN_KEY.format(client_key),
+                True,
+                timeout=settings.DATABASE_REPLICA_STICKY_SECONDS,
+            )
+
+        return response
+
+
+def get_client_key(request) -> Optional[str]:
+    """
+    Identify the client of a request without querying the database: the user
+    of its token, or its session.
+
+    :param request:
+    :return: A digest, or None for the anonymous clients.
+    """
+    token = parse_authorization_header(request.META.get("HTTP_AUTHORIZATION", None))
+    if token:
+        try:
+            username = api_settings.JWT_PAYLOAD_GET_USERNAME_HANDLER(decode_token(token))
+        except:
+            username = None
+
+        if username:
+            return hashlib.sha1(f"user:{username}".encode()).hexdigest()
+
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session_key:
+        return hashlib.sha1(f"session:{session_key}".encode()).hexdigest()
+
+    return None
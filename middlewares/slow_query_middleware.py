@@ -0,0 +1,34 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from utils.slow_query_utils import SlowQueryRecorder
+
+
+class SlowQueryMiddleware:
+    """
+    Record the SQL queries slower than SLOW_QUERY_THRESHOLD, whatever the
+    database alias, aggregated by fingerprint in the SlowQuery table with the
+    view and serializer running them. Their plans are captured on demand, from
+    the admin or the `explain_slow_queries` command.
+
+    The slow queries are stored once the response is built, out of the
+    request transaction.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SLOW_QUERY_THRESHOLD:
+            return self.get_response(request)
+
+        recorder = SlowQueryRecorder(request)
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        recorder.flush()
+        return response
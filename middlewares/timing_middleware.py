@@ -0,0 +1,112 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from utils.db_utils import get_database_stats
+from utils.metrics_utils import observe_request, set_database_gauges
+from utils.timing_utils import RequestTiming, current_timing, endpoint_stats
+
+logger = logging.getLogger("request_timing")
+
+# Attribute of the Django request holding its timing
+REQUEST_TIMING_ATTRIBUTE = "_timing"
+
+
+class RequestTimingMiddleware:
+    """
+    Measure each request: SQL queries and their time, view, serialization and
+    render times.
+
+    The measures are sent back in a Server-Timing header (shown by the browser
+    dev tools), logged as a JSON line on the "request_timing" logger,
+    aggregated by endpoint (`endpoint_stats`) and exported to the metrics. The requests running more SQL
+    queries than REQUEST_QUERY_BUDGET are logged as warnings.
+
+    It must be the first middleware, so that the other ones are measured too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REQUEST_TIMING:
+            return self.get_response(request)
+
+        timing = RequestTiming()
+        setattr(request, REQUEST_TIMING_ATTRIBUTE, timing)
+        timing_token = current_timing.set(timing)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(timing))
+                response = self.get_response(request)
+        finally:
+            current_timing.reset(timing_token)
+
+        durations = timing.get_durations(time.perf_counter())
+        over_budget = timing.queries > settings.REQUEST_QUERY_BUDGET
+        route = request.resolver_match.route if request.resolver_match else "<unresolved>"
+        endpoint_stats.add(
+            request.method,
+            route,
+            response.status_code,
+            durations,
+            timing.queries,
+            over_budget,
+            timing.serialize_queries,
+        )
+        observe_request(request.method, route, response.status_code, durations, timing.queries)
+        # Only the databases the request used: their connection (and pool) is
+        # open, reading the stats of another one could create its pool
+        for connection in connections.all(initialized_only=True):
+            if connection.connection is not None:
+                set_database_gauges(connection.alias, get_database_stats(connection.alias))
+
+        if settings.REQUEST_TIMING_HEADER:
+            response["Server-Timing"] = ", ".join(
+                [
+                    f"total;dur={durations['total']:.1f}",
+                    f"view;dur={durations['view']:.1f}",
+                    f'serialize;dur={durations["serialize"]:.1f};desc="{timing.serialize_queries} queries"',
+                    f"render;dur={durations['render']:.1f}",
+                    f'db;dur={durations["db"]:.1f};desc="{timing.queries} queries"',
+                ]
+            )
+
+        level = logging.WARNING if over_budget else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(
+                level,
+                json.dumps(
+                    {
+                        "method": request.method,
+                        "path": request.path,
+                        "route": route,
+                        "status": response.status_code,
+                        "queries": timing.queries,
+                        "serialize_queries": timing.serialize_queries,
+                        "over_budget": over_budget,
+                        **{f"{name}_ms": round(value, 2) for name, value in durations.items()},
+                    }
+                ),
+            )
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = getattr(request, REQUEST_TIMING_ATTRIBUTE, None)
+        if timing:
+            timing.view_started_at = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # Called once the view returned, just before the response is rendered
+        # (DRF responses), this middleware being the last one called
+        timing = getattr(request, REQUEST_TIMING_ATTRIBUTE, None)
+        if timing:
+            timing.render_started_at = time.perf_counter()
+
+        return response
@@ -9,6 +9,8 @@ from rest_framework_jwt.settings import api_settings
 
 from app_models.models.user import User
 from backend.settings import TOKEN_VALIDITY
+from utils.password_utils import verify_password
+from utils.token_utils import is_token_revoked
 
 
 class LoginSerializer(JSONWebTokenSerializer):
@@ -34,16 +36,17 @@ class LoginSerializer(JSONWebTokenSerializer):
             user = User.objects.filter(phone=username).first()
 
         # Check if user exists and password is correct
-        if not user or not user.check_password(password):
+        # Outdated hashes are upgraded in the background
+        if not user or not verify_password(user, password):
             raise serializers.ValidationError("Invalid email/phone or password")
 
-        # Set the user username to the attrs
-        attrs["username"] = user.username
+        # The user is already authenticated, do not let the parent class fetch
+        # it and hash the password again
+        if not user.is_active:
+            raise serializers.ValidationError("User account is disabled.")
 
-        # Call the parent class's validate method to get the token
-        data = super(LoginSerializer, self).validate(attrs)
-        payload = self.custom_jwt_payload_handler(data["user"])
-        return {"token": self.custom_jwt_encode_handler(payload)}
+        payload = self.custom_jwt_payload_handler(user)
+        return {"token": self.custom_jwt_encode_handler(payload), "user": user}
 
 
 class RefreshSerializer(RefreshJSONWebTokenSerializer):
@@ -59,7 +62,14 @@ class RefreshSerializer(RefreshJSONWebTokenSerializer):
         return payload
 
     def validate(self, attrs):
+        if is_token_revoked(attrs["token"]):
+            raise serializers.ValidationError("Token has been revoked")
+
         data = super(RefreshSerializer, self).validate(attrs)
 
         payload = self.custom_jwt_payload_handler(data["user"])
         return {"token": self.custom_jwt_encode_handler(payload)}
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
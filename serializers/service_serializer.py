@@ -6,16 +6,24 @@ from app_models.models import (
     ServiceProposalSkill,
     ServiceRequest,
 )
+from utils.timing_utils import TimedSerializerMixin
 
 
-class ServiceRequestSerializer(serializers.ModelSerializer):
+class ServiceRequestSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     socials = serializers.SerializerMethodField()
     user = serializers.SerializerMethodField()
     category = serializers.SerializerMethodField()
 
     class Meta:
         model = ServiceRequest
-        fields = "__all__"
+        exclude = ("search_vector",)
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Join the relations read by the serializer to avoid N+1 queries."""
+        return queryset.select_related("contacts", "user", "category").defer(
+            "search_vector"
+        )
 
     def get_socials(self, service_request):
         contacts = service_request.contacts
@@ -43,17 +51,27 @@ class ServiceRequestSerializer(serializers.ModelSerializer):
         return None
 
 
-class ServiceProposalSerializer(serializers.ModelSerializer):
+class ServiceProposalSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     skills = serializers.SerializerMethodField()
     category = serializers.SerializerMethodField()
     user = serializers.SerializerMethodField()
 
     class Meta:
         model = ServiceProposal
-        fields = "__all__"
+        exclude = ("search_vector",)
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Join the relations and batch the skills read by the serializer."""
+        return (
+            queryset.select_related("user", "category")
+            .prefetch_related("skills")
+            .defer("search_vector")
+        )
 
     def get_skills(self, service_prop):
-        return service_prop.skills.values_list("name", flat=True)
+        # Use .all() so that prefetched skills are served from cache
+        return [skill.name for skill in service_prop.skills.all()]
 
     def get_category(self, service_prop):
         if service_prop.category:
@@ -112,20 +130,22 @@ class CreateServiceRequestSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class ServiceProposalSkillSerializer(serializers.ModelSerializer):
+class ServiceProposalSkillSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ServiceProposalSkill
         fields = "__all__"
 
 
-class ServiceCategorySerializer(serializers.ModelSerializer):
+class ServiceCategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ServiceCategory
         fields = "__all__"
 
 
 class CreateServiceProposalSerializer(serializers.ModelSerializer):
-    skills = serializers.ListField(child=serializers.CharField(), required=False)
+    skills = serializers.ListField(
+        child=serializers.CharField(max_length=50), required=False
+    )
     category_uuid = serializers.CharField(required=False)
 
     class Meta:
@@ -155,6 +175,9 @@ class UpdateServiceRequestSerializer(serializers.ModelSerializer):
 
 
 class UpdateServiceProposalSerializer(serializers.ModelSerializer):
+    skills = serializers.ListField(
+        child=serializers.CharField(max_length=50), required=False
+    )
     category_uuid = serializers.CharField(required=False)
 
     class Meta:
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 
 from app_models.models import User, UserSocials
@@ -5,6 +6,8 @@ from serializers.service_serializer import (
     ServiceProposalSerializer,
     ServiceRequestSerializer,
 )
+from utils.counter_utils import get_counters
+from utils.timing_utils import TimedSerializerMixin
 
 
 class RegisterUserSerializer(serializers.ModelSerializer):
@@ -33,7 +36,7 @@ class RegisterUserSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = (
@@ -56,8 +59,14 @@ class UserVerificationSerializer(serializers.Serializer):
     photo = serializers.ImageField()
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    Summary of a user: the counts and the PROFILE_LATEST_ITEMS latest listings,
+    the whole lists are paginated by their own endpoints.
+    """
+
     proposals = serializers.SerializerMethodField()
+    proposals_count = serializers.SerializerMethodField()
     socials = serializers.SerializerMethodField()
     
     class Meta:
@@ -72,13 +81,20 @@ class UserProfileSerializer(serializers.ModelSerializer):
             "district",
             "is_verified",
             "proposals",
+            "proposals_count",
             "socials",
         )
     
     def get_proposals(self, user):
-        user_proposals = user.services.all()
+        user_proposals = ServiceProposalSerializer.setup_eager_loading(
+            user.services.order_by("-updated_at", "-uuid")
+        )[: settings.PROFILE_LATEST_ITEMS]
         return ServiceProposalSerializer(user_proposals, many=True).data
 
+    def get_proposals_count(self, user):
+        counters = get_counters(user)
+        return counters.proposals_count if counters else 0
+
     def get_socials(self, user):
         socials = UserSocials.objects.filter(user=user).first()
         if socials:
@@ -92,6 +108,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
 class RichUserSerializer(UserProfileSerializer):
     requests = serializers.SerializerMethodField()
+    requests_count = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -104,14 +121,22 @@ class RichUserSerializer(UserProfileSerializer):
             "city",
             "district",
             "requests",
+            "requests_count",
             "proposals",
+            "proposals_count",
             "socials",
         )
 
     def get_requests(self, user):
-        user_requests = user.service_requests.all()
+        user_requests = ServiceRequestSerializer.setup_eager_loading(
+            user.service_requests.order_by("-updated_at", "-uuid")
+        )[: settings.PROFILE_LATEST_ITEMS]
         return ServiceRequestSerializer(user_requests, many=True).data
 
+    def get_requests_count(self, user):
+        counters = get_counters(user)
+        return counters.requests_count if counters else 0
+
 
 class UpdateUserSerializer(serializers.ModelSerializer):
     class Meta:
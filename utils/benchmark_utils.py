@@ -0,0 +1,544 @@
+import http.client
+import io
+import json
+import math
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.urls import URLResolver, get_resolver, resolve
+from PIL import Image
+from rest_framework_jwt.settings import api_settings
+
+from app_models.models import (
+    ServiceCategory,
+    ServiceProposal,
+    ServiceRequest,
+    ServiceRequestSocials,
+    User,
+    UserVerification,
+)
+from app_models.models.constants import ServiceRequestStatus
+from utils.common import generate_uuid
+
+BENCHMARK_USER_EMAIL = "benchmark-suite@example.com"
+BENCHMARK_STAFF_EMAIL = "benchmark-suite-staff@example.com"
+BENCHMARK_PASSWORD = "Benchmark-Password-1"
+
+# Number of SQL queries sent back by RequestTimingMiddleware
+SERVER_TIMING_QUERIES_REGEX = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+# A request to send: (case name, method, path with its query string, body,
+# content type, headers)
+RequestSpec = Tuple[str, str, str, bytes, str, Dict[str, str]]
+
+
+def get_endpoint_routes() -> List[str]:
+    """
+    List the URL patterns of the `endpoints` apps, as `resolve(path).route`
+    names them.
+
+    :return:
+    """
+    routes = []
+
+    def walk(patterns, prefix: str):
+        for pattern in patterns:
+            # Same join as Django's ResolverMatch.route
+            route = str(pattern.pattern)
+            route = prefix + (route[1:] if prefix and route.startswith("^") else route)
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns, route)
+            elif pattern.callback.__module__.startswith("endpoints."):
+                routes.append(route)
+
+    walk(get_resolver().url_patterns, "")
+    return routes
+
+
+def get_token(user: User) -> str:
+    """Get a new JWT of a user, unique even within the same second."""
+    payload = api_settings.JWT_PAYLOAD_HANDLER(user)
+    payload["jti"] = generate_uuid()
+    return api_settings.JWT_ENCODE_HANDLER(payload)
+
+
+def get_fixtures() -> Dict[str, Any]:
+    """
+    Get or create the rows the benchmark cases read and update: a user owning
+    a service request and a proposal, a staff user, and samples of the
+    generated data.
+
+    :return:
+    """
+    users = {}
+    for email, is_staff in ((BENCHMARK_USER_EMAIL, False), (BENCHMARK_STAFF_EMAIL, True)):
+        user, created = User.objects.get_or_create(
+            email=email,
+            defaults={
+                "first_name": "Benchmark",
+                "last_name": "Suite",
+                "is_active": True,
+                "is_staff": is_staff,
+            },
+        )
+        if created:
+            user.set_password(BENCHMARK_PASSWORD)
+            user.save()
+        users[is_staff] = user
+
+    user = users[False]
+    category = ServiceCategory.objects.order_by("fr_name").first()
+    service_request = ServiceRequest.objects.filter(user=user).first()
+    if not service_request:
+        service_request = ServiceRequest.objects.create(
+            user=user,
+            title="Benchmark request",
+            description="Request updated by the benchmarks",
+            city="Douala",
+            district="Akwa",
+            duration=7,
+            fixed_amount=25000,
+            category=category,
+        )
+        ServiceRequestSocials.objects.create(service_request=service_request, email=user.email)
+
+    proposal = ServiceProposal.objects.filter(user=user).first()
+    if not proposal:
+        proposal = ServiceProposal.objects.create(
+            user=user,
+            title="Benchmark proposal",
+            description="Proposal updated by the benchmarks",
+            hourly_rate=5000,
+            category=category,
+        )
+
+    # Samples of the generated data, the benchmark user owning only one row
+    sample_request = (
+        ServiceRequest.objects.filter(status=ServiceRequestStatus.ACTIVE)
+        .order_by("-updated_at", "-uuid")
+        .values_list("uuid", flat=True)
+        .first()
+    )
+    profile_user = (
+        ServiceProposal.objects.exclude(user=user).values_list("user_id", flat=True).first()
+    ) or user.uuid
+    verification = UserVerification.objects.filter(user=user).exclude(thumbnail="").first()
+
+    try:
+        static_path = staticfiles_storage.stored_name("admin/css/base.css")
+    except ValueError:
+        # No manifest, the static files are not collected
+        static_path = "admin/css/base.css"
+
+    return {
+        "user": user,
+        "staff": users[True],
+        "token": get_token(user),
+        "staff_token": get_token(users[True]),
+        "category_uuid": category.uuid if category else "",
+        "service_request_uuid": sample_request or service_request.uuid,
+        "own_request_uuid": service_request.uuid,
+        "own_proposal_uuid": proposal.uuid,
+        "profile_user_uuid": profile_user,
+        "media_path": verification.thumbnail.name if verification else None,
+        "static_path": static_path,
+        "static_collected": os.path.isfile(os.path.join(settings.STATIC_ROOT, static_path)),
+    }
+
+
+def get_photo() -> bytes:
+    """A small JPEG for the verification uploads."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (640, 480), (120, 160, 200)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def build_cases(fixtures: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Describe the requests of the benchmark suite, at least one by route of the
+    `endpoints` apps.
+
+    Each case has a `name`, a `method` and a `path`, and optionally:
+
+    - `params`: the query string parameters;
+    - `data`: the JSON body, or a function of the call index returning it;
+    - `files`: the multipart body, sent instead of `data`;
+    - `auth`: "user" or "staff" for their token, "fresh" for a new token of
+      the user at each call;
+    - `headers`: other headers;
+    - `status`: the expected status code, 200 by default;
+    - `write`: the case changes the data, only run when asked;
+    - `skip`: the reason the case cannot run.
+
+    :param fixtures: The rows of `get_fixtures`.
+    :return:
+    """
+    user = fixtures["user"]
+    services = "/api/v1/services"
+    category_uuid = fixtures["category_uuid"]
+    photo = get_photo()
+
+    return [
+        # Auth
+        {
+            "name": "login",
+            "method": "POST",
+            "path": "/api/v1/auth/login",
+            "data": {"username": user.email, "password": BENCHMARK_PASSWORD},
+        },
+        {
+            "name": "refresh",
+            "method": "POST",
+            "path": "/api/v1/auth/refresh",
+            "data": {"token": fixtures["token"]},
+        },
+        {
+            "name": "logout",
+            "method": "POST",
+            "path": "/api/v1/auth/logout",
+            "auth": "fresh",
+            "write": True,
+        },
+        {"name": "current user", "method": "GET", "path": "/api/v1/auth/current-user/", "auth": "user"},
+        # Users
+        {
+            "name": "register",
+            "method": "POST",
+            "path": "/api/v1/users/register",
+            "data": lambda index: {
+                "first_name": "Benchmark",
+                "last_name": "Register",
+                "email": f"register-{generate_uuid()[:16]}@example.com",
+                "city": "Douala",
+                "district": "Akwa",
+                "password": BENCHMARK_PASSWORD,
+                "confirm_password": BENCHMARK_PASSWORD,
+            },
+            "status": 201,
+            "write": True,
+        },
+        {
+            "name": "verify",
+            "method": "POST",
+            "path": "/api/v1/users/verify",
+            "files": {"user_uuid": user.uuid, "photo": ("benchmark.jpg", photo)},
+            "write": True,
+        },
+        {
+            "name": "user profile",
+            "method": "GET",
+            "path": f"/api/v1/users/{fixtures['profile_user_uuid']}/profile/",
+        },
+        {
+            "name": "user proposals",
+            "method": "GET",
+            "path": f"/api/v1/users/{fixtures['profile_user_uuid']}/proposals",
+        },
+        {"name": "own requests", "method": "GET", "path": "/api/v1/users/current/requests", "auth": "user"},
+        {
+            "name": "update profile",
+            "method": "PUT",
+            "path": "/api/v1/users/current/update-profile",
+            "data": {"city": "Douala", "district": "Bonapriso"},
+            "auth": "user",
+            "write": True,
+        },
+        # Services
+        {
+            "name": "create request",
+            "method": "POST",
+            "path": f"{services}/create/request",
+            "data": {
+                "title": "Benchmark request",
+                "city": "Douala",
+                "district": "Akwa",
+                "duration": 7,
+                "fixed_amount": 25000,
+                "email": user.email,
+                "category_uuid": category_uuid,
+            },
+            "auth": "user",
+            "status": 201,
+            "write": True,
+        },
+        {"name": "requests", "method": "GET", "path": f"{services}/requests/list/"},
+        {
+            "name": "requests / cursor",
+            "method": "GET",
+            "path": f"{services}/requests/list/",
+            "params": {"cursor": "", "size": 10},
+        },
+        {
+            "name": "requests / town",
+            "method": "GET",
+            "path": f"{services}/requests/list/",
+            "params": {"town": "Douala"},
+        },
+        {
+            "name": "requests / category",
+            "method": "GET",
+            "path": f"{services}/requests/list/",
+            "params": {"category_uuid": category_uuid},
+        },
+        {
+            "name": "requests / amount",
+            "method": "GET",
+            "path": f"{services}/requests/list/",
+            "params": {"min_amount": 10000, "max_amount": 50000},
+        },
+        {
+            "name": "requests / search",
+            "method": "GET",
+            "path": f"{services}/requests/list/",
+            "params": {"q": "plombier fuite"},
+        },
+        {
+            "name": "requests / deep page",
+            "method": "GET",
+            "path": f"{services}/requests/list/",
+            "params": {"page": 100},
+        },
+        {
+            "name": "request",
+            "method": "GET",
+            "path": f"{services}/requests/{fixtures['service_request_uuid']}/get/",
+        },
+        {"name": "skills", "method": "GET", "path": f"{services}/skills/"},
+        {"name": "categories", "method": "GET", "path": f"{services}/categories/"},
+        {
+            "name": "create proposal",
+            "method": "POST",
+            "path": f"{services}/create/proposal",
+            "data": {
+                "title": "Benchmark proposal",
+                "hourly_rate": 5000,
+                "skills": ["Python", "Django"],
+                "category_uuid": category_uuid,
+            },
+            "auth": "user",
+            "status": 201,
+            "write": True,
+        },
+        {"name": "proposals", "method": "GET", "path": f"{services}/proposals/list/"},
+        {
+            "name": "proposals / search",
+            "method": "GET",
+            "path": f"{services}/proposals/list/",
+            "params": {"q": "développeur python"},
+        },
+        {
+            "name": "update request",
+            "method": "PUT",
+            "path": f"{services}/update/request/{fixtures['own_request_uuid']}/",
+            "data": {"fixed_amount": 30000},
+            "auth": "user",
+            "write": True,
+        },
+        {
+            "name": "update proposal",
+            "method": "PUT",
+            "path": f"{services}/update/proposal/{fixtures['own_proposal_uuid']}/",
+            "data": {"hourly_rate": 6000, "skills": ["Python"]},
+            "auth": "user",
+            "write": True,
+        },
+        # Monitoring
+        {"name": "database health", "method": "GET", "path": "/api/v1/monitoring/health/database"},
+        {"name": "endpoint stats", "method": "GET", "path": "/api/v1/monitoring/endpoints", "auth": "staff"},
+        {
+            "name": "metrics",
+            "method": "GET",
+            "path": "/metrics",
+            "headers": {"Authorization": f"Bearer {settings.METRICS_TOKEN}"} if settings.METRICS_TOKEN else {},
+            "skip": None if settings.METRICS_TOKEN or settings.DEBUG else "no METRICS_TOKEN, /metrics is staff only",
+        },
+        # Docs
+        {"name": "openapi schema", "method": "GET", "path": "/swagger.json", "headers": {"Accept-Encoding": "gzip"}},
+        {"name": "swagger ui", "method": "GET", "path": "/"},
+        # Media
+        {
+            "name": "media",
+            "method": "GET",
+            "path": f"/media/{fixtures['media_path']}",
+            "auth": "user",
+            "skip": None if fixtures["media_path"] else "no processed verification photo of the benchmark user",
+        },
+        {
+            "name": "static",
+            "method": "GET",
+            "path": f"/static/{fixtures['static_path']}",
+            "skip": None if fixtures["static_collected"] else "the static files are not collected",
+        },
+    ]
+
+
+def get_case_route(case: Dict[str, Any]) -> str:
+    return resolve(case["path"]).route
+
+
+def build_requests(case: Dict[str, Any], fixtures: Dict[str, Any], count: int) -> List[RequestSpec]:
+    """
+    Build the requests of a case.
+
+    :param case: A case of `build_cases`.
+    :param fixtures: The rows of `get_fixtures`.
+    :param count: The number of requests.
+    :return:
+    """
+    path = case["path"]
+    if case.get("params"):
+        path = f"{path}?{urlencode(case['params'])}"
+
+    requests = []
+    for index in range(count):
+        headers = dict(case.get("headers", {}))
+        auth = case.get("auth")
+        if auth:
+            token = {
+                "user": fixtures["token"],
+                "staff": fixtures["staff_token"],
+                "fresh": get_token(fixtures["user"]) if auth == "fresh" else None,
+            }[auth]
+            headers["Authorization"] = f"Bearer {token}"
+
+        body, content_type = b"", ""
+        if "files" in case:
+            files = {
+                name: value if isinstance(value, str) else named_file(*value)
+                for name, value in case["files"].items()
+            }
+            body, content_type = encode_multipart(BOUNDARY, files), MULTIPART_CONTENT
+        elif "data" in case:
+            data = case["data"](index) if callable(case["data"]) else case["data"]
+            body, content_type = json.dumps(data).encode(), "application/json"
+
+        requests.append((case["name"], case["method"], path, body, content_type, headers))
+
+    return requests
+
+
+def named_file(name: str, content: bytes) -> io.BytesIO:
+    file = io.BytesIO(content)
+    file.name = name
+    return file
+
+
+def parse_queries(server_timing: Optional[str]) -> Optional[int]:
+    """
+    Get the number of SQL queries of a Server-Timing header.
+
+    :param server_timing:
+    :return: The number, or None when REQUEST_TIMING_HEADER is disabled.
+    """
+    match = SERVER_TIMING_QUERIES_REGEX.search(server_timing or "")
+    return int(match.group(1)) if match else None
+
+
+def run_http_requests(base_url: str, requests: List[RequestSpec], timeout: float) -> List[tuple]:
+    """
+    Send requests one after the other on a keep-alive connection, from a
+    worker process of the HTTP load driver.
+
+    :param base_url: The URL of the server, e.g. http://127.0.0.1:8000.
+    :param requests: The requests of `build_requests`.
+    :param timeout: In seconds.
+    :return: A list of (case name, status code, duration in ms, SQL queries).
+    """
+    url = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+    http_connection = connection_class(url.netloc, timeout=timeout)
+
+    results = []
+    for name, method, path, body, content_type, headers in requests:
+        headers = {**headers, **({"Content-Type": content_type} if content_type else {})}
+        start = time.perf_counter()
+        try:
+            http_connection.request(method, f"{url.path.rstrip('/')}{path}", body=body or None, headers=headers)
+            response = http_connection.getresponse()
+            response.read()
+            status_code, queries = response.status, parse_queries(response.getheader("Server-Timing"))
+        except (OSError, http.client.HTTPException):
+            http_connection.close()
+            status_code, queries = 0, None
+        results.append((name, status_code, (time.perf_counter() - start) * 1000, queries))
+
+    http_connection.close()
+    return results
+
+
+def percentile(sorted_values: List[float], rank: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return sorted_values[max(0, math.ceil(rank / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(durations: List[float], queries: List[Optional[int]], errors: int) -> Dict[str, Any]:
+    """
+    Summarize the calls of a case.
+
+    :param durations: The durations of the calls, in ms.
+    :param queries: The SQL queries of the calls, None when unknown.
+    :param errors: The number of calls answered with an unexpected status.
+    :return:
+    """
+    durations = sorted(durations)
+    known_queries = [count for count in queries if count is not None]
+    return {
+        "requests": len(durations),
+        "errors": errors,
+        "p50_ms": round(percentile(durations, 50), 2),
+        "p95_ms": round(percentile(durations, 95), 2),
+        "p99_ms": round(percentile(durations, 99), 2),
+        "mean_ms": round(sum(durations) / len(durations), 2),
+        # The median, a few calls filling the caches of the process running more queries
+        "queries": percentile(sorted(known_queries), 50) if known_queries else None,
+        "max_queries": max(known_queries) if known_queries else None,
+    }
+
+
+def diff_results(
+    results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_delta_ms: float
+) -> List[Dict[str, Any]]:
+    """
+    Compare the cases of a run with a stored baseline.
+
+    A case regresses when its p95 grows by more than `tolerance` (and more
+    than `min_delta_ms`, to ignore the noise of the fastest cases), when it
+    runs more SQL queries, or when it gets more errors.
+
+    :param results: The results of the run.
+    :param baseline: The results of a previous run.
+    :param tolerance: The relative growth of the p95 tolerated, e.g. 0.2.
+    :param min_delta_ms:
+    :return: A row by case found in both, with its changes.
+    """
+    rows = []
+    for name, current in results["cases"].items():
+        previous = baseline["cases"].get(name)
+        if not previous:
+            continue
+
+        delta_ms = current["p95_ms"] - previous["p95_ms"]
+        slower = delta_ms > min_delta_ms and delta_ms > previous["p95_ms"] * tolerance
+        more_queries = (
+            current["queries"] is not None
+            and previous["queries"] is not None
+            and current["queries"] > previous["queries"]
+        )
+        rows.append(
+            {
+                "name": name,
+                "p95_ms": (previous["p95_ms"], current["p95_ms"]),
+                "p95_change": delta_ms / previous["p95_ms"] if previous["p95_ms"] else 0.0,
+                "queries": (previous["queries"], current["queries"]),
+                "errors": (previous["errors"], current["errors"]),
+                "regression": slower or more_queries or current["errors"] > previous["errors"],
+            }
+        )
+
+    return rows
@@ -0,0 +1,192 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Set, Tuple
+
+from django.conf import settings
+from django.utils.http import parse_etags
+
+from app_models.models import CacheVersion
+from utils.common import generate_uuid
+from utils.db_router import use_primary
+from utils.metrics_utils import get_cache_counters
+
+REFERENCE_DATA_VERSION_KEY = "reference-data"
+
+# Process local copies of the reference data: name -> (version, value, etag)
+_reference_data: Dict[str, Tuple[str, Any, str]] = {}
+_reference_data_hits, _reference_data_misses = get_cache_counters("reference_data")
+
+
+def get_reference_data_version() -> str:
+    """
+    Get the version of the reference data shared by all the processes of all
+    the containers, kept in the database and read at most once every
+    REFERENCE_DATA_VERSION_TTL seconds by each process.
+
+    :return:
+    """
+    version = _reference_data_version.get(REFERENCE_DATA_VERSION_KEY)
+    if version is not None:
+        return version
+
+    with use_primary():
+        # Another process may initialize it at the same time, keep the first one
+        version = CacheVersion.objects.get_or_create(
+            name=REFERENCE_DATA_VERSION_KEY, defaults={"version": generate_uuid()}
+        )[0].version
+
+    _reference_data_version.set(REFERENCE_DATA_VERSION_KEY, version)
+    return version
+
+
+def bump_reference_data_version():
+    """
+    Invalidate the reference data cached by all the processes, at once in
+    this one and within REFERENCE_DATA_VERSION_TTL seconds in the others.
+
+    :return:
+    """
+    CacheVersion.objects.update_or_create(
+        name=REFERENCE_DATA_VERSION_KEY, defaults={"version": generate_uuid()}
+    )
+    _reference_data_version.clear()
+    _reference_data.clear()
+
+
+def get_reference_data(name: str, loader: Callable[[], Any]) -> Tuple[Any, str]:
+    """
+    Get a reference data from the process memory, loading it if it is outdated.
+
+    :param name: The name of the reference data.
+    :param loader: The function loading the data from the database.
+    :return: A tuple (value, etag).
+    """
+    # Read the version before loading, so that a concurrent change is never
+    # stored under the new version
+    version = get_reference_data_version()
+    entry = _reference_data.get(name)
+    if entry and entry[0] == version:
+        _reference_data_hits.inc()
+        return entry[1], entry[2]
+
+    _reference_data_misses.inc()
+
+    # Never keep the outdated rows of a lagging replica under the new version
+    with use_primary():
+        value = loader()
+    etag = '"%s"' % hashlib.sha1(f"{name}:{version}".encode()).hexdigest()
+    _reference_data[name] = (version, value, etag)
+    return value, etag
+
+
+def etag_matches(request: Any, etag: str) -> bool:
+    """
+    Check if the client already has the representation identified by the etag.
+
+    :param request:
+    :param etag:
+    :return:
+    """
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if not if_none_match:
+        return False
+
+    etags = parse_etags(if_none_match)
+    return "*" in etags or etag in etags
+
+
+class TTLCache:
+    """
+    Thread safe LRU cache whose entries expire after `ttl` seconds.
+
+    The cache holds at most `maxsize` entries, the least recently used one is
+    evicted first. A `maxsize` or a `ttl` of 0 disables the cache. Its hits and
+    misses are exported to the metrics under its `name`.
+
+    With an `index` function, the keys are also indexed by `index(value)`, so
+    that `discard_indexed` removes the entries of a value in constant time.
+    """
+
+    def __init__(
+        self, maxsize: int, ttl: float, name: str, index: Callable[[Any], Hashable] = None
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self.index = index
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._hits_counter, self._misses_counter = get_cache_counters(name)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._index: Dict[Hashable, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                self._misses_counter.inc()
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._hits_counter.inc()
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float = None):
+        """Store a value, `ttl` overrides the default time to live of the cache."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            if self.index:
+                self._index.setdefault(self.index(value), set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def discard_indexed(self, index_key: Hashable):
+        """Remove the entries whose value has this `index(value)`."""
+        with self._lock:
+            for key in list(self._index.get(index_key, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+
+    def _remove(self, key: Hashable):
+        """Remove an entry and its index, the lock being held."""
+        _, value = self._entries.pop(key)
+        if self.index:
+            index_key = self.index(value)
+            keys = self._index[index_key]
+            keys.discard(key)
+            if not keys:
+                del self._index[index_key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Process local copy of the reference data version, see get_reference_data_version
+_reference_data_version = TTLCache(
+    maxsize=1, ttl=settings.REFERENCE_DATA_VERSION_TTL, name="reference_data_version"
+)
@@ -0,0 +1,152 @@
+import hashlib
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from app_models.models import ServiceCategoryCounters
+from utils.cache_utils import TTLCache
+
+# Recomputed counts of each counters table, compared to the stored ones
+RECONCILE_SQL = {
+    "app_models_usercounters": """
+        SELECT u.uuid, coalesce(r.total, 0), coalesce(p.total, 0)
+        FROM app_models_user u
+        LEFT JOIN (
+            SELECT user_id, count(*) AS total FROM app_models_servicerequest GROUP BY user_id
+        ) r ON r.user_id = u.uuid
+        LEFT JOIN (
+            SELECT user_id, count(*) AS total FROM app_models_serviceproposal GROUP BY user_id
+        ) p ON p.user_id = u.uuid
+    """,
+    "app_models_servicecategorycounters": """
+        SELECT c.uuid, coalesce(r.total, 0), coalesce(p.total, 0)
+        FROM app_models_servicecategory c
+        LEFT JOIN (
+            SELECT category_id, count(*) AS total FROM app_models_servicerequest
+            WHERE status = 'active' GROUP BY category_id
+        ) r ON r.category_id = c.uuid
+        LEFT JOIN (
+            SELECT category_id, count(*) AS total FROM app_models_serviceproposal
+            GROUP BY category_id
+        ) p ON p.category_id = c.uuid
+    """,
+    "app_models_serviceproposalskillcounters": """
+        SELECT s.id, coalesce(ps.total, 0)
+        FROM app_models_serviceproposalskill s
+        LEFT JOIN (
+            SELECT serviceproposalskill_id, count(*) AS total
+            FROM app_models_serviceproposal_skills GROUP BY serviceproposalskill_id
+        ) ps ON ps.serviceproposalskill_id = s.id
+    """,
+}
+
+COUNTERS_COLUMNS = {
+    "app_models_usercounters": ("user_id", ["requests_count", "proposals_count"]),
+    "app_models_servicecategorycounters": (
+        "category_id",
+        ["active_requests_count", "proposals_count"],
+    ),
+    "app_models_serviceproposalskillcounters": ("skill_id", ["proposals_count"]),
+}
+
+# Process local copy of the categories counters, they are read by every
+# categories listing and a few seconds of lag are fine there
+category_counters_cache = TTLCache(
+    maxsize=1, ttl=settings.CATEGORY_COUNTERS_TTL, name="category_counters"
+)
+
+
+def reconcile_counters(dry_run: bool = False) -> Dict[str, int]:
+    """
+    Recompute all the counters and fix the ones that drifted.
+
+    The counters tables are locked meanwhile: the services can still be read
+    but their changes wait for the end of the reconciliation.
+
+    :param dry_run: Only count the drifted counters.
+    :return: The number of drifted counters, per counters table.
+    """
+    drifts = {}
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table in RECONCILE_SQL:
+            # Blocks the triggers, so that no change happens between the
+            # counting and the writing
+            cursor.execute(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE")
+
+        for table, select_sql in RECONCILE_SQL.items():
+            key, columns = COUNTERS_COLUMNS[table]
+            # The entities without a counters row yet count as zero: their row
+            # is only created by their first service
+            drifted_sql = f"""
+                SELECT expected.* FROM ({select_sql}) AS expected (key, {", ".join(columns)})
+                LEFT JOIN {table} ON {table}.{key} = expected.key
+                WHERE ROW({", ".join(f"COALESCE({table}.{column}, 0)" for column in columns)})
+                    IS DISTINCT FROM ROW({", ".join(f"expected.{column}" for column in columns)})
+            """
+            if dry_run:
+                cursor.execute(f"SELECT count(*) FROM ({drifted_sql}) AS drifted")
+                drifts[table] = cursor.fetchone()[0]
+            else:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {table} ({key}, {", ".join(columns)}) {drifted_sql}
+                    ON CONFLICT ({key}) DO UPDATE
+                    SET {", ".join(f"{column} = EXCLUDED.{column}" for column in columns)}
+                    """
+                )
+                drifts[table] = cursor.rowcount
+
+    category_counters_cache.clear()
+    return drifts
+
+
+def get_category_counters() -> Dict[str, Dict[str, int]]:
+    """
+    Get the counters of all the categories, from a process local cache kept
+    CATEGORY_COUNTERS_TTL seconds.
+
+    :return: The counters per category uuid.
+    """
+    counters = category_counters_cache.get("counters")
+    if counters is None:
+        counters = {
+            category_id: {
+                "active_requests_count": active_requests_count,
+                "proposals_count": proposals_count,
+            }
+            for category_id, active_requests_count, proposals_count in (
+                ServiceCategoryCounters.objects.values_list(
+                    "category_id", "active_requests_count", "proposals_count"
+                )
+            )
+        }
+        category_counters_cache.set("counters", counters)
+
+    return counters
+
+
+def get_counters(instance: Any) -> Optional[Any]:
+    """
+    Get the counters of a user, a category or a skill, None if it has no
+    service yet.
+
+    :param instance:
+    :return:
+    """
+    try:
+        return instance.counters
+    except type(instance).counters.RelatedObjectDoesNotExist:
+        return None
+
+
+def get_counters_etag(etag: str, counters: Dict[str, Any]) -> str:
+    """
+    Derive an etag changing with the counters from the etag of a data.
+
+    :param etag:
+    :param counters:
+    :return:
+    """
+    digest = hashlib.sha1(f"{etag}:{sorted(counters.items())}".encode()).hexdigest()
+    return f'"{digest}"'
@@ -0,0 +1,131 @@
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from utils.db_utils import get_replica_lag
+
+# Routing state of the current request: {"replica": alias or None, "wrote": bool},
+# None outside the requests allowed to read from the replicas (writes, admin,
+# management commands, background workers...)
+_routing_state: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "replica_routing_state", default=None
+)
+
+# Process local availability of the replicas: alias -> (checked_at, available)
+_replicas_availability: Dict[str, Tuple[float, bool]] = {}
+_availability_lock = threading.Lock()
+
+
+class ReplicaRouter:
+    """
+    Send the reads of the requests allowed by `ReplicaRoutingMiddleware` to a
+    replica, everything else to the primary (default database).
+
+    A request reads from a single replica, and from the primary once it wrote
+    or inside a transaction, so that it always sees its own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or state["wrote"] or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        if state["replica"] is None:
+            replicas = [alias for alias in settings.DATABASE_REPLICAS if is_replica_available(alias)]
+            # Fall back to the primary when every replica lags or is down
+            state["replica"] = random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+        return state["replica"]
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state["wrote"] = True
+
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def start_replica_reads() -> contextvars.Token:
+    """
+    Let the reads of the current request go to the replicas.
+
+    :return: The token to give to `stop_replica_reads`.
+    """
+    return _routing_state.set({"replica": None, "wrote": False})
+
+
+def stop_replica_reads(token: contextvars.Token) -> bool:
+    """
+    Send the reads back to the primary, at the end of the request.
+
+    :param token: The token returned by `start_replica_reads`.
+    :return: True if the request wrote to the primary.
+    """
+    state = _routing_state.get()
+    _routing_state.reset(token)
+    return bool(state and state["wrote"])
+
+
+@contextmanager
+def use_primary():
+    """
+    Read from the primary within the block, e.g. before filling a process
+    cache which must not keep the outdated rows of a replica.
+    """
+    token = _routing_state.set(None)
+    try:
+        yield
+    finally:
+        _routing_state.reset(token)
+
+
+def is_replica_available(alias: str) -> bool:
+    """
+    Check if a replica answers and lags at most DATABASE_REPLICA_MAX_LAG
+    seconds behind the primary.
+
+    The lag is measured at most every DATABASE_REPLICA_LAG_CHECK_INTERVAL
+    seconds, by a single thread, the others using the last measure meanwhile.
+
+    :param alias: The database alias of the replica.
+    :return:
+    """
+    current_time = time.monotonic()
+    with _availability_lock:
+        checked_at, available = _replicas_availability.get(alias, (None, False))
+        interval = settings.DATABASE_REPLICA_LAG_CHECK_INTERVAL
+        if checked_at is not None and current_time - checked_at < interval:
+            return available
+
+        # Claim the check, the other threads keep the last availability
+        _replicas_availability[alias] = (current_time, available)
+
+    try:
+        lag = get_replica_lag(alias)
+        available = lag <= settings.DATABASE_REPLICA_MAX_LAG
+        if not available:
+            logging.warning(f"Replica {alias} lags {lag:.1f}s behind, reading from the primary")
+    except DatabaseError:
+        logging.exception(f"Replica {alias} unavailable, reading from the primary")
+        available = False
+        # Reconnect at the next check
+        connections[alias].close()
+
+    with _availability_lock:
+        _replicas_availability[alias] = (current_time, available)
+
+    return available
@@ -0,0 +1,108 @@
+import threading
+import weakref
+from typing import Any, Dict
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Seconds since the last transaction replayed by a replica, 0 when it replayed
+# everything it received, or when it is not a replica
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+# Process wide count of the connections opened by alias, and the connection
+# wrappers of the threads which opened them
+_opened_connections: Dict[str, int] = {}
+_connection_wrappers = weakref.WeakSet()
+_lock = threading.Lock()
+
+
+def count_opened_connection(connection: Any):
+    """
+    Count a new database connection of the process.
+
+    :param connection: The Django connection wrapper.
+    :return:
+    """
+    with _lock:
+        _opened_connections[connection.alias] = _opened_connections.get(connection.alias, 0) + 1
+        _connection_wrappers.add(connection)
+
+
+def get_database_stats(alias: str = DEFAULT_DB_ALIAS) -> Dict[str, Any]:
+    """
+    Get the connection statistics of the process, from the pool when there is
+    one, otherwise from the persistent connections.
+
+    - in_use: connections lent to a request (with a pool) or open.
+    - available: idle connections of the pool.
+    - waiting: requests waiting for a free connection of the pool.
+    - created: connections created since the start of the process.
+
+    :param alias: The database alias.
+    :return:
+    """
+    connection = connections[alias]
+    pool = connection.pool
+
+    if pool is not None:
+        stats = pool.get_stats()
+        return {
+            "mode": "pool",
+            "in_use": stats["pool_size"] - stats["pool_available"],
+            "available": stats["pool_available"],
+            "waiting": stats.get("requests_waiting", 0),
+            "created": stats.get("connections_num", 0),
+            "min_size": stats["pool_min"],
+            "max_size": stats["pool_max"],
+            "requests": stats.get("requests_num", 0),
+            "requests_wait_ms": stats.get("requests_wait_ms", 0),
+            "requests_errors": stats.get("requests_errors", 0),
+            "connections_lost": stats.get("connections_lost", 0),
+        }
+
+    with _lock:
+        created = _opened_connections.get(alias, 0)
+        in_use = sum(
+            1
+            for wrapper in _connection_wrappers
+            if wrapper.alias == alias and wrapper.connection is not None
+        )
+
+    return {
+        "mode": "persistent" if connection.settings_dict["CONN_MAX_AGE"] else "per-request",
+        "in_use": in_use,
+        "available": 0,
+        "waiting": 0,
+        "created": created,
+        "conn_max_age": connection.settings_dict["CONN_MAX_AGE"],
+    }
+
+
+def check_database(alias: str = DEFAULT_DB_ALIAS) -> bool:
+    """
+    Check that the database answers.
+
+    :param alias: The database alias.
+    :return:
+    """
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1")
+        return cursor.fetchone() == (1,)
+
+
+def get_replica_lag(alias: str) -> float:
+    """
+    Measure how late a replica is on the primary.
+
+    :param alias: The database alias of the replica.
+    :return: The lag in seconds.
+    :raises DatabaseError: If the replica does not answer.
+    """
+    with connections[alias].cursor() as cursor:
+        cursor.execute(REPLICA_LAG_SQL)
+        return float(cursor.fetchone()[0])
@@ -0,0 +1,93 @@
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from app_models.models import UserVerification
+from utils.worker_utils import WorkerPool
+
+RENDITION_QUALITY = 85
+
+image_pool = WorkerPool("image-processing", "IMAGE_PROCESSING_WORKERS")
+
+
+def render_image(image: Image.Image, max_size: int) -> ContentFile:
+    """
+    Downscale an image to fit in a square and encode it as a JPEG.
+
+    No metadata is written: EXIF (location, device...), XMP and ICC profile are
+    dropped.
+
+    :param image: An RGB image.
+    :param max_size: The longest side of the rendition, in pixels.
+    :return:
+    """
+    rendition = image.copy()
+    rendition.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+
+    buffer = io.BytesIO()
+    rendition.save(buffer, "JPEG", quality=RENDITION_QUALITY, optimize=True, progressive=True)
+    return ContentFile(buffer.getvalue())
+
+
+def process_verification_photo(verification_pk: int) -> bool:
+    """
+    Build the review rendition and the thumbnail of a verification photo.
+
+    When the photo has been replaced meanwhile, the renditions are dropped,
+    those of the new photo being built by its own processing.
+
+    :param verification_pk:
+    :return: True if the renditions have been stored.
+    """
+    verification = UserVerification.objects.filter(pk=verification_pk).first()
+    if not verification or not verification.verification_photo:
+        return False
+
+    photo_name = verification.verification_photo.name
+    with verification.verification_photo.open("rb") as photo, Image.open(photo) as image:
+        # Let the JPEG decoder downscale, a phone photo is then decoded at a
+        # fraction of its full size
+        image.draft("RGB", (settings.VERIFICATION_REVIEW_SIZE, settings.VERIFICATION_REVIEW_SIZE))
+        # Apply the EXIF orientation before dropping the EXIF data
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        review = render_image(image, settings.VERIFICATION_REVIEW_SIZE)
+        thumbnail = render_image(image, settings.VERIFICATION_THUMBNAIL_SIZE)
+
+    previous_names = [verification.review_photo.name, verification.thumbnail.name]
+    base_name = os.path.splitext(os.path.basename(photo_name))[0]
+    verification.review_photo.save(f"{base_name}-review.jpg", review, save=False)
+    verification.thumbnail.save(f"{base_name}-thumbnail.jpg", thumbnail, save=False)
+    new_names = [verification.review_photo.name, verification.thumbnail.name]
+
+    # Updates only the renditions, and only if the photo is still the same
+    stored = UserVerification.objects.filter(
+        pk=verification_pk, verification_photo=photo_name
+    ).update(review_photo=new_names[0], thumbnail=new_names[1])
+
+    storage = verification.verification_photo.storage
+    for name in previous_names if stored else new_names:
+        if name:
+            try:
+                storage.delete(name)
+            except OSError:
+                logging.exception(f"Error deleting the rendition {name}")
+
+    return bool(stored)
+
+
+def schedule_verification_photo_processing(verification_pk: int):
+    """
+    Process a verification photo in the image workers, outside the request.
+
+    With IMAGE_PROCESSING_WORKERS at 0, it is processed at once. The photos
+    whose processing was lost, e.g. on a restart, are processed by
+    `python manage.py process_verification_photos`.
+
+    :param verification_pk:
+    :return:
+    """
+    image_pool.submit(process_verification_photo, verification_pk)
@@ -0,0 +1,89 @@
+import mimetypes
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+# One year, the longest lifetime HTTP caches are asked to honour
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def send_file(request, root: str, path: str, kind: str, cache_control: str) -> HttpResponse:
+    """
+    Answer with a file, sent by the front proxy when FILES_SERVING_MODE allows
+    it, otherwise by the server (sendfile when it supports it).
+
+    The access must be checked before calling it.
+
+    :param request:
+    :param root: The directory of the files, e.g. MEDIA_ROOT.
+    :param path: The path of the file in the directory.
+    :param kind: The kind of files ("media" or "static"), locating them behind
+        FILES_ACCEL_REDIRECT_PREFIX.
+    :param cache_control: The Cache-Control header of the response.
+    :return:
+    :raises Http404: If the file does not exist or is outside the directory.
+    """
+    try:
+        full_path = Path(safe_join(root, path))
+    except ValueError:
+        raise Http404("File not found")
+
+    if not full_path.is_file():
+        raise Http404("File not found")
+
+    stat = full_path.stat()
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+
+    if not was_modified_since(request.META.get("HTTP_IF_MODIFIED_SINCE"), stat.st_mtime):
+        response = HttpResponseNotModified()
+    elif settings.FILES_SERVING_MODE == "x-accel":
+        # nginx: `location <prefix> { internal; alias <root of the kind>; }`
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = quote(f"{settings.FILES_ACCEL_REDIRECT_PREFIX}{kind}/{path}")
+    elif settings.FILES_SERVING_MODE == "x-sendfile":
+        # Apache (mod_xsendfile) and lighttpd
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = str(full_path)
+    else:
+        # Sent with the wsgi.file_wrapper of the server, i.e. sendfile() on gunicorn
+        response = FileResponse(full_path.open("rb"), content_type=content_type)
+        if encoding:
+            response["Content-Encoding"] = encoding
+
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Cache-Control"] = cache_control
+    return response
+
+
+@lru_cache(maxsize=1)
+def get_hashed_static_files() -> frozenset:
+    """
+    Get the names of the static files holding a hash of their content, whose
+    content therefore never changes.
+
+    :return:
+    """
+    hashed_files = getattr(staticfiles_storage, "hashed_files", {})
+    return frozenset(hashed_files.values())
+
+
+def get_static_cache_control(path: str) -> str:
+    """
+    Get the Cache-Control of a static file: cached for a year when its name
+    holds a hash, revalidated otherwise.
+
+    :param path:
+    :return:
+    """
+    if path in get_hashed_static_files():
+        return IMMUTABLE_CACHE_CONTROL
+
+    return "public, no-cache"
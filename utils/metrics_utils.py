@@ -0,0 +1,133 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+# The metrics are written by each process in PROMETHEUS_MULTIPROC_DIR when it is
+# set (gunicorn workers), and summed when scraped, whatever the worker answering.
+# It must be set before the start of the workers, see gunicorn.conf.py.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# The labelled metrics below open their file as soon as they are created: any
+# process started before gunicorn (manage.py commands) would otherwise crash
+if MULTIPROCESS:
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Duration of the requests, by URL pattern",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in SQL queries by the requests, by URL pattern",
+    ["method", "route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Number of SQL queries of the requests, by URL pattern",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+
+AUTH_DURATION = Histogram(
+    "auth_duration_seconds",
+    "Duration of the authentication steps: token decoding and user lookup",
+    ["step"],
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1),
+)
+AUTH_DECODE_DURATION = AUTH_DURATION.labels(step="decode")
+AUTH_LOOKUP_DURATION = AUTH_DURATION.labels(step="lookup")
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Reads of the process caches, by cache and result (hit or miss)",
+    ["cache", "result"],
+)
+
+DB_CONNECTIONS = Gauge(
+    "db_connections",
+    "Database connections of the live processes: in_use, available (pool), "
+    "waiting (requests waiting for the pool), created (since the process start)",
+    ["alias", "state"],
+    multiprocess_mode="livesum",
+)
+
+UPLOAD_SIZE = Histogram(
+    "upload_size_bytes",
+    "Size of the uploaded files, by form field",
+    ["field"],
+    buckets=tuple(size * 1024 for size in (16, 64, 256, 1024, 2048, 5120, 10240)),
+)
+UPLOAD_REJECTED = Counter(
+    "upload_rejected_total",
+    "Uploads stopped while received, by HTTP status (413 too large, 415 not an image)",
+    ["status"],
+)
+
+
+def get_cache_counters(cache_name: str):
+    """
+    Get the hit and miss counters of a cache.
+
+    :param cache_name:
+    :return: A tuple (hits counter, misses counter).
+    """
+    return (
+        CACHE_REQUESTS.labels(cache=cache_name, result="hit"),
+        CACHE_REQUESTS.labels(cache=cache_name, result="miss"),
+    )
+
+
+def observe_request(method: str, route: str, status_code: int, durations: dict, queries: int):
+    """
+    Add a request to the histograms of its URL pattern.
+
+    :param method:
+    :param route: The URL pattern.
+    :param status_code:
+    :param durations: The durations of `RequestTiming.get_durations`, in milliseconds.
+    :param queries: The number of SQL queries.
+    :return:
+    """
+    REQUEST_DURATION.labels(method=method, route=route, status=status_code).observe(
+        durations["total"] / 1000
+    )
+    REQUEST_DB_DURATION.labels(method=method, route=route).observe(durations["db"] / 1000)
+    REQUEST_DB_QUERIES.labels(method=method, route=route).observe(queries)
+
+
+def set_database_gauges(alias: str, stats: dict):
+    """
+    Publish the connection statistics of the process.
+
+    :param alias: The database alias.
+    :param stats: The statistics of `get_database_stats`.
+    :return:
+    """
+    for state in ("in_use", "available", "waiting", "created"):
+        DB_CONNECTIONS.labels(alias=alias, state=state).set(stats[state])
+
+
+def render_metrics() -> tuple:
+    """
+    Render the metrics of all the processes in the Prometheus text format.
+
+    :return: A tuple (content, content type).
+    """
+    registry = REGISTRY
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
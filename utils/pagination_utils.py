@@ -0,0 +1,202 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+
+
+class InvalidPagination(ValueError):
+    """Raised when the pagination query parameters are invalid."""
+
+
+class InvalidCursor(InvalidPagination):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def get_positive_int(query_params, name: str, default: int, maximum: Optional[int] = None) -> int:
+    """
+    Read a positive integer query parameter.
+
+    :param query_params:
+    :param name: The name of the parameter.
+    :param default: The value when the parameter is missing or empty.
+    :param maximum: The greatest value allowed, if any.
+    :return:
+    :raises InvalidPagination: If the value is not an integer between 1 and `maximum`.
+    """
+    value = query_params.get(name, "").strip()
+    if value == "":
+        return default
+
+    try:
+        value = int(value)
+    except ValueError:
+        value = 0
+
+    if value < 1 or (maximum is not None and value > maximum):
+        bounds = f"between 1 and {maximum}" if maximum is not None else "greater than 0"
+        raise InvalidPagination(f"The {name} must be an integer {bounds} !")
+
+    return value
+
+
+def get_pagination_params(query_params) -> Tuple[int, int, str]:
+    """
+    Read the page, size and sort query parameters of the listings.
+
+    :param query_params:
+    :return: A tuple (page, size, sort).
+    :raises InvalidPagination: If the page or the size is invalid.
+    """
+    page = get_positive_int(query_params, "page", 1)
+    size = get_positive_int(query_params, "size", 10, settings.PAGINATION_MAX_SIZE)
+    sort = "asc" if query_params.get("sort", "").strip() == "asc" else "desc"
+    return page, size, sort
+
+
+def encode_cursor(updated_at: datetime, uuid: str, sort: str = "desc") -> str:
+    """
+    Build an opaque cursor pointing right after the given row.
+
+    :param updated_at: The updated_at value of the last returned row.
+    :param uuid: The uuid of the last returned row.
+    :param sort: The sorting order the cursor belongs to ("asc" or "desc").
+    :return:
+    """
+    raw = json.dumps(
+        {"t": updated_at.isoformat(), "u": uuid, "s": sort}, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str, str]:
+    """
+    Decode a cursor built by `encode_cursor`.
+
+    :param cursor:
+    :return: A tuple (updated_at, uuid, sort).
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        updated_at = datetime.fromisoformat(data["t"])
+        uuid = str(data["u"])
+        sort = "asc" if data.get("s") == "asc" else "desc"
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor !") from e
+
+    return updated_at, uuid, sort
+
+
+def keyset_queryset(
+    queryset: QuerySet, cursor: Optional[str], sort: str = "desc"
+) -> Tuple[QuerySet, str]:
+    """
+    Restrict and order a queryset to the rows following the cursor.
+
+    :param queryset: The filtered queryset to paginate.
+    :param cursor: The cursor returned by the previous page, or None for the first page.
+    :param sort: The sorting order ("asc" or "desc"), overridden by the cursor if any.
+    :return: A tuple (queryset, sort).
+    """
+    if cursor:
+        updated_at, uuid, sort = decode_cursor(cursor)
+        if sort == "asc":
+            queryset = queryset.filter(
+                Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, uuid__gt=uuid)
+            )
+        else:
+            queryset = queryset.filter(
+                Q(updated_at__lt=updated_at) | Q(updated_at=updated_at, uuid__lt=uuid)
+            )
+
+    if sort == "asc":
+        queryset = queryset.order_by("updated_at", "uuid")
+    else:
+        queryset = queryset.order_by("-updated_at", "-uuid")
+
+    return queryset, sort
+
+
+def keyset_paginate(
+    queryset: QuerySet, cursor: Optional[str], size: int, sort: str = "desc"
+) -> Tuple[list, Optional[str]]:
+    """
+    Paginate a queryset on (updated_at, uuid) without OFFSET nor COUNT.
+
+    Rows inserted or updated while a client walks through the feed are never
+    duplicated or skipped within the already visited part of the feed.
+
+    :param queryset: The filtered queryset to paginate.
+    :param cursor: The cursor returned by the previous page, or None for the first page.
+    :param size: The number of items per page.
+    :param sort: The sorting order ("asc" or "desc"), overridden by the cursor if any.
+    :return: A tuple (items, next_cursor). next_cursor is None on the last page.
+    """
+    if size < 1:
+        raise InvalidPagination("The size must be an integer greater than 0 !")
+
+    queryset, sort = keyset_queryset(queryset, cursor, sort)
+
+    # Fetch one extra row to know if there is a next page
+    items = list(queryset[: size + 1])
+    next_cursor = None
+    if len(items) > size:
+        items = items[:size]
+        last_item = items[-1]
+        next_cursor = encode_cursor(last_item.updated_at, last_item.uuid, sort)
+
+    return items, next_cursor
+
+
+def paginate(queryset: QuerySet, query_params, serializer_class, name: str) -> dict:
+    """
+    Paginate a queryset like the listing endpoints, in page mode or in cursor
+    mode when the `cursor` query parameter is given.
+
+    :param queryset: The filtered queryset to paginate.
+    :param query_params: The query parameters (page, size, sort, cursor).
+    :param serializer_class: The serializer of the items.
+    :param name: The key of the items in the output.
+    :return: The output of the endpoint.
+    :raises InvalidPagination: If the page, the size or the cursor is invalid.
+    """
+    page, size, sort = get_pagination_params(query_params)
+
+    if "cursor" in query_params:
+        items, next_cursor = keyset_paginate(
+            queryset, query_params["cursor"].strip() or None, size, sort
+        )
+        return {
+            "size": size,
+            "more": next_cursor is not None,
+            "next_cursor": next_cursor,
+            name: serializer_class(items, many=True).data,
+        }
+
+    ordering = ["updated_at", "uuid"] if sort == "asc" else ["-updated_at", "-uuid"]
+    # The most relevant items first when searching, see search_queryset
+    searching = "search_rank" in queryset.query.annotations
+    if searching:
+        ordering.insert(0, "-search_rank")
+
+    queryset = queryset.order_by(*ordering)
+    total = queryset.count()
+    start = (page - 1) * size
+    end = page * size
+
+    output = {
+        "page": page,
+        "size": size,
+        "total": total,
+        "more": end < total,
+        name: serializer_class(queryset[start:end], many=True).data,
+    }
+    if searching:
+        # Only the SEARCH_MAX_RESULTS most recently updated matches are listed
+        output["total_capped"] = total >= settings.SEARCH_MAX_RESULTS
+
+    return output
@@ -0,0 +1,98 @@
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+    check_password,
+    make_password,
+)
+
+from utils.worker_utils import WorkerPool
+
+rehash_pool = WorkerPool("password-rehash", "PASSWORD_REHASH_WORKERS")
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 hasher whose cost is set by PASSWORD_PBKDF2_ITERATIONS."""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS or PBKDF2PasswordHasher.iterations
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2 hasher whose costs are set by the PASSWORD_ARGON2_* settings."""
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """Scrypt hasher whose cost is set by PASSWORD_SCRYPT_WORK_FACTOR."""
+
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+
+def verify_password(user: Any, raw_password: str) -> bool:
+    """
+    Check the password of a user.
+
+    When the hash was made by another hasher than the one of the current
+    profile, or with other costs, the password is hashed again in the
+    background, the login does not wait for it.
+
+    :param user:
+    :param raw_password:
+    :return:
+    """
+    encoded = user.password
+
+    def setter(password):
+        schedule_rehash(user.pk, encoded, password)
+
+    return check_password(raw_password, encoded, setter=setter)
+
+
+def schedule_rehash(user_pk: Any, encoded: str, raw_password: str):
+    """
+    Hash a password again with the current profile, in the rehash workers.
+
+    With PASSWORD_REHASH_WORKERS at 0, the password is hashed at once.
+
+    :param user_pk:
+    :param encoded: The hash being replaced.
+    :param raw_password:
+    :return:
+    """
+    rehash_pool.submit(rehash_password, user_pk, encoded, raw_password)
+
+
+def rehash_password(user_pk: Any, encoded: str, raw_password: str) -> bool:
+    """
+    Replace the hash of a user, unless the password changed meanwhile.
+
+    :param user_pk:
+    :param encoded: The hash being replaced.
+    :param raw_password:
+    :return: True if the hash has been replaced.
+    """
+    # Updates only the password column, saves and signals are bypassed
+    return bool(
+        get_user_model()
+        .objects.filter(pk=user_pk, password=encoded)
+        .update(password=make_password(raw_password))
+    )
@@ -0,0 +1,164 @@
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+from utils.common import generate_uuid
+
+PROFILE_ID_REGEX = re.compile(r"^[0-9a-f]{32}$")
+
+
+class StackSampler:
+    """
+    Sample the Python stack of a thread every `interval` seconds, from a
+    background thread, the sampled thread running untouched.
+
+    The samples are counted by stack, as the "folded" stacks read by
+    flamegraph.pl, speedscope or inferno: `outer;...;inner <count>`.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        """
+        Stop the sampling.
+
+        :return: The number of samples by stack.
+        """
+        self._stopped.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+
+            stack = []
+            while frame is not None:
+                stack.append(get_frame_name(frame))
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+
+def get_frame_name(frame) -> str:
+    """
+    Name a frame of a folded stack: "function (file:line)", the file being
+    relative to the project or to the installed packages.
+
+    :param frame:
+    :return:
+    """
+    filename = frame.f_code.co_filename
+    for prefix in (f"{settings.BASE_DIR}{os.sep}", f"site-packages{os.sep}"):
+        if prefix in filename:
+            filename = filename.split(prefix, 1)[1]
+            break
+
+    # ";" separates the frames of a folded stack
+    return f"{frame.f_code.co_name} ({filename}:{frame.f_lineno})".replace(";", ",")
+
+
+def save_profile(samples: Counter, metadata: dict) -> str:
+    """
+    Write a profile in PROFILING_DIR: the folded stacks in `<id>.folded` and
+    its metadata in `<id>.json`. The oldest profiles beyond
+    PROFILING_MAX_PROFILES are deleted.
+
+    :param samples: The samples of `StackSampler.stop`.
+    :param metadata: The request (route, method, path...) and its duration.
+    :return: The id of the profile.
+    """
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    profile_id = generate_uuid()
+    base_path = os.path.join(settings.PROFILING_DIR, profile_id)
+
+    with open(f"{base_path}.folded", "w") as folded_file:
+        for stack, count in samples.most_common():
+            folded_file.write(f"{stack} {count}\n")
+
+    metadata = {
+        **metadata,
+        "id": profile_id,
+        "samples": sum(samples.values()),
+        "created_at": datetime.now(dt_timezone.utc).isoformat(),
+    }
+    with open(f"{base_path}.json", "w") as metadata_file:
+        json.dump(metadata, metadata_file)
+
+    delete_old_profiles()
+    return profile_id
+
+
+def delete_old_profiles():
+    """Delete the oldest profiles beyond PROFILING_MAX_PROFILES."""
+    metadata_files = sorted(
+        (entry for entry in os.scandir(settings.PROFILING_DIR) if entry.name.endswith(".json")),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in metadata_files[: max(0, len(metadata_files) - settings.PROFILING_MAX_PROFILES)]:
+        base_path = entry.path[: -len(".json")]
+        for path in (f"{base_path}.json", f"{base_path}.folded"):
+            try:
+                os.remove(path)
+            except OSError:
+                logging.exception(f"Error deleting the profile {path}")
+
+
+def list_slowest_profiles(per_route: int) -> Dict[str, List[dict]]:
+    """
+    List the slowest captured profiles of each route.
+
+    :param per_route: The number of profiles kept by route.
+    :return: The metadata of the profiles by route, the slowest first.
+    """
+    if not os.path.isdir(settings.PROFILING_DIR):
+        return {}
+
+    profiles_by_route: Dict[str, List[dict]] = {}
+    for entry in os.scandir(settings.PROFILING_DIR):
+        if not entry.name.endswith(".json"):
+            continue
+        try:
+            with open(entry.path) as metadata_file:
+                metadata = json.load(metadata_file)
+        except (OSError, ValueError):
+            # Deleted or being written meanwhile
+            continue
+        profiles_by_route.setdefault(metadata["route"], []).append(metadata)
+
+    return {
+        route: sorted(profiles, key=lambda profile: profile["duration_ms"], reverse=True)[:per_route]
+        for route, profiles in sorted(profiles_by_route.items())
+    }
+
+
+def get_profile_path(profile_id: str) -> Optional[str]:
+    """
+    Get the path of the folded stacks of a profile.
+
+    :param profile_id:
+    :return: The path, or None if the id is invalid or the profile deleted.
+    """
+    if not PROFILE_ID_REGEX.match(profile_id):
+        return None
+
+    path = os.path.join(settings.PROFILING_DIR, f"{profile_id}.folded")
+    return path if os.path.isfile(path) else None
+
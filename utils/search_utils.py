@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, QuerySet
+
+# Text search configurations used to build the search vectors, see the
+# `search_vector` triggers in app_models/migrations/0008_full_text_search.py
+SEARCH_CONFIGS = ("french", "english")
+
+
+def build_search_query(text: str) -> SearchQuery:
+    """
+    Build a search query matching the text in any of the supported languages.
+
+    :param text: The raw user input, parsed with the web search syntax
+        ("quoted phrases", OR, -excluded).
+    :return:
+    """
+    query = None
+    for config in SEARCH_CONFIGS:
+        language_query = SearchQuery(text, config=config, search_type="websearch")
+        query = language_query if query is None else query | language_query
+
+    return query
+
+
+def search_queryset(queryset: QuerySet, text: str) -> QuerySet:
+    """
+    Filter a queryset on its `search_vector` and annotate the relevance.
+
+    Only the `SEARCH_MAX_RESULTS` most recently updated matches are kept and
+    ranked, so that very common words do not rank and sort a large part of the
+    table: the count of the results is capped at `SEARCH_MAX_RESULTS`. The
+    relevance is available as `search_rank`, higher is better.
+
+    :param queryset: A queryset of a model having a `search_vector` field.
+    :param text: The raw user input.
+    :return:
+    """
+    query = build_search_query(text)
+    candidates = (
+        queryset.filter(search_vector=query)
+        .order_by("-updated_at", "-pk")
+        .values("pk")[: settings.SEARCH_MAX_RESULTS]
+    )
+    return queryset.filter(pk__in=candidates).annotate(
+        search_rank=SearchRank(F("search_vector"), query)
+    )
@@ -0,0 +1,132 @@
+from typing import Iterable, List
+
+from django.db import transaction
+
+from app_models.models import ServiceCategory, ServiceProposalSkill
+from app_models.models.constants import DEFAULT_SERVICE_CATEGORY
+from serializers.service_serializer import (
+    ServiceCategorySerializer,
+    ServiceProposalSkillSerializer,
+)
+from utils.cache_utils import bump_reference_data_version, get_reference_data
+
+
+def _load_default_category() -> ServiceCategory:
+    category, _ = ServiceCategory.objects.get_or_create(**DEFAULT_SERVICE_CATEGORY)
+    return category
+
+
+def get_default_category() -> ServiceCategory:
+    """
+    Get the category used when none is given, from the reference data cache.
+
+    :return:
+    """
+    category, _ = get_reference_data("default_category", _load_default_category)
+    return category
+
+
+def get_category(category_uuid: str) -> ServiceCategory:
+    """
+    Get a category by its uuid, from the reference data cache.
+
+    The cache of the process may miss a category created by another process
+    for REFERENCE_DATA_VERSION_TTL seconds, it is then read from the database.
+    It may as well still hold a category deleted meanwhile: the writes of the
+    callers fail with an IntegrityError then.
+
+    :param category_uuid:
+    :return:
+    :raises ServiceCategory.DoesNotExist: If there is no category with this uuid.
+    """
+    categories, _ = get_reference_data(
+        "categories_by_uuid",
+        lambda: {category.uuid: category for category in ServiceCategory.objects.all()},
+    )
+    category = categories.get(category_uuid)
+    if category is None:
+        category = ServiceCategory.objects.filter(uuid=category_uuid).first()
+        if category is None:
+            raise ServiceCategory.DoesNotExist(f"Category {category_uuid} not found")
+
+    return category
+
+
+def get_categories_data():
+    """
+    Get the serialized categories and their etag, from the reference data cache.
+
+    :return: A tuple (categories, etag).
+    """
+    return get_reference_data(
+        "categories",
+        lambda: list(
+            ServiceCategorySerializer(ServiceCategory.objects.all(), many=True).data
+        ),
+    )
+
+
+def get_skills_data():
+    """
+    Get the serialized skills and their etag, from the reference data cache.
+
+    :return: A tuple (skills, etag).
+    """
+    return get_reference_data(
+        "skills",
+        lambda: list(
+            ServiceProposalSkillSerializer(
+                ServiceProposalSkill.objects.all(), many=True
+            ).data
+        ),
+    )
+
+
+def normalize_skill_names(skill_names: Iterable[str]) -> List[str]:
+    """
+    Strip, lowercase and deduplicate skill names, keeping their order.
+
+    :param skill_names:
+    :return:
+    """
+    normalized = {}
+    for skill_name in skill_names:
+        formatted_skill_name = skill_name.strip().lower()
+        if formatted_skill_name:
+            normalized[formatted_skill_name] = None
+
+    return list(normalized)
+
+
+def resolve_skills(skill_names: Iterable[str]) -> List[ServiceProposalSkill]:
+    """
+    Get the skills matching the names, creating the missing ones in bulk.
+
+    It runs one query when all the skills exist, three otherwise, whatever the
+    number of skills. Concurrent creations of the same skill are safe since
+    conflicting inserts are ignored.
+
+    :param skill_names: The raw skill names, normalized by `normalize_skill_names`.
+    :return: The skills, in the order of the names.
+    """
+    names = normalize_skill_names(skill_names)
+    if not names:
+        return []
+
+    skills = {
+        skill.name: skill for skill in ServiceProposalSkill.objects.filter(name__in=names)
+    }
+    missing_names = [name for name in names if name not in skills]
+    if missing_names:
+        # bulk_create does not send post_save, invalidate the cached skills here
+        ServiceProposalSkill.objects.bulk_create(
+            [ServiceProposalSkill(name=name) for name in missing_names],
+            ignore_conflicts=True,
+        )
+        transaction.on_commit(bump_reference_data_version)
+        skills.update(
+            (skill.name, skill)
+            for skill in ServiceProposalSkill.objects.filter(name__in=missing_names)
+        )
+
+    return [skills[name] for name in names]
@@ -0,0 +1,208 @@
+import hashlib
+import logging
+import os
+import re
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from app_models.models import SlowQuery
+
+# Rules turning a query into its shape, whatever its parameters
+NORMALIZATION_RULES = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),  # String literals
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),  # Numbers, not the digits of the aliases (U0, T3)
+    (re.compile(r"%s"), "?"),  # Parameters
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),  # IN lists, whatever their length
+    (re.compile(r"\s+"), " "),
+]
+
+SEQ_SCAN_REGEX = re.compile(r"Seq Scan on (\w+)")
+
+# Frames of the project locating the query
+VIEW_DIRECTORY = f"{settings.BASE_DIR}{os.sep}endpoints{os.sep}"
+SERIALIZER_DIRECTORY = f"{settings.BASE_DIR}{os.sep}serializers{os.sep}"
+
+UPSERT_SQL = """
+    INSERT INTO app_models_slowquery (
+        fingerprint, normalized_sql, sample_sql, route, view_frame, serializer_frame,
+        count, total_duration, max_duration, first_seen_at, last_seen_at,
+        explain_plan, seq_scan_tables
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, 1, %s, %s, %s, %s, '', '')
+    ON CONFLICT (fingerprint) DO UPDATE SET
+        count = app_models_slowquery.count + 1,
+        total_duration = app_models_slowquery.total_duration + EXCLUDED.total_duration,
+        last_seen_at = EXCLUDED.last_seen_at,
+        -- Keep the slowest occurrence
+        sample_sql = CASE WHEN EXCLUDED.max_duration > app_models_slowquery.max_duration
+            THEN EXCLUDED.sample_sql ELSE app_models_slowquery.sample_sql END,
+        route = CASE WHEN EXCLUDED.max_duration > app_models_slowquery.max_duration
+            THEN EXCLUDED.route ELSE app_models_slowquery.route END,
+        view_frame = CASE WHEN EXCLUDED.max_duration > app_models_slowquery.max_duration
+            THEN EXCLUDED.view_frame ELSE app_models_slowquery.view_frame END,
+        serializer_frame = CASE WHEN EXCLUDED.max_duration > app_models_slowquery.max_duration
+            THEN EXCLUDED.serializer_frame ELSE app_models_slowquery.serializer_frame END,
+        max_duration = GREATEST(app_models_slowquery.max_duration, EXCLUDED.max_duration)
+"""
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Get the shape of a query: literals, parameters and IN lists replaced.
+
+    :param sql:
+    :return:
+    """
+    for regex, replacement in NORMALIZATION_RULES:
+        sql = regex.sub(replacement, sql)
+
+    return sql.strip()
+
+
+def get_fingerprint(normalized_sql: str) -> str:
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()
+
+
+def get_caller_frames() -> Dict[str, str]:
+    """
+    Find the view and serializer frames running the current query.
+
+    :return: {"view_frame": ..., "serializer_frame": ...}, empty when not found.
+    """
+    frames = {"view_frame": "", "serializer_frame": ""}
+    frame = sys._getframe(2)
+    while frame is not None and not all(frames.values()):
+        filename = frame.f_code.co_filename
+        for name, directory in (
+            ("view_frame", VIEW_DIRECTORY),
+            ("serializer_frame", SERIALIZER_DIRECTORY),
+        ):
+            if not frames[name] and filename.startswith(directory):
+                relative_filename = os.path.relpath(filename, settings.BASE_DIR)
+                frames[name] = f"{relative_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+
+    return frames
+
+
+class SlowQueryRecorder:
+    """
+    Execute wrapper keeping the queries of a request slower than
+    SLOW_QUERY_THRESHOLD, until `flush` stores them.
+
+    Only the slow queries pay for the fingerprint, the frames and the
+    parameters formatting.
+    """
+
+    def __init__(self, request: Any):
+        self.request = request
+        self.slow_queries: List[dict] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            if duration >= settings.SLOW_QUERY_THRESHOLD:
+                self.record(sql, params, many, context["connection"], duration)
+
+    def record(self, sql: str, params: Any, many: bool, connection: Any, duration: float):
+        normalized_sql = normalize_sql(sql)
+        try:
+            sample_sql = connection.ops.compose_sql(sql, params[0] if many else params)
+        except Exception:
+            sample_sql = sql
+
+        resolver_match = getattr(self.request, "resolver_match", None)
+        self.slow_queries.append(
+            {
+                "fingerprint": get_fingerprint(normalized_sql),
+                "normalized_sql": normalized_sql,
+                "sample_sql": sample_sql,
+                "route": resolver_match.route if resolver_match else "",
+                "duration": duration,
+                "seen_at": timezone.now(),
+                **get_caller_frames(),
+            }
+        )
+
+    def flush(self):
+        """Add the slow queries of the request to their SlowQuery aggregates."""
+        if not self.slow_queries:
+            return
+
+        try:
+            with transaction.atomic(using=DEFAULT_DB_ALIAS), connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+                for query in self.slow_queries:
+                    cursor.execute(
+                        UPSERT_SQL,
+                        [
+                            query["fingerprint"],
+                            query["normalized_sql"],
+                            query["sample_sql"],
+                            query["route"][:255],
+                            query["view_frame"][:255],
+                            query["serializer_frame"][:255],
+                            query["duration"],
+                            query["duration"],
+                            query["seen_at"],
+                            query["seen_at"],
+                        ],
+                    )
+        except:
+            logging.exception("Error storing the slow queries")
+        finally:
+            self.slow_queries = []
+
+
+def explain_slow_query(slow_query: SlowQuery, analyze: bool = True) -> str:
+    """
+    Explain the slowest occurrence of a slow query and store its plan.
+
+    With `analyze`, the SELECT queries are run (EXPLAIN ANALYZE, BUFFERS) in a
+    transaction rolled back and limited to SLOW_QUERY_EXPLAIN_TIMEOUT; the
+    other queries are only planned, never run.
+
+    :param slow_query:
+    :param analyze:
+    :return: The plan.
+    """
+    sample_sql = slow_query.sample_sql
+    if analyze and sample_sql.lstrip().upper().startswith("SELECT"):
+        explain_sql = f"EXPLAIN (ANALYZE, BUFFERS) {sample_sql}"
+    else:
+        explain_sql = f"EXPLAIN {sample_sql}"
+
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('statement_timeout', %s, true)",
+                [f"{settings.SLOW_QUERY_EXPLAIN_TIMEOUT}s"],
+            )
+            cursor.execute(explain_sql)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        transaction.set_rollback(True, using=DEFAULT_DB_ALIAS)
+
+    slow_query.explain_plan = plan
+    slow_query.explained_at = timezone.now()
+    slow_query.seq_scan_tables = ", ".join(sorted(set(SEQ_SCAN_REGEX.findall(plan))))[:255]
+    slow_query.save(update_fields=["explain_plan", "explained_at", "seq_scan_tables"])
+    return plan
+
+
+def get_top_slow_queries(limit: int, order_by: str = "-total_duration") -> Optional[list]:
+    """
+    Get the slow queries costing the most.
+
+    :param limit:
+    :param order_by: "-total_duration" (all the occurrences), "-max_duration"
+        or "-count".
+    :return:
+    """
+    return list(SlowQuery.objects.order_by(order_by)[:limit])
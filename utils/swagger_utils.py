@@ -1,10 +1,75 @@
+import gzip
+import hashlib
+import logging
+import os
+from functools import lru_cache
+from typing import Dict
+
+from django.conf import settings
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
 from drf_yasg.generators import OpenAPISchemaGenerator
 
-from backend.settings import SCHEME
+API_VERSION = "v1"
+API_INFO = openapi.Info(
+    title="X-Project API",
+    default_version=f"{API_VERSION}",
+    description="API of the X-Project backend project",
+    contact=openapi.Contact(
+        email="edghimakoll@gmail.com",
+        name="Edmond Makolle",
+    ),
+)
+
+# Formats of the schema, by the extension of its URL and file
+SCHEMA_FORMATS = {
+    ".json": ("application/json", lambda: OpenAPICodecJson(validators=[], pretty=True)),
+    ".yaml": ("application/yaml", lambda: OpenAPICodecYaml(validators=[])),
+}
+
+
+def generate_schema() -> Dict[str, bytes]:
+    """
+    Generate the OpenAPI schema of the API, walking all the views and
+    serializers.
+
+    It does not depend on the request nor on the environment: without `host`
+    and `schemes`, the clients use the ones of the URL they read it from.
+
+    :return: The encoded schema by format extension.
+    """
+    generator = OpenAPISchemaGenerator(API_INFO, API_VERSION)
+    schema = generator.get_schema(request=None, public=True)
+    return {extension: codec().encode(schema) for extension, (_, codec) in SCHEMA_FORMATS.items()}
+
+
+def get_schema_path(extension: str) -> str:
+    return os.path.join(settings.OPENAPI_SCHEMA_DIR, f"swagger{extension}")
+
+
+@lru_cache(maxsize=None)
+def get_schema_file(extension: str) -> Dict[str, object]:
+    """
+    Load a format of the schema, once by process: read from OPENAPI_SCHEMA_DIR,
+    written by `python manage.py generate_openapi_schema`, or generated if
+    the file is missing.
 
+    :param extension: ".json" or ".yaml".
+    :return: The content, its gzip compression, its ETag and its content type.
+    """
+    try:
+        with open(get_schema_path(extension), "rb") as schema_file:
+            content = schema_file.read()
+    except FileNotFoundError:
+        logging.warning(f"No OpenAPI schema file in {settings.OPENAPI_SCHEMA_DIR}, generating it")
+        content = generate_schema()[extension]
 
-class CustomSchemaGenerator(OpenAPISchemaGenerator):
-    def get_schema(self, request=None, public=False):
-        schema = super().get_schema(request, public)
-        schema.schemes = [SCHEME]
-        return schema
+    digest = hashlib.sha256(content).hexdigest()[:32]
+    return {
+        "content": content,
+        # No timestamp, the same content gets the same bytes on every worker
+        "gzip_content": gzip.compress(content, mtime=0),
+        "etag": f'"{digest}"',
+        "gzip_etag": f'"{digest}-gzip"',
+        "content_type": SCHEMA_FORMATS[extension][0],
+    }
@@ -0,0 +1,195 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+
+
+class RequestTiming:
+    """
+    Durations and SQL queries of a request.
+
+    Installed as an execute wrapper on the database connections, it counts
+    the queries and their time, whatever the database alias. The serializers
+    using `TimedSerializerMixin` add their time and queries to it.
+    """
+
+    __slots__ = (
+        "started_at",
+        "view_started_at",
+        "render_started_at",
+        "queries",
+        "db_time",
+        "serialize_time",
+        "serialize_queries",
+        "serialize_depth",
+    )
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.view_started_at = None
+        self.render_started_at = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serialize_queries = 0
+        self.serialize_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+            if self.serialize_depth:
+                self.serialize_queries += 1
+
+    def get_durations(self, ended_at: float) -> Dict[str, float]:
+        """
+        Get the durations of the request phases, in milliseconds.
+
+        - total: the whole request, middlewares included.
+        - view: the view until the response is rendered, serializers excluded.
+        - serialize: the output serializers (`TimedSerializerMixin`), the SQL
+          queries of their lazy relations included.
+        - render: the rendering of the response (JSON encoding).
+        - db: the SQL queries, whatever the phase.
+
+        :param ended_at: The perf_counter() at the end of the request.
+        :return:
+        """
+        view_started_at = self.view_started_at or self.started_at
+        render_started_at = self.render_started_at or ended_at
+        return {
+            "total": (ended_at - self.started_at) * 1000,
+            "view": (render_started_at - view_started_at - self.serialize_time) * 1000,
+            "serialize": self.serialize_time * 1000,
+            "render": (ended_at - render_started_at) * 1000,
+            "db": self.db_time * 1000,
+        }
+
+
+# Timing of the request handled by the current thread, set by RequestTimingMiddleware
+current_timing: ContextVar[Optional[RequestTiming]] = ContextVar("current_timing", default=None)
+
+
+class TimedSerializerMixin:
+    """
+    Add the time spent building the representation of the serializer to the
+    timing of the current request, so that its N+1 queries are not mistaken
+    for the cost of the view. Only the outermost serializer is measured.
+    """
+
+    def to_representation(self, instance):
+        timing = current_timing.get()
+        if timing is None or timing.serialize_depth:
+            return super().to_representation(instance)
+
+        timing.serialize_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            timing.serialize_time += time.perf_counter() - start
+            timing.serialize_depth -= 1
+
+
+class EndpointStats:
+    """Thread safe aggregates of the requests of the process, by endpoint."""
+
+    def __init__(self):
+        self._stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        method: str,
+        route: str,
+        status_code: int,
+        durations: Dict[str, float],
+        queries: int,
+        over_budget: bool,
+        serialize_queries: int = 0,
+    ):
+        """
+        Add a request to the aggregates of its endpoint.
+
+        :param method: The HTTP method.
+        :param route: The URL pattern of the endpoint, not the path, so that
+            the number of endpoints stays bounded.
+        :param status_code:
+        :param durations: The durations of `RequestTiming.get_durations`.
+        :param queries: The number of SQL queries.
+        :param over_budget: If the request exceeded its query budget.
+        :param serialize_queries: The number of SQL queries of the serializers.
+        :return:
+        """
+        with self._lock:
+            stats = self._stats.get((method, route))
+            if stats is None:
+                stats = self._stats[(method, route)] = {
+                    "count": 0,
+                    "errors": 0,
+                    "over_budget": 0,
+                    "queries": 0,
+                    "max_queries": 0,
+                    "total_ms": 0.0,
+                    "max_total_ms": 0.0,
+                    "view_ms": 0.0,
+                    "serialize_ms": 0.0,
+                    "serialize_queries": 0,
+                    "render_ms": 0.0,
+                    "db_ms": 0.0,
+                }
+
+            stats["count"] += 1
+            stats["errors"] += status_code >= 500
+            stats["over_budget"] += over_budget
+            stats["queries"] += queries
+            stats["max_queries"] = max(stats["max_queries"], queries)
+            stats["total_ms"] += durations["total"]
+            stats["max_total_ms"] = max(stats["max_total_ms"], durations["total"])
+            stats["view_ms"] += durations["view"]
+            stats["serialize_ms"] += durations["serialize"]
+            stats["serialize_queries"] += serialize_queries
+            stats["render_ms"] += durations["render"]
+            stats["db_ms"] += durations["db"]
+
+    def snapshot(self) -> list:
+        """
+        Get a copy of the aggregates, with the averages by request.
+
+        :return: A list of dicts, the slowest endpoints (total time) first.
+        """
+        with self._lock:
+            items = [(key, dict(stats)) for key, stats in self._stats.items()]
+
+        snapshot = []
+        for (method, route), stats in items:
+            count = stats["count"]
+            stats.update(
+                avg_queries=stats["queries"] / count,
+                avg_total_ms=stats["total_ms"] / count,
+                avg_db_ms=stats["db_ms"] / count,
+                avg_serialize_ms=stats["serialize_ms"] / count,
+            )
+            snapshot.append(
+                {
+                    "method": method,
+                    "route": route,
+                    **{
+                        name: round(value, 2) if isinstance(value, float) else value
+                        for name, value in stats.items()
+                    },
+                }
+            )
+
+        return sorted(snapshot, key=lambda stats: stats["total_ms"], reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+
+
+# Aggregates of the requests of the current process
+endpoint_stats = EndpointStats()
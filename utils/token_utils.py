@@ -0,0 +1,176 @@
+import hashlib
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Optional
+
+import jwt
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_jwt.settings import api_settings
+
+from app_models.models import RevokedToken
+from utils.cache_utils import TTLCache
+from utils.db_router import use_primary
+
+# "<scheme> <header>.<payload>.<signature>" with base64url encoded parts
+AUTHORIZATION_HEADER_REGEX = re.compile(
+    r"^(?P<scheme>\S+) (?P<token>[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]*)$"
+)
+
+# Margin re-reading the last revocations, for transactions committed late
+REVOCATION_OVERLAP = timedelta(minutes=1)
+
+# Process local payloads of the verified tokens, keyed by token digest, kept
+# until the token expires
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_ENTRIES, ttl=settings.TOKEN_VALIDITY * 60, name="token"
+)
+
+# Process local copy of the revoked tokens: digest -> expiration timestamp
+_revoked_tokens: Dict[str, float] = {}
+_revocations_lock = threading.Lock()
+_revocations_state = {"refreshed_at": None, "last_created_at": None}
+
+
+class RevokedTokenError(jwt.InvalidTokenError):
+    """Raised when decoding a revoked token."""
+
+
+def parse_authorization_header(header: Optional[str]) -> Optional[str]:
+    """
+    Extract the JWT of an "Authorization: Bearer <token>" header.
+
+    :param header: The raw header value.
+    :return: The token, or None if the header is missing or malformed.
+    """
+    if not header:
+        return None
+
+    match = AUTHORIZATION_HEADER_REGEX.match(header.strip())
+    if not match or match.group("scheme").lower() != "bearer":
+        return None
+
+    return match.group("token")
+
+
+def get_token_digest(token: str) -> str:
+    """
+    Get the SHA-256 hex digest identifying a token.
+
+    :param token:
+    :return:
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def decode_token(token: str) -> dict:
+    """
+    Decode a token, verifying its signature only the first time it is seen.
+
+    :param token:
+    :return: The token payload.
+    :raises jwt.InvalidTokenError: If the token is invalid, expired or revoked.
+    """
+    digest = get_token_digest(token)
+    refresh_revoked_tokens()
+    if digest in _revoked_tokens:
+        raise RevokedTokenError("Token has been revoked")
+
+    payload = token_cache.get(digest)
+    if payload is None:
+        payload = api_settings.JWT_DECODE_HANDLER(token)
+        token_cache.set(digest, payload, ttl=_get_remaining_validity(payload))
+
+    return payload
+
+
+def revoke_token(token: str):
+    """
+    Revoke a token until its expiration, in all the processes.
+
+    The current process ignores the token at once, the other ones after
+    TOKEN_REVOCATION_REFRESH seconds at most.
+
+    :param token:
+    :return:
+    :raises jwt.InvalidTokenError: If the token is invalid or expired.
+    """
+    payload = decode_token(token)
+    digest = get_token_digest(token)
+    expires_at = datetime.fromtimestamp(
+        time.time() + _get_remaining_validity(payload), tz=dt_timezone.utc
+    )
+    RevokedToken.objects.get_or_create(digest=digest, defaults={"expires_at": expires_at})
+    RevokedToken.objects.filter(expires_at__lt=timezone.now()).delete()
+
+    with _revocations_lock:
+        _revoked_tokens[digest] = expires_at.timestamp()
+
+
+def is_token_revoked(token: str) -> bool:
+    """
+    Check if a token has been revoked.
+
+    :param token:
+    :return:
+    """
+    refresh_revoked_tokens()
+    return get_token_digest(token) in _revoked_tokens
+
+
+def refresh_revoked_tokens(force: bool = False):
+    """
+    Load the tokens revoked since the last load, at most every
+    TOKEN_REVOCATION_REFRESH seconds.
+
+    :param force: Load even if the last load is recent.
+    :return:
+    """
+    if not force and not _revocations_outdated():
+        return
+
+    with _revocations_lock:
+        # Another thread may have loaded them while waiting for the lock
+        if not force and not _revocations_outdated():
+            return
+
+        _revocations_state["refreshed_at"] = time.monotonic()
+        revocations = RevokedToken.objects.filter(expires_at__gt=timezone.now())
+        last_created_at = _revocations_state["last_created_at"]
+        if last_created_at is not None:
+            revocations = revocations.filter(created_at__gte=last_created_at - REVOCATION_OVERLAP)
+
+        # A lagging replica could miss revocations older than the overlap
+        with use_primary():
+            revocations = list(revocations.values_list("digest", "expires_at", "created_at"))
+
+        for digest, expires_at, created_at in revocations:
+            _revoked_tokens[digest] = expires_at.timestamp()
+            if last_created_at is None or created_at > last_created_at:
+                last_created_at = created_at
+
+        _revocations_state["last_created_at"] = last_created_at or timezone.now()
+
+        # Forget the revocations of the expired tokens
+        current_time = time.time()
+        for digest in [digest for digest, exp in _revoked_tokens.items() if exp < current_time]:
+            del _revoked_tokens[digest]
+
+
+def _revocations_outdated() -> bool:
+    """Check if the revoked tokens must be loaded again."""
+    refreshed_at = _revocations_state["refreshed_at"]
+    return (
+        refreshed_at is None
+        or time.monotonic() - refreshed_at >= settings.TOKEN_REVOCATION_REFRESH
+    )
+
+
+def _get_remaining_validity(payload: dict) -> float:
+    """Seconds before the expiration of a token payload."""
+    if "exp" not in payload:
+        return settings.TOKEN_VALIDITY * 60
+
+    return max(0.0, float(payload["exp"]) - time.time())
@@ -0,0 +1,156 @@
+import logging
+from typing import Any, Iterable
+
+from django.core.files.uploadhandler import FileUploadHandler, TemporaryFileUploadHandler
+from django.db import transaction
+from django.db.models.fields.files import FieldFile
+from rest_framework import status
+
+from utils.metrics_utils import UPLOAD_SIZE
+
+# Leading bytes of the accepted image formats
+IMAGE_SIGNATURES = {
+    "jpeg": (b"\xff\xd8\xff",),
+    "png": (b"\x89PNG\r\n\x1a\n",),
+    "webp": (b"RIFF",),  # Followed by the size then b"WEBP"
+}
+
+IMAGE_CONTENT_TYPES = ("image/jpeg", "image/jpg", "image/pjpeg", "image/png", "image/webp")
+
+# Room left for the other fields and the multipart boundaries of the body
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadRejected(Exception):
+    """Raised while an upload is received, to stop reading the request body."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def get_image_format(header: bytes):
+    """
+    Identify an image by its leading bytes.
+
+    :param header: At least the 12 first bytes of the file.
+    :return: The image format, or None if it is not an accepted one.
+    """
+    for image_format, signatures in IMAGE_SIGNATURES.items():
+        if header.startswith(signatures):
+            if image_format == "webp" and header[8:12] != b"WEBP":
+                continue
+            return image_format
+
+    return None
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """
+    Check the images of the given fields while they are received, before the
+    request body is fully read: declared size, content type and leading bytes.
+
+    It only checks, the chunks are stored by the next handlers.
+    """
+
+    def __init__(self, request=None, field_names: Iterable[str] = (), max_size: int = 0):
+        super().__init__(request)
+        self.field_names = set(field_names)
+        self.max_size = max_size
+        self.checking = False
+        self.checked_field = None
+        self.received = 0
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Reject at once the bodies announcing a larger size
+        if content_length > self.max_size + MULTIPART_OVERHEAD:
+            raise UploadRejected("File too large !", status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        self.checking = field_name in self.field_names
+        self.checked_field = field_name
+        self.received = 0
+        if self.checking and content_type not in IMAGE_CONTENT_TYPES:
+            raise UploadRejected(
+                "Unsupported file type !", status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.checking:
+            if start == 0 and get_image_format(raw_data[:12]) is None:
+                raise UploadRejected(
+                    "Unsupported file type !", status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+                )
+
+            self.received += len(raw_data)
+            if self.received > self.max_size:
+                raise UploadRejected("File too large !", status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.checking:
+            UPLOAD_SIZE.labels(field=self.checked_field).observe(self.received)
+        return None
+
+
+def get_image_upload_handlers(request: Any, field_names: Iterable[str], max_size: int) -> list:
+    """
+    Get the upload handlers checking the images of the given fields, and
+    streaming every file to a temporary file, whatever its size.
+
+    :param request: The Django request.
+    :param field_names: The fields of the images.
+    :param max_size: The maximum size of an image, in bytes.
+    :return:
+    """
+    return [
+        ImageUploadHandler(request, field_names=field_names, max_size=max_size),
+        TemporaryFileUploadHandler(request),
+    ]
+
+
+def abort_upload(request: Any):
+    """
+    Delete the temporary files of an upload stopped midway.
+
+    :param request: The Django request.
+    :return:
+    """
+    for handler in request.upload_handlers:
+        handler.upload_interrupted()
+
+
+def replace_file(field_file: FieldFile, name: str, content: Any):
+    """
+    Store a new file in a file field and save its instance, deleting the
+    previous file only once the new one is committed.
+
+    The content is moved to the storage when it is a temporary file, otherwise
+    copied chunk by chunk, never read at once.
+
+    :param field_file: The file field of a model instance.
+    :param name: The name of the new file.
+    :param content: A Django File, e.g. an uploaded file.
+    :return:
+    """
+    previous_name = field_file.name
+    storage = field_file.storage
+
+    field_file.save(name, content, save=False)
+    try:
+        field_file.instance.save()
+    except:
+        storage.delete(field_file.name)
+        raise
+
+    if previous_name and previous_name != field_file.name:
+
+        def delete_previous_file():
+            try:
+                storage.delete(previous_name)
+            except OSError:
+                logging.exception(f"Error deleting the replaced file {previous_name}")
+
+        transaction.on_commit(delete_previous_file)
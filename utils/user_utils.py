@@ -1,48 +1,197 @@
+import atexit
+import copy
 import logging
-import re
-from typing import Any
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
 from rest_framework_jwt.settings import api_settings
 
+from utils.cache_utils import TTLCache
+from utils.db_router import use_primary
+from utils.metrics_utils import AUTH_DECODE_DURATION, AUTH_LOOKUP_DURATION
+from utils.token_utils import (
+    RevokedTokenError,
+    decode_token,
+    parse_authorization_header,
+)
+
 
 User = get_user_model()
 
+# Process local snapshots of the connected users, keyed by token username and
+# indexed by pk. Saves and deletes invalidate them in the current process, the
+# other processes see the change after USER_CACHE_TTL seconds at most.
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_ENTRIES,
+    ttl=settings.USER_CACHE_TTL,
+    name="user",
+    index=lambda user: user.pk,
+)
+
+# Attribute of the Django request memoizing the connected user
+CONNECTED_USER_ATTRIBUTE = "_connected_user"
+
 
 def get_connected_user(request: Any):
     """
     Get the current user from the request.
 
-    :param request:
+    The token is decoded and the user fetched once per request, the following
+    calls (decorator, view, authentication class) read the memoized user.
+
+    :param request: A Django or a DRF request.
     :return:
     """
-    header_token = request.META.get("HTTP_AUTHORIZATION", None)
-    if not header_token or header_token == "Bearer":
-        return None
+    # DRF requests wrap the Django request, memoize on the latter so that
+    # every layer shares the same value
+    http_request = getattr(request, "_request", request)
+    if not hasattr(http_request, CONNECTED_USER_ATTRIBUTE):
+        setattr(http_request, CONNECTED_USER_ATTRIBUTE, resolve_connected_user(http_request))
 
-    token = re.sub("Bearer ", "", header_token)
-    if token == "undefined":
-        return None
+    return getattr(http_request, CONNECTED_USER_ATTRIBUTE)
+
+
+def resolve_connected_user(request: Any):
+    """
+    Decode the request token and retrieve its user, without memoization.
 
-    # # Check if the token is blacklisted
-    # if BlacklistedToken.objects.filter(token=token).exists():
-    #     logging.warning("Token is blacklisted")
-    #     return None
+    :param request:
+    :return:
+    """
+    token = parse_authorization_header(request.META.get("HTTP_AUTHORIZATION", None))
+    if not token:
+        return None
 
-    # Verified the token and retrieve user
+    # Verified the token (signature checked once, revocations honoured) and
+    # retrieve user
     try:
-        payload = api_settings.JWT_DECODE_HANDLER(token)
+        with AUTH_DECODE_DURATION.time():
+            payload = decode_token(token)
         if payload.get("type") == "refresh":
             # So this is maybe a refresh token
             return None
 
         existing_username = api_settings.JWT_PAYLOAD_GET_USERNAME_HANDLER(payload)
+    except RevokedTokenError:
+        logging.warning("Revoked token used")
+        return None
     except:
         logging.exception("Error while decoding the token")
         return None
 
-    existing_user = User.objects.get_by_natural_key(existing_username)
-    if not existing_user:
-        return None
+    with AUTH_LOOKUP_DURATION.time():
+        return get_user_by_username(existing_username)
+
+
+def get_user_by_username(username: str):
+    """
+    Get a user by its username, from the user cache when possible.
+
+    Each call returns its own copy, so that a request can modify the user
+    without affecting the cache nor the other requests.
+
+    :param username:
+    :return:
+    """
+    existing_user = user_cache.get(username)
+    if existing_user is None:
+        try:
+            # Cached for USER_CACHE_TTL seconds, read the latest version
+            with use_primary():
+                existing_user = User.objects.get_by_natural_key(username)
+        except User.DoesNotExist:
+            logging.warning(f"User of the token not found: {username}")
+            return None
+
+        user_cache.set(username, existing_user)
+
+    return copy.copy(existing_user)
+
+
+def invalidate_cached_user(user: Any):
+    """
+    Remove a user from the user cache, whatever its cached username.
+
+    :param user:
+    :return:
+    """
+    user_cache.discard_indexed(user.pk)
+
+
+class LastLoginRecorder:
+    """
+    Buffer the last login dates of the users and write them in batches.
+
+    A background thread writes the dates recorded during the last `interval`
+    seconds with one UPDATE per `batch_size` users, a user logging in several
+    times being written once. An `interval` of 0 writes each date at once.
+    """
+
+    def __init__(self, interval: float, batch_size: int = 500):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._pending: Dict[Any, datetime] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def record(self, user: Any, login_date: datetime = None):
+        """
+        Record a login of the user, without fetching nor saving the user.
+
+        :param user:
+        :param login_date: Defaults to now.
+        :return:
+        """
+        login_date = login_date or timezone.now()
+        if self.interval <= 0:
+            User.objects.filter(pk=user.pk).update(last_login=login_date)
+            return
+
+        with self._lock:
+            self._pending[user.pk] = login_date
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="last-login-writer", daemon=True
+                )
+                self._thread.start()
+
+    def flush(self) -> int:
+        """
+        Write the recorded dates.
+
+        :return: The number of users updated.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        if not pending:
+            return 0
+
+        # Updates only the last_login column, saves and signals are bypassed
+        User.objects.bulk_update(
+            [User(pk=pk, last_login=login_date) for pk, login_date in pending.items()],
+            ["last_login"],
+            batch_size=self.batch_size,
+        )
+        return len(pending)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except:
+                logging.exception("Error updating users last login")
+            finally:
+                # The thread has its own connection, do not keep it open between flushes
+                connection.close()
+
 
-    return existing_user
+last_login_recorder = LastLoginRecorder(settings.LAST_LOGIN_FLUSH_INTERVAL)
+atexit.register(last_login_recorder.flush)
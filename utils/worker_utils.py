@@ -0,0 +1,56 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from django.conf import settings
+from django.db import connection
+
+
+class WorkerPool:
+    """
+    Pool of local threads running tasks outside the request cycle.
+
+    The number of threads is read from the `workers_setting` setting, 0 runs
+    the tasks at once in the calling thread. The pending tasks are lost if the
+    process stops, they must be recoverable by other means.
+    """
+
+    def __init__(self, name: str, workers_setting: str):
+        self.name = name
+        self.workers_setting = workers_setting
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable, *args: Any):
+        """
+        Run a task in the pool.
+
+        :param func:
+        :param args:
+        :return:
+        """
+        if getattr(settings, self.workers_setting) <= 0:
+            func(*args)
+            return
+
+        self._get_executor().submit(self._run, func, *args)
+
+    def _run(self, func: Callable, *args: Any):
+        try:
+            func(*args)
+        except:
+            logging.exception(f"Error running a {self.name} task")
+        finally:
+            # The worker has its own connection, do not keep it open between tasks
+            connection.close()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, self.workers_setting),
+                    thread_name_prefix=self.name,
+                )
+
+        return self._executor